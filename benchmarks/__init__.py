@@ -0,0 +1,9 @@
+"""
+Performance benchmarks for django-filter.
+
+Benchmarks run against the test project settings, using an in-memory SQLite
+database. Run a benchmark module from the repository root, e.g.::
+
+    $ python -m benchmarks.multiple_choice
+
+"""
@@ -0,0 +1,177 @@
+"""
+Time the hot paths of ``FilterSet``\\s: class creation, instantiation, form
+validation, queryset filtering and SQL compilation, ``OrderingFilter`` with
+many fields, parsing of CSV ``__in`` values, and rendering of many choices.
+
+The models with many fields are created at runtime, and are not migrated.
+"""
+
+from .utils import measure, parse_args, report, setup_django
+
+FIELD_COUNTS = (10, 100, 500)
+ACTIVE_PARAMS = (0, 5, 50)
+NUM_VALUES = 10000
+NUM_CHOICES = 10000
+
+
+def create_model(num_fields):
+    """
+    Return a model with ``num_fields`` fields, of several types.
+    """
+    from django.db import models
+
+    field_types = [
+        lambda: models.CharField(max_length=100),
+        models.IntegerField,
+        models.DateField,
+        models.BooleanField,
+        lambda: models.DecimalField(max_digits=10, decimal_places=2),
+    ]
+    attrs = {
+        "__module__": __name__,
+        "Meta": type("Meta", (), {"app_label": "tests"}),
+    }
+    for i in range(num_fields):
+        attrs["field%d" % i] = field_types[i % len(field_types)]()
+    return type("Wide%d" % num_fields, (models.Model,), attrs)
+
+
+def get_data(model, num_params):
+    """
+    Return valid params for the filters of the model's first fields.
+    """
+    from django.db import models
+
+    data = {}
+    # skip the primary key
+    fields = model._meta.concrete_fields[1:]
+    for field in fields[:num_params]:
+        if isinstance(field, models.DateField):
+            data[field.name] = "2020-01-01"
+        elif isinstance(field, models.BooleanField):
+            data[field.name] = "true"
+        elif isinstance(field, (models.IntegerField, models.DecimalField)):
+            data[field.name] = "1"
+        else:
+            data[field.name] = "value"
+    return data
+
+
+def compile_qs(filterset):
+    qs = filterset.qs
+    return qs.query.get_compiler(using=qs.db).as_sql()
+
+
+def bench_filtersets(results, models):
+    from django_filters.filterset import filterset_factory
+
+    for num_fields, model in models.items():
+        filterset_class = filterset_factory(model, fields="__all__")
+        results["class creation (%d fields)" % num_fields] = measure(
+            lambda: filterset_factory(model, fields="__all__")
+        )
+        results["instantiation (%d fields)" % num_fields] = measure(filterset_class)
+
+    filterset_class = filterset_factory(models[100], fields="__all__")
+    for num_params in ACTIVE_PARAMS:
+        data = get_data(models[100], num_params)
+        assert filterset_class(data).is_valid()
+
+        results["validation (%d params)" % num_params] = measure(
+            lambda: filterset_class(data).is_valid()
+        )
+        results["filter and compile (%d params)" % num_params] = measure(
+            lambda: compile_qs(filterset_class(data))
+        )
+
+
+def bench_ordering(results, models):
+    from django_filters.filters import OrderingFilter
+    from django_filters.filterset import FilterSet
+
+    model = models[500]
+    names = [field.name for field in model._meta.concrete_fields]
+
+    class Meta:
+        fields = []
+
+    Meta.model = model
+
+    def create_filterset():
+        attrs = {"Meta": Meta, "o": OrderingFilter(fields=names)}
+        return type("OrderingFilterSet", (FilterSet,), attrs)
+
+    filterset_class = create_filterset()
+    data = {"o": "-field1,field2,field3"}
+    assert filterset_class(data).is_valid()
+
+    results["ordering class creation (500 fields)"] = measure(create_filterset)
+    results["ordering validation (500 fields)"] = measure(
+        lambda: filterset_class(data).is_valid()
+    )
+    results["ordering filter and compile (500 fields)"] = measure(
+        lambda: compile_qs(filterset_class(data))
+    )
+
+
+def bench_csv(results):
+    from django_filters.filters import BaseInFilter, NumberFilter
+    from django_filters.filterset import FilterSet
+    from tests.models import User
+
+    class NumberInFilter(BaseInFilter, NumberFilter):
+        pass
+
+    class UserFilter(FilterSet):
+        id = NumberInFilter(lookup_expr="in")
+
+        class Meta:
+            model = User
+            fields = []
+
+    data = {"id": ",".join(str(i) for i in range(NUM_VALUES))}
+    assert UserFilter(data).is_valid()
+
+    results["CSV __in validation (%d values)" % NUM_VALUES] = measure(
+        lambda: UserFilter(data).is_valid()
+    )
+
+
+def bench_rendering(results):
+    from django_filters.filters import ChoiceFilter, MultipleChoiceFilter
+    from django_filters.filterset import FilterSet
+    from tests.models import User
+
+    choices = [(i, "Choice %d" % i) for i in range(NUM_CHOICES)]
+
+    class UserFilter(FilterSet):
+        status = ChoiceFilter(choices=choices)
+        statuses = MultipleChoiceFilter(field_name="status", choices=choices)
+
+        class Meta:
+            model = User
+            fields = []
+
+    results["render select (%d choices)" % NUM_CHOICES] = measure(
+        lambda: str(UserFilter({"status": "1"}).form["status"])
+    )
+    results["render select multiple (%d choices)" % NUM_CHOICES] = measure(
+        lambda: str(UserFilter({"statuses": ["1", "2"]}).form["statuses"])
+    )
+
+
+def main():
+    args = parse_args(__doc__)
+    setup_django()
+
+    models = {num_fields: create_model(num_fields) for num_fields in FIELD_COUNTS}
+    results = {}
+    bench_filtersets(results, models)
+    bench_ordering(results, models)
+    bench_csv(results)
+    bench_rendering(results)
+    report(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Time the queries of representative ``FilterSet``\\s against a large synthetic
+dataset, with foreign key, many-to-many and reverse relations, and skewed
+distributions of values.
+
+The dataset is generated in the test database, which is in-memory for
+SQLite, unless ``--database-file`` is given. The file is kept, so that the
+dataset is only generated once per scale. With ``--scale 1000000``, the
+dataset has about 1,000,000 users, 2,500,000 favorites and 2,000,000
+comments. Each query is timed as a count, and as a fetch of the first page.
+"""
+
+import datetime
+import itertools
+import random
+
+from .utils import measure, parse_args, report, setup_django
+
+PAGE_SIZE = 25
+BATCH_SIZE = 10000
+WORDS = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel"]
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--scale",
+        type=int,
+        default=100000,
+        help="The number of users. Defaults to 100,000.",
+    )
+    parser.add_argument(
+        "--database-file",
+        help="A SQLite file for the dataset, which is kept between runs.",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="The random seed. Defaults to 0."
+    )
+
+
+def zipf_weights(n, s=1.1):
+    """
+    Return cumulative weights of a Zipf distribution over ``n`` items, so
+    that the first items are much more frequent than the last.
+    """
+    return list(itertools.accumulate(1 / (i + 1) ** s for i in range(n)))
+
+
+def bulk_create(model, objects):
+    objects = iter(objects)
+    while True:
+        batch = list(itertools.islice(objects, BATCH_SIZE))
+        if not batch:
+            return
+        model.objects.bulk_create(batch)
+
+
+def generate(scale, seed):
+    """
+    Generate the dataset, unless it was generated for the scale.
+    """
+    from tests.models import Book, Comment, User
+
+    if User.objects.count() == scale:
+        return
+    Favorite = User.favorite_books.through
+    for model in (Comment, Favorite, User, Book):
+        model.objects.all().delete()
+
+    rng = random.Random(seed)
+    num_books = max(scale // 100, 100)
+    today = datetime.date.today()
+
+    bulk_create(
+        Book,
+        (
+            Book(title="book %d" % i, price="%d.99" % (i % 50), average_rating=i % 5)
+            for i in range(num_books)
+        ),
+    )
+    bulk_create(
+        User,
+        (
+            User(
+                username="%s%s%d" % (rng.choice(WORDS), rng.choice(WORDS), i),
+                first_name="",
+                last_name="",
+                # most users have the first status
+                status=rng.choices((0, 1, 2), weights=(80, 15, 5))[0],
+                is_active=rng.random() < 0.9,
+            )
+            for i in range(scale)
+        ),
+    )
+
+    book_ids = list(Book.objects.order_by("pk").values_list("pk", flat=True))
+    user_ids = list(User.objects.order_by("pk").values_list("pk", flat=True))
+    book_weights = zipf_weights(len(book_ids))
+    user_weights = zipf_weights(len(user_ids))
+
+    def favorites():
+        for user_id in user_ids:
+            count = min(int(rng.expovariate(0.4)), 20)
+            books = set(rng.choices(book_ids, cum_weights=book_weights, k=count))
+            for book_id in books:
+                yield Favorite(user_id=user_id, book_id=book_id)
+
+    def comments():
+        authors = rng.choices(user_ids, cum_weights=user_weights, k=scale * 2)
+        for author_id in authors:
+            # recent dates are more frequent
+            days = min(int(rng.expovariate(1 / 90)), 3 * 365)
+            yield Comment(
+                text="%s %s" % (rng.choice(WORDS), rng.choice(WORDS)),
+                author_id=author_id,
+                date=today - datetime.timedelta(days=days),
+                time=datetime.time(rng.randrange(24), rng.randrange(60)),
+            )
+
+    bulk_create(Favorite, favorites())
+    bulk_create(Comment, comments())
+
+
+def get_filtersets():
+    from django_filters import filters
+    from django_filters.filterset import FilterSet
+    from tests.models import Book, Comment, User
+
+    class UserFilter(FilterSet):
+        username = filters.CharFilter(lookup_expr="icontains")
+        books = filters.ModelMultipleChoiceFilter(
+            field_name="favorite_books", queryset=Book.objects.all(), distinct=True
+        )
+        books_nodistinct = filters.ModelMultipleChoiceFilter(
+            field_name="favorite_books", queryset=Book.objects.all(), distinct=False
+        )
+        books_conjoined = filters.ModelMultipleChoiceFilter(
+            field_name="favorite_books", queryset=Book.objects.all(), conjoined=True
+        )
+        commented = filters.DateRangeFilter(field_name="comments__date", distinct=True)
+        status = filters.ChoiceFilter(choices=[(0, "0"), (1, "1"), (2, "2")])
+
+        class Meta:
+            model = User
+            fields = []
+
+    class CommentFilter(FilterSet):
+        date = filters.DateRangeFilter()
+        text = filters.CharFilter(lookup_expr="icontains")
+        author = filters.ModelChoiceFilter(queryset=User.objects.all())
+        o = filters.OrderingFilter(fields=["date", "time", "author"])
+
+        class Meta:
+            model = Comment
+            fields = []
+
+    return UserFilter, CommentFilter
+
+
+def get_cases():
+    from tests.models import Book, User
+
+    UserFilter, CommentFilter = get_filtersets()
+    popular = [
+        str(pk) for pk in Book.objects.order_by("pk")[:3].values_list("pk", flat=True)
+    ]
+    # the most prolific author, with a skewed share of the comments
+    author = str(User.objects.order_by("pk").values_list("pk", flat=True)[0])
+
+    return {
+        "M2M multiple choice, distinct": (UserFilter, {"books": popular}),
+        "M2M multiple choice, no distinct": (
+            UserFilter,
+            {"books_nodistinct": popular},
+        ),
+        "M2M multiple choice, conjoined": (
+            UserFilter,
+            {"books_conjoined": popular[:2]},
+        ),
+        "reverse FK date range, distinct": (UserFilter, {"commented": "week"}),
+        "icontains": (UserFilter, {"username": "hoteldelta"}),
+        "icontains and choice": (UserFilter, {"username": "echo", "status": "1"}),
+        "DateRangeFilter": (CommentFilter, {"date": "month"}),
+        "FK ModelChoice": (CommentFilter, {"author": author}),
+        "ordering": (CommentFilter, {"o": "-date,time"}),
+        "date range and ordering": (CommentFilter, {"date": "year", "o": "-date"}),
+    }
+
+
+def main():
+    args = parse_args(__doc__, add_arguments)
+    setup_django(args.database_file)
+    generate(args.scale, args.seed)
+
+    results = {}
+    for name, (filterset_class, data) in get_cases().items():
+        filterset = filterset_class(data)
+        assert filterset.is_valid(), filterset.errors
+        qs = filterset.qs
+
+        count = measure(lambda: qs.count(), number=1, repeat=3)
+        count["rows"] = qs.count()
+        results["%s (count)" % name] = count
+        results["%s (page)" % name] = measure(
+            lambda: list(qs[:PAGE_SIZE]), number=1, repeat=3
+        )
+    report(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Drive a ``FilterView`` and REST framework views filtered by the
+``DjangoFilterBackend`` with concurrent requests from threads, and report the
+throughput and the latency percentiles at each concurrency.
+
+By default, the requests are served by a threaded WSGI server on localhost,
+like a gthread worker, so that contention on shared state, such as
+``Filter.creation_counter``, the settings and the lazily built classes, shows
+up as lower throughput and higher latency as the concurrency grows. With
+``--client``, the requests are made in-process with the test client instead.
+The views with ``filterset_fields`` create a ``FilterSet`` class per request.
+"""
+
+import functools
+import http.client
+import itertools
+import threading
+import time
+
+from .utils import parse_args, report_json, setup_django
+
+NUM_BOOKS = 1000
+PAGE_SIZE = 25
+PARAMS = [
+    "title=book+1",
+    "price=9.99",
+    "average_rating=3",
+    "title=book+2&average_rating=1",
+    "",
+]
+
+urlpatterns = []
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--concurrency",
+        default="1,4,16",
+        help="A comma separated list of thread counts. Defaults to 1,4,16.",
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=2000,
+        help="The number of requests per view and concurrency. Defaults to 2,000.",
+    )
+    parser.add_argument(
+        "--client",
+        action="store_true",
+        help="Make the requests with the test client instead of a WSGI server.",
+    )
+
+
+def get_urlpatterns():
+    from django.urls import path
+    from rest_framework import pagination, serializers, viewsets
+
+    from django_filters import filters
+    from django_filters.filterset import FilterSet
+    from django_filters.rest_framework import DjangoFilterBackend
+    from django_filters.views import FilterView
+    from tests.models import Book
+
+    class BookFilter(FilterSet):
+        title = filters.CharFilter()
+        price = filters.NumberFilter()
+        average_rating = filters.NumberFilter()
+
+        class Meta:
+            model = Book
+            fields = []
+
+    class BookSerializer(serializers.ModelSerializer):
+        class Meta:
+            model = Book
+            fields = ["id", "title", "price", "average_rating"]
+
+    class BookPagination(pagination.PageNumberPagination):
+        page_size = PAGE_SIZE
+
+    class BookViewSet(viewsets.ReadOnlyModelViewSet):
+        queryset = Book.objects.order_by("pk")
+        serializer_class = BookSerializer
+        filter_backends = [DjangoFilterBackend]
+        filterset_class = None
+        filterset_fields = None
+        pagination_class = BookPagination
+
+    fields = ["title", "price", "average_rating"]
+    actions = {"get": "list"}
+    return [
+        path(
+            "view/",
+            FilterView.as_view(
+                queryset=Book.objects.order_by("pk"),
+                filterset_class=BookFilter,
+                paginate_by=PAGE_SIZE,
+                template_name="tests/book_filter.html",
+            ),
+        ),
+        path(
+            "view-fields/",
+            FilterView.as_view(
+                model=Book,
+                queryset=Book.objects.order_by("pk"),
+                filterset_fields=fields,
+                paginate_by=PAGE_SIZE,
+                template_name="tests/book_filter.html",
+            ),
+        ),
+        path("api/", BookViewSet.as_view(actions, filterset_class=BookFilter)),
+        path("api-fields/", BookViewSet.as_view(actions, filterset_fields=fields)),
+    ]
+
+
+def get_targets():
+    return {
+        "FilterView": "/view/",
+        "FilterView (filterset_fields)": "/view-fields/",
+        "DjangoFilterBackend": "/api/",
+        "DjangoFilterBackend (filterset_fields)": "/api-fields/",
+    }
+
+
+def create_data():
+    from tests.models import Book
+
+    Book.objects.bulk_create(
+        Book(title="book %d" % (i % 10), price="%d.99" % (i % 10), average_rating=i % 5)
+        for i in range(NUM_BOOKS)
+    )
+
+
+def start_server():
+    """
+    Start a threaded WSGI server on a free localhost port, and return it.
+    """
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+
+    class RequestHandler(WSGIRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadedWSGIServer(("127.0.0.1", 0), RequestHandler)
+    server.set_app(WSGIHandler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def get_client_request():
+    from django.test import Client
+
+    client = Client()
+
+    def request(url):
+        return client.get(url).status_code
+
+    return request
+
+
+def get_server_request(server):
+    host, port = server.server_address
+
+    def request(url):
+        connection = http.client.HTTPConnection(host, port)
+        try:
+            connection.request("GET", url)
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        finally:
+            connection.close()
+
+    return request
+
+
+def run(get_request, url, concurrency, num_requests):
+    """
+    Make the requests from ``concurrency`` threads, returning the latencies
+    in seconds, the number of errors, and the elapsed time.
+    """
+    urls = ["%s?%s" % (url, params) for params in PARAMS]
+    per_thread = max(num_requests // concurrency, 1)
+    barrier = threading.Barrier(concurrency + 1)
+    latencies = []
+    errors = []
+
+    def worker():
+        request = get_request()
+        thread_latencies = []
+        thread_errors = 0
+        barrier.wait()
+        for url in itertools.islice(itertools.cycle(urls), per_thread):
+            start = time.perf_counter()
+            if request(url) != 200:
+                thread_errors += 1
+            thread_latencies.append(time.perf_counter() - start)
+        latencies.extend(thread_latencies)
+        errors.append(thread_errors)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return latencies, sum(errors), time.perf_counter() - start
+
+
+def measure_load(get_request, url, concurrency, num_requests):
+    from django_filters.samples import percentile
+
+    # warm up the caches, and the server's connections
+    run(get_request, url, concurrency, concurrency * len(PARAMS))
+    latencies, errors, elapsed = run(get_request, url, concurrency, num_requests)
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+    }
+
+
+def main():
+    args = parse_args(__doc__, add_arguments)
+    setup_django()
+
+    from django.conf import settings
+
+    urlpatterns[:] = get_urlpatterns()
+    settings.ROOT_URLCONF = __name__
+    # the paginated responses build absolute URLs
+    settings.ALLOWED_HOSTS = ["*"]
+    create_data()
+
+    if args.client:
+        get_request = get_client_request
+    else:
+        server = start_server()
+        get_request = functools.partial(get_server_request, server)
+
+    results = {}
+    for name, url in get_targets().items():
+        for concurrency in map(int, args.concurrency.split(",")):
+            results["%s (%d threads)" % (name, concurrency)] = measure_load(
+                get_request, url, concurrency, args.requests
+            )
+
+    if args.json:
+        report_json(results)
+    else:
+        report_load(results)
+
+
+def report_load(results):
+    width = max(len(name) for name in results)
+    print(
+        "%s  %10s  %10s  %10s  %10s  %6s"
+        % ("".ljust(width), "req/s", "p50 (ms)", "p95 (ms)", "p99 (ms)", "errors")
+    )
+    for name, result in results.items():
+        print(
+            "%s  %10.1f  %10.3f  %10.3f  %10.3f  %6d"
+            % (
+                name.ljust(width),
+                result["throughput"],
+                result["p50"] * 1e3,
+                result["p95"] * 1e3,
+                result["p99"] * 1e3,
+                result["errors"],
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Measure the memory of ``FilterSet`` instantiation and validation cycles with
+``tracemalloc``, and check that repeated cycles do not leak objects.
+
+For each phase of a cycle, the memory that is allocated and still alive at
+the end of the phase is reported, broken down by the allocating module, along
+with the peak memory of the cycle, and the memory that survives the cycle.
+
+The leak check runs ``--cycles`` cycles, and counts the live objects of each
+type, and the live classes of each name, at checkpoints. It fails if a count
+grows by more than ``TOLERANCE`` from the first checkpoint to the last, e.g.
+when a class is created for each instance and kept alive.
+"""
+
+import copy
+import gc
+import os
+import sys
+import tracemalloc
+from collections import Counter
+
+from .utils import parse_args, report_json, setup_django
+
+FRAMES = 50
+CHECKPOINTS = 10
+TOLERANCE = 100
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--cycles",
+        type=int,
+        default=100000,
+        help="The number of cycles of the leak check. Defaults to 100,000.",
+    )
+
+
+def get_modules():
+    """
+    Return the ``(name, path)`` of the modules that allocations are broken
+    down by, with more specific paths first.
+    """
+    import django.db
+    import django.forms
+
+    import django_filters
+    import django_filters.filters
+
+    def directory(module):
+        return os.path.dirname(module.__file__) + os.sep
+
+    return [
+        ("copy", copy.__file__),
+        ("django.forms", directory(django.forms)),
+        ("django.db", directory(django.db)),
+        ("django_filters.filters", django_filters.filters.__file__),
+        ("django_filters", directory(django_filters)),
+    ]
+
+
+def get_module(traceback, modules):
+    """
+    Return the name of the module of the innermost frame of the traceback
+    that belongs to one of the modules, or "other".
+    """
+    for frame in reversed(traceback):
+        for name, path in modules:
+            if frame.filename == path or frame.filename.startswith(path):
+                return name
+    return "other"
+
+
+def compare(before, after, modules):
+    """
+    Return the size and number of the blocks allocated between the snapshots
+    that are still alive, in total and by module.
+    """
+    by_module = Counter()
+    size = blocks = 0
+    for stat in after.compare_to(before, "traceback"):
+        if stat.size_diff <= 0:
+            continue
+        size += stat.size_diff
+        blocks += max(stat.count_diff, 0)
+        by_module[get_module(stat.traceback, modules)] += stat.size_diff
+    return {"size": size, "blocks": blocks, "modules": dict(by_module.most_common())}
+
+
+def get_filterset():
+    from django_filters import filters
+    from django_filters.filterset import FilterSet
+    from tests.models import STATUS_CHOICES, Book, User
+
+    class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+        pass
+
+    class UserFilter(FilterSet):
+        username = filters.CharFilter(lookup_expr="icontains")
+        status = filters.ChoiceFilter(choices=STATUS_CHOICES)
+        ids = NumberInFilter(field_name="id", lookup_expr="in")
+        books = filters.ModelMultipleChoiceFilter(
+            field_name="favorite_books", queryset=Book.objects.all()
+        )
+        o = filters.OrderingFilter(fields=["username", "status"])
+
+        class Meta:
+            model = User
+            fields = ["is_active", "first_name", "last_name"]
+
+    return UserFilter
+
+
+def get_data():
+    from tests.models import Book
+
+    book = Book.objects.create(title="a", price="1.00", average_rating=1)
+    valid = {
+        "username": "alex",
+        "status": "1",
+        "ids": "1,2,3",
+        "books": [str(book.pk)],
+        "o": "-status",
+        "is_active": "true",
+    }
+    invalid = {"status": "x", "ids": "a,b", "books": ["0"]}
+    return valid, invalid
+
+
+def profile_cycle(filterset_class, data, modules, number=100):
+    """
+    Return the memory of the phases of a cycle, and the memory that survives
+    ``number`` cycles, per cycle.
+    """
+    results = {}
+    gc.collect()
+    tracemalloc.start(FRAMES)
+    try:
+        baseline = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+
+        filterset = filterset_class(data)
+        instantiated = tracemalloc.take_snapshot()
+        filterset.is_valid()
+        str(filterset.qs.query)
+        validated = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+
+        results["instantiation"] = compare(baseline, instantiated, modules)
+        results["validation"] = compare(instantiated, validated, modules)
+        results["peak"] = {"size": peak - start}
+
+        del filterset, instantiated, validated
+        gc.collect()
+        baseline = tracemalloc.take_snapshot()
+        for _ in range(number):
+            filterset = filterset_class(data)
+            filterset.is_valid()
+        del filterset
+        gc.collect()
+        surviving = compare(baseline, tracemalloc.take_snapshot(), modules)
+        surviving["size"] //= number
+        surviving["blocks"] //= number
+        surviving["modules"] = {
+            name: size // number for name, size in surviving["modules"].items()
+        }
+        results["surviving per cycle"] = surviving
+    finally:
+        tracemalloc.stop()
+    return results
+
+
+def count_types():
+    """
+    Return the counts of the live objects by type, and of the live classes
+    by name.
+    """
+    counts = Counter()
+    for obj in gc.get_objects():
+        counts[type(obj).__qualname__] += 1
+        if isinstance(obj, type):
+            counts["class %s" % obj.__qualname__] += 1
+    return counts
+
+
+def check_leaks(filterset_class, datasets, cycles):
+    """
+    Run the cycles, and return the type counts that grew by more than the
+    tolerance, as a dict of the counts at each checkpoint.
+    """
+    interval = max(cycles // CHECKPOINTS, 1)
+    checkpoints = []
+    for i in range(cycles):
+        filterset = filterset_class(datasets[i % len(datasets)])
+        filterset.is_valid()
+        filterset.form.errors
+        if (i + 1) % interval == 0:
+            del filterset
+            gc.collect()
+            checkpoints.append(count_types())
+
+    first, last = checkpoints[0], checkpoints[-1]
+    return {
+        name: [counts[name] for counts in checkpoints]
+        for name in last
+        if last[name] - first[name] > TOLERANCE
+    }
+
+
+def main():
+    args = parse_args(__doc__, add_arguments)
+    setup_django()
+
+    filterset_class = get_filterset()
+    valid, invalid = get_data()
+    modules = get_modules()
+
+    # warm up the caches of the filterset and the forms
+    for data in (valid, invalid):
+        filterset_class(data).is_valid()
+
+    results = {
+        "valid params": profile_cycle(filterset_class, valid, modules),
+        "invalid params": profile_cycle(filterset_class, invalid, modules),
+    }
+    leaks = check_leaks(filterset_class, [valid, invalid], args.cycles)
+    results["leak check"] = {"cycles": args.cycles, "leaks": leaks}
+
+    if args.json:
+        report_json(results)
+    else:
+        report_memory(results)
+    if leaks:
+        sys.exit(1)
+
+
+def report_memory(results):
+    for name in ("valid params", "invalid params"):
+        print(name)
+        for phase, memory in results[name].items():
+            line = "  %-20s %10d bytes" % (phase, memory["size"])
+            if "blocks" in memory:
+                line += " in %d blocks" % memory["blocks"]
+            print(line)
+            for module, size in memory.get("modules", {}).items():
+                print("    %-24s %10d bytes" % (module, size))
+
+    check = results["leak check"]
+    if not check["leaks"]:
+        print("leak check: no growth in %d cycles" % check["cycles"])
+    for name, counts in check["leaks"].items():
+        print("leak check: %s grew %s" % (name, " -> ".join(map(str, counts))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Compare the legacy OR-of-equalities compilation of ``MultipleChoiceFilter``
+against the collapsed ``__in`` lookup, for 1,000 selected values.
+
+Note that SQLite refuses to execute the OR chain, as its expression tree is
+deeper than SQLite's limit of 1,000.
+"""
+
+from functools import reduce
+from operator import or_
+
+from .utils import measure, measure_or_error, parse_args, report, setup_django
+
+NUM_ROWS = 10000
+NUM_VALUES = 1000
+
+
+def main():
+    args = parse_args(__doc__)
+    setup_django()
+
+    from django.db import DatabaseError
+    from django.db.models import Q
+
+    from django_filters.filters import MultipleChoiceFilter
+    from tests.models import User
+
+    User.objects.bulk_create(
+        User(username="user%d" % i, first_name="", last_name="", status=i % 3)
+        for i in range(NUM_ROWS)
+    )
+    values = list(User.objects.values_list("pk", flat=True)[:NUM_VALUES])
+    queryset = User.objects.all()
+
+    def or_chain():
+        return queryset.filter(reduce(or_, (Q(pk=v) for v in values)))
+
+    def collapsed():
+        return MultipleChoiceFilter(field_name="pk", distinct=False).filter(
+            queryset, values
+        )
+
+    def compile(build):
+        return lambda: build().query.get_compiler(using=queryset.db).as_sql()
+
+    def evaluate(build):
+        return lambda: list(build())
+
+    report(
+        {
+            "compile OR chain": measure(compile(or_chain)),
+            "compile IN lookup": measure(compile(collapsed)),
+            "query OR chain": measure_or_error(evaluate(or_chain), DatabaseError),
+            "query IN lookup": measure(evaluate(collapsed)),
+        },
+        args.json,
+    )
+
+
+if __name__ == "__main__":
+    main()
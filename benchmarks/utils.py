@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+
+
+def setup_django(database_file=None):
+    """
+    Configure Django with the test settings, and create the test database.
+    With SQLite, the ``database_file`` is used as the test database, and is
+    kept between runs.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+
+    import django
+    from django.db import connection
+
+    django.setup()
+    if database_file:
+        connection.settings_dict["TEST"]["NAME"] = database_file
+    connection.creation.create_test_db(verbosity=0, keepdb=bool(database_file))
+
+
+def measure(func, number=None, repeat=5):
+    """
+    Time ``func``, returning the per-call timings in seconds.
+    """
+    timer = timeit.Timer(func)
+    if number is None:
+        number, _ = timer.autorange()
+
+    timings = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def measure_or_error(func, *errors, **kwargs):
+    """
+    Time ``func`` as with ``measure()``, recording any of the expected
+    ``errors`` instead of raising.
+    """
+    try:
+        func()
+    except errors as e:
+        return {"error": str(e)}
+    return measure(func, **kwargs)
+
+
+def parse_args(description, add_arguments=None):
+    """
+    Parse the command line options that are common to the benchmarks, and
+    those added by the ``add_arguments(parser)`` callable.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the results as JSON, with the versions they were run with.",
+    )
+    if add_arguments is not None:
+        add_arguments(parser)
+    return parser.parse_args()
+
+
+def report_json(results):
+    """
+    Print the results as JSON, with the versions they were run with.
+    """
+    import django
+
+    import django_filters
+
+    data = {
+        "benchmark": os.path.basename(sys.argv[0]).rsplit(".", 1)[0],
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "django_filters": django_filters.__version__,
+        "results": results,
+    }
+    print(json.dumps(data, indent=2))
+
+
+def report(results, as_json=False):
+    """
+    Print a table of ``{name: timings}`` results, in milliseconds, or the
+    results in seconds as JSON, for comparing runs over time.
+    """
+    if as_json:
+        report_json(results)
+        return
+
+    width = max(len(name) for name in results)
+    print("%s  %12s  %12s" % ("".ljust(width), "min (ms)", "median (ms)"))
+    for name, timings in results.items():
+        if "error" in timings:
+            print("%s  error: %s" % (name.ljust(width), timings["error"]))
+            continue
+        print(
+            "%s  %12.3f  %12.3f"
+            % (name.ljust(width), timings["min"] * 1e3, timings["median"] * 1e3)
+        )
@@ -11,6 +11,34 @@ DEFAULTS = {
     "EMPTY_CHOICE_LABEL": "---------",
     "NULL_CHOICE_LABEL": None,
     "NULL_CHOICE_VALUE": "null",
+    # cache alias for FilterSet.facets()
+    "FACETS_CACHE": "default",
+    # facets are sampled for querysets of more rows than this
+    "FACETS_SAMPLE_THRESHOLD": 100000,
+    # seconds between reloads of the column statistics
+    "STATS_REFRESH_INTERVAL": 300,
+    # distinct values above which an AllValuesFilter is reported
+    "STATS_HIGH_CARDINALITY": 1000,
+    # "file:<path>" or "cache:<alias>" to record filter combinations
+    "WORKLOAD_STORE": None,
+    # seconds between writes of the recorded filter combinations
+    "WORKLOAD_FLUSH_INTERVAL": 60,
+    # directory of the metrics files of each process
+    "METRICS_DIR": None,
+    # seconds above which filterset validation and evaluation are logged
+    "SLOW_THRESHOLD": None,
+    # seconds between slow log records of the same request shape
+    "SLOW_LOG_INTERVAL": 60,
+    # path of a JSON lines file to record filterset params to
+    "SAMPLE_FILE": None,
+    # fraction of the evaluated filtersets that are recorded
+    "SAMPLE_RATE": 0.01,
+    # directory to write the sampled stacks of slow requests to
+    "PROFILE_DIR": None,
+    # seconds above which the sampled stacks of a request are written
+    "PROFILE_THRESHOLD": 1.0,
+    # seconds between samples of a request's stack
+    "PROFILE_INTERVAL": 0.005,
     "VERBOSE_LOOKUPS": {
         # transforms don't need to be verbose, since their expressions are chained
         "date": _("date"),
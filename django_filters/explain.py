@@ -0,0 +1,131 @@
+"""
+Diagnostics of the SQL that each filter of a ``FilterSet`` contributes.
+"""
+
+import re
+
+from django.core.exceptions import EmptyResultSet, FullResultSet
+from django.db import NotSupportedError, connections
+
+from .constants import EMPTY_VALUES
+
+# Patterns of the database plans that scan a whole table, by vendor.
+SEQ_SCAN_PATTERNS = {
+    "postgresql": re.compile(r"\bSeq Scan\b"),
+    "sqlite": re.compile(r"\bSCAN (?!.*\bUSING\b)(?!CONSTANT)", re.MULTILINE),
+    "mysql": re.compile(r"\tALL\t|\bTable scan\b"),
+    "oracle": re.compile(r"\bTABLE ACCESS FULL\b"),
+}
+
+
+def explain_filterset(filterset, **options):
+    """
+    Apply the filterset's active filters one at a time, and return a dict of
+    the SQL each filter contributes, along with the database's plan for the
+    filtered queryset. See ``BaseFilterSet.explain()``.
+    """
+    queryset = filterset.queryset.all()
+    # alias the base table, so that only joins are counted as new aliases
+    queryset.query.get_initial_alias()
+
+    steps = []
+    if filterset.is_bound:
+        filterset.errors
+        for name, value in filterset.get_filter_values():
+            if value in EMPTY_VALUES:
+                continue
+            filtered = filterset.filters[name].filter(queryset, value)
+            if filtered is queryset:
+                # the filter ignored the value
+                continue
+            steps.append(explain_filter(name, value, queryset, filtered))
+            queryset = filtered
+            if queryset.query.is_empty():
+                break
+
+    result = {"filters": steps, "sql": None, "plan": None, "seq_scan": None}
+    if queryset.query.is_empty():
+        return result
+
+    result["sql"] = str(queryset.query)
+    try:
+        result["plan"] = queryset.explain(**options)
+    except NotSupportedError:
+        return result
+    result["seq_scan"] = has_seq_scan(result["plan"], connections[queryset.db].vendor)
+    return result
+
+
+def explain_filter(name, value, before, after):
+    """
+    Return a dict that describes the difference between the queryset
+    ``before`` and ``after`` the filter was applied.
+    """
+    aliases, after_aliases = get_aliases(before.query), get_aliases(after.query)
+    joins = [
+        join.table_name for alias, join in after_aliases.items() if alias not in aliases
+    ]
+
+    # Filters add their conditions to the end of the WHERE clause, unless they
+    # replaced the queryset, e.g. by a union.
+    where, count = after.query.where, len(before.query.where.children)
+    nodes = where.children[count:]
+    if (
+        where.connector != before.query.where.connector
+        or where.negated
+        or where.children[:count] != before.query.where.children
+    ):
+        nodes = [where]
+
+    sql, params = compile_where(after, nodes)
+    return {
+        "name": name,
+        "value": value,
+        "sql": sql,
+        "params": params,
+        "joins": joins,
+        "aliases": (len(aliases), len(after_aliases)),
+        "distinct": bool(after.query.distinct) and not before.query.distinct,
+        "empty": after.query.is_empty(),
+    }
+
+
+def get_aliases(query):
+    # joins that were trimmed from the query keep their alias, unreferenced
+    return {
+        alias: join
+        for alias, join in query.alias_map.items()
+        if query.alias_refcount[alias]
+    }
+
+
+def compile_where(queryset, nodes):
+    """
+    Return the SQL and params of the WHERE clause nodes, joined with AND.
+    """
+    compiler = queryset.query.get_compiler(queryset.db)
+    parts, params = [], []
+    for node in nodes:
+        try:
+            sql, node_params = compiler.compile(node)
+        except EmptyResultSet:
+            sql, node_params = "0 = 1", []
+        except FullResultSet:
+            continue
+        parts.append(sql)
+        params.extend(node_params)
+
+    if len(parts) > 1:
+        parts = ["(%s)" % part for part in parts]
+    return " AND ".join(parts), params
+
+
+def has_seq_scan(plan, vendor):
+    """
+    Return True if the plan reads a whole table, or None if the plans of the
+    database ``vendor`` are not known.
+    """
+    pattern = SEQ_SCAN_PATTERNS.get(vendor)
+    if pattern is None:
+        return None
+    return bool(pattern.search(plan))
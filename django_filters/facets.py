@@ -0,0 +1,342 @@
+"""
+Faceted counts for the choice and range filters of a ``FilterSet``.
+
+A facet is the number of results for each choice of a filter, counted over
+the queryset as filtered by every *other* filter. A histogram is the number
+of results in each bucket of a range filter's values. Each facet and each
+histogram is computed with a single grouped or aggregate query.
+"""
+
+import datetime
+import hashlib
+import math
+
+from django.core.exceptions import EmptyResultSet
+from django.db.models import (
+    BigIntegerField,
+    Count,
+    IntegerField,
+    Max,
+    Min,
+    Model,
+    Q,
+    QuerySet,
+)
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.functions import Cast, Trunc
+from django.utils.translation import gettext_lazy as _
+
+from .filters import (
+    BooleanFilter,
+    ChoiceFilter,
+    DateFromToRangeFilter,
+    DateRangeFilter,
+    DateTimeFromToRangeFilter,
+    MultipleChoiceFilter,
+    NumericRangeFilter,
+    RangeFilter,
+    TimeRangeFilter,
+)
+from .utils import is_to_many_path
+
+
+def is_facet(filter_):
+    """
+    Return True if the filter matches a choice against a single model field.
+    """
+    return (
+        isinstance(filter_, (BooleanFilter, ChoiceFilter, MultipleChoiceFilter))
+        and not isinstance(filter_, DateRangeFilter)
+        and filter_.method is None
+        and filter_.field_name is not None
+        and filter_.lookup_expr == "exact"
+    )
+
+
+def get_facet_key(filter_):
+    """
+    Return the lookup for the model field the filter's choice values refer to.
+    """
+    to_field_name = filter_.extra.get("to_field_name")
+    if to_field_name:
+        return LOOKUP_SEP.join([filter_.field_name, to_field_name])
+    return filter_.field_name
+
+
+def get_facet_counts(filter_, queryset):
+    """
+    Return a mapping of field values to the number of results in the queryset.
+    """
+    key = get_facet_key(filter_)
+
+    # Grouping by a to-many relationship would reuse any join added by the
+    # queryset's filters, restricting the counted values to those filtered on.
+    if is_to_many_path(queryset.model, key):
+        queryset = queryset.model._base_manager.filter(pk__in=queryset.values("pk"))
+
+    rows = queryset.order_by().values_list(key)
+    rows = rows.annotate(count=Count("pk", distinct=True))
+    return dict(rows)
+
+
+def get_facet_choices(filter_, counts):
+    """
+    Return a list of ``{"value", "label", "count"}`` dicts for the filter's
+    choices, in the order the choices are rendered.
+    """
+    if isinstance(filter_, BooleanFilter):
+        choices = [(True, _("Yes")), (False, _("No"))]
+    else:
+        choices = filter_.field.choices
+
+    # Choice values are compared by their string representation, as
+    # submitted choices may be strings while field values are not.
+    null_count = counts.get(None, 0)
+    counts = {str(value): count for value, count in counts.items()}
+    null_value = getattr(filter_, "null_value", None)
+
+    result = []
+    for value, label in flatten_choices(choices):
+        value = getattr(value, "value", value)
+        if value == "":
+            continue
+        if value == null_value:
+            count = null_count
+        else:
+            count = counts.get(str(value), 0)
+        result.append({"value": value, "label": label, "count": count})
+    return result
+
+
+def flatten_choices(choices):
+    for value, label in choices:
+        if isinstance(label, (list, tuple)):
+            yield from flatten_choices(label)
+        else:
+            yield value, label
+
+
+def get_sample_rate(queryset, sample_size, threshold):
+    """
+    Return ``n`` such that one in ``n`` rows of the queryset is a sample of
+    about ``sample_size`` rows. Querysets with no more rows than the
+    ``threshold`` or the ``sample_size`` are not sampled, and have a rate of 1.
+
+    The rows are counted up to that limit, so that the count is bounded
+    however large the queryset is. Beyond it, the number of rows is estimated
+    from the range of primary keys, rather than counted, as the range can be
+    read from the primary key's index. Models without an integer primary key
+    are not sampled.
+    """
+    pk = queryset.model._meta.pk
+    if not isinstance(pk.target_field if pk.is_relation else pk, IntegerField):
+        return 1
+
+    limit = max(threshold, sample_size)
+    if queryset.order_by()[: limit + 1].count() <= limit:
+        return 1
+
+    bounds = queryset.aggregate(start=Min("pk"), end=Max("pk"))
+    rows = bounds["end"] - bounds["start"] + 1
+    return math.ceil(rows / sample_size)
+
+
+# The sample is selected by a multiplicative hash of the primary key, so that
+# it is deterministic, but not aligned with any periodic pattern in the rows,
+# as a plain modulo of the primary key would be. The product is computed in
+# 64 bits, of the primary key reduced by the modulus, so that it can't
+# overflow, e.g. the 32-bit integers of PostgreSQL's serial primary keys.
+SAMPLE_MULTIPLIER = 1327217885
+SAMPLE_MODULUS = 2147483647
+
+
+def get_sample(queryset, rate):
+    """
+    Return a deterministic sample of one in ``rate`` rows of the queryset.
+    """
+    if rate == 1:
+        return queryset
+    pk = Cast("pk", BigIntegerField()) % SAMPLE_MODULUS
+    queryset = queryset.alias(facet_sample=pk * SAMPLE_MULTIPLIER % SAMPLE_MODULUS)
+    return queryset.filter(facet_sample__lt=SAMPLE_MODULUS // rate)
+
+
+def scale_facet_choices(choices, rate):
+    """
+    Scale the counts of a sampled facet by the sampling ``rate``, and add an
+    ``"error"`` bound of roughly 95% confidence to each count.
+    """
+    result = []
+    for choice in choices:
+        count = choice["count"]
+        # A count of zero is bounded as if a single row was sampled.
+        deviation = math.sqrt(max(count, 1) * (1 - 1 / rate))
+        error = math.ceil(1.96 * deviation * rate)
+        result.append({**choice, "count": count * rate, "error": error})
+    return result
+
+
+def is_histogram(filter_):
+    """
+    Return True if the filter matches a numeric or date range of a single
+    model field.
+    """
+    return (
+        isinstance(filter_, (DateRangeFilter, NumericRangeFilter, RangeFilter))
+        and not isinstance(filter_, TimeRangeFilter)
+        and filter_.method is None
+        and filter_.field_name is not None
+    )
+
+
+def is_date_histogram(filter_):
+    return isinstance(
+        filter_, (DateFromToRangeFilter, DateRangeFilter, DateTimeFromToRangeFilter)
+    )
+
+
+def get_numeric_histogram(filter_, queryset, buckets, start=None, end=None):
+    """
+    Return a list of ``{"start", "end", "count"}`` dicts for ``buckets`` of
+    equal width between ``start`` and ``end``. The bounds default to the
+    smallest and largest values in the queryset, which are found with an
+    additional query before the buckets are counted.
+    """
+    key = filter_.field_name
+    if isinstance(filter_, NumericRangeFilter):
+        # bucket range values by their lower bound
+        key = LOOKUP_SEP.join([key, "startswith"])
+
+    if start is None or end is None:
+        bounds = queryset.aggregate(start=Min(key), end=Max(key))
+        start = bounds["start"] if start is None else start
+        end = bounds["end"] if end is None else end
+    if start is None or end is None or start > end:
+        return []
+
+    buckets = buckets if start < end else 1
+    width = (end - start) / buckets
+    edges = [start + width * i for i in range(buckets)] + [end]
+
+    # each bucket includes its start, and the last bucket also includes its end
+    bounds = list(zip(edges, edges[1:]))
+    aggregates = {}
+    for i, (lo, hi) in enumerate(bounds):
+        last = i == len(bounds) - 1
+        condition = Q(**{key + "__gte": lo, key + ("__lte" if last else "__lt"): hi})
+        aggregates["bucket_%d" % i] = Count("pk", distinct=True, filter=condition)
+    counts = queryset.aggregate(**aggregates)
+
+    return [
+        {"start": lo, "end": hi, "count": counts["bucket_%d" % i]}
+        for i, (lo, hi) in enumerate(bounds)
+    ]
+
+
+def get_date_histogram_kind(value):
+    """
+    Return the period to truncate dates to for the filter's value, drilling
+    down from years, to months, to days as the filtered range narrows.
+    """
+    if isinstance(value, slice):
+        if value.start is None or value.stop is None:
+            return "year"
+        span = value.stop - value.start
+        if span > datetime.timedelta(days=366):
+            return "year"
+        if span > datetime.timedelta(days=31):
+            return "month"
+        return "day"
+
+    # DateRangeFilter choices
+    if value == "year":
+        return "month"
+    if value in ("today", "yesterday", "week", "month"):
+        return "day"
+    return "year"
+
+
+def get_date_histogram(filter_, queryset, kind):
+    """
+    Return a list of ``{"start", "end", "count"}`` dicts for the periods of
+    the given ``kind`` (e.g., "year", "month" or "day") that have results.
+    """
+    rows = queryset.order_by().annotate(period=Trunc(filter_.field_name, kind))
+    rows = rows.values_list("period").annotate(count=Count("pk", distinct=True))
+    rows = rows.order_by("period")
+
+    return [
+        {"start": start, "end": get_period_end(start, kind), "count": count}
+        for start, count in rows
+        if start is not None
+    ]
+
+
+def get_period_end(start, kind):
+    if kind == "year":
+        return add_months(start, 12)
+    if kind == "quarter":
+        return add_months(start, 3)
+    if kind == "month":
+        return add_months(start, 1)
+    if kind == "week":
+        return start + datetime.timedelta(weeks=1)
+    if kind == "day":
+        return start + datetime.timedelta(days=1)
+    raise ValueError("Unsupported histogram period: %r" % kind)
+
+
+def add_months(start, months):
+    month = start.month - 1 + months
+    return start.replace(year=start.year + month // 12, month=month % 12 + 1, day=1)
+
+
+def get_facets_cache_key(filterset, sample_size=None):
+    """
+    Return a cache key for the filterset's facets, which is the same for any
+    data that cleans to the same filter values, regardless of their order.
+    The key includes the choice querysets of the facets, as these may depend
+    on the request, e.g. a callable ``queryset`` that returns the user's
+    objects.
+    """
+    query = get_query_string(filterset.queryset)
+
+    choice_queries = []
+    for name, filter_ in sorted(filterset.filters.items()):
+        field = filterset.form.fields.get(name)
+        if is_facet(filter_) and isinstance(getattr(field, "queryset", None), QuerySet):
+            choice_queries.append((name, get_query_string(field.queryset)))
+
+    params = []
+    if filterset.is_bound:
+        filterset.errors
+        for name, value in sorted(filterset.form.cleaned_data.items()):
+            params.append((name, canonical_value(value)))
+
+    parts = (
+        type(filterset).__module__,
+        type(filterset).__qualname__,
+        query,
+        choice_queries,
+        params,
+        sample_size,
+    )
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return "django_filters.facets.%s" % digest
+
+
+def get_query_string(queryset):
+    try:
+        return str(queryset.query)
+    except EmptyResultSet:
+        return ""
+
+
+def canonical_value(value):
+    if isinstance(value, Model):
+        return value.pk
+    if isinstance(value, slice):
+        return (canonical_value(value.start), canonical_value(value.stop))
+    if isinstance(value, (list, tuple, set, frozenset, QuerySet)):
+        return sorted((canonical_value(v) for v in value), key=repr)
+    return value
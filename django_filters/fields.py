@@ -8,7 +8,7 @@ from django.utils.translation import gettext_lazy as _
 
 from .conf import settings
 from .constants import EMPTY_VALUES
-from .utils import handle_timezone
+from .utils import deduplicate, handle_timezone
 from .widgets import (
     BaseCSVWidget,
     CSVWidget,
@@ -301,17 +301,87 @@ class MultipleChoiceField(ChoiceIteratorMixin, forms.MultipleChoiceField):
         super().__init__(*args, **kwargs)
 
 
-class ModelChoiceField(ChoiceIteratorMixin, forms.ModelChoiceField):
+class ModelChoiceValidationMixin:
+    """
+    Adds the ``validate`` argument to the model choice fields.
+
+    * ``"full"`` (default) validates that each value exists in the field's
+      queryset, and cleans values into model instances.
+    * ``"syntax"`` only coerces each value to the python type of the target
+      model field, without querying the database. Membership of the queryset
+      is then the responsibility of the filter.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.validate_choices = kwargs.pop("validate", "full")
+        assert self.validate_choices in (
+            "full",
+            "syntax",
+        ), "'validate' must be one of 'full' or 'syntax', not %r." % (
+            self.validate_choices,
+        )
+        super().__init__(*args, **kwargs)
+
+    def get_target_field(self):
+        opts = self.queryset.model._meta
+        if self.to_field_name:
+            return opts.get_field(self.to_field_name)
+        return opts.pk
+
+    def coerce_choice(self, value, code="invalid_choice"):
+        """
+        Coerce ``value`` to the python type of the target model field.
+        """
+        if isinstance(value, self.queryset.model):
+            value = getattr(value, self.to_field_name or "pk")
+        try:
+            return self.get_target_field().to_python(value)
+        except (ValueError, TypeError, forms.ValidationError):
+            raise forms.ValidationError(
+                self.error_messages[code],
+                code=code,
+                params={"value": value, "pk": value},
+            )
+
+
+class ModelChoiceField(
+    ChoiceIteratorMixin, ModelChoiceValidationMixin, forms.ModelChoiceField
+):
     iterator = ModelChoiceIterator
 
     def to_python(self, value):
         # bypass the queryset value check
         if self.null_label is not None and value == self.null_value:
             return value
+        if self.validate_choices == "syntax":
+            if value in self.empty_values:
+                return None
+            return self.coerce_choice(value)
         return super().to_python(value)
 
+    def check_choices(self, value):
+        """
+        Perform the queryset membership check that is skipped when validating
+        by ``"syntax"``. Raises a ``ValidationError`` for an unknown choice.
+        """
+        if value in self.empty_values or (
+            self.null_label is not None and value == self.null_value
+        ):
+            return
+        key = self.to_field_name or "pk"
+        if isinstance(value, self.queryset.model):
+            value = getattr(value, key)
+        if not self.queryset.filter(**{key: value}).exists():
+            raise forms.ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
 
-class ModelMultipleChoiceField(ChoiceIteratorMixin, forms.ModelMultipleChoiceField):
+
+class ModelMultipleChoiceField(
+    ChoiceIteratorMixin, ModelChoiceValidationMixin, forms.ModelMultipleChoiceField
+):
     iterator = ModelChoiceIterator
 
     def _check_values(self, value):
@@ -319,6 +389,65 @@ class ModelMultipleChoiceField(ChoiceIteratorMixin, forms.ModelMultipleChoiceFie
         if null:  # remove the null value and any potential duplicates
             value = [v for v in value if v != self.null_value]
 
-        result = list(super()._check_values(value))
+        if self.validate_choices == "syntax":
+            result = self._coerce_values(value)
+        else:
+            result = self._query_values(value)
         result += [self.null_value] if null else []
         return result
+
+    def _coerce_values(self, value):
+        coerced = [self.coerce_choice(v, code="invalid_pk_value") for v in value]
+        return deduplicate(coerced)
+
+    def _query_values(self, value):
+        # Equivalent to `forms.ModelMultipleChoiceField._check_values`, which
+        # deduplicates the values with a frozenset. Its iteration order varies
+        # with hash randomization, and so would the validation query's SQL.
+        key = self.to_field_name or "pk"
+        try:
+            value = deduplicate(value)
+        except TypeError:
+            # list of lists isn't hashable, for example
+            raise forms.ValidationError(
+                self.error_messages["invalid_list"],
+                code="invalid_list",
+            )
+        for pk in value:
+            self.validate_no_null_characters(pk)
+            try:
+                self.queryset.filter(**{key: pk})
+            except (ValueError, TypeError):
+                raise forms.ValidationError(
+                    self.error_messages["invalid_pk_value"],
+                    code="invalid_pk_value",
+                    params={"pk": pk},
+                )
+
+        # return the objects in the order of the submitted values
+        objects = {
+            str(getattr(o, key)): o
+            for o in self.queryset.filter(**{"%s__in" % key: value})
+        }
+        for val in value:
+            if str(val) not in objects:
+                raise forms.ValidationError(
+                    self.error_messages["invalid_choice"],
+                    code="invalid_choice",
+                    params={"value": val},
+                )
+        return deduplicate(objects[str(val)] for val in value)
+
+    def check_choices(self, value):
+        """
+        Perform the queryset membership check that is skipped when validating
+        by ``"syntax"``. Raises a ``ValidationError`` for any unknown choice.
+        """
+        key = self.to_field_name or "pk"
+        value = [
+            getattr(v, key) if isinstance(v, self.queryset.model) else v
+            for v in value or []
+            if not (self.null_label is not None and v == self.null_value)
+        ]
+        if value:
+            self._query_values(value)
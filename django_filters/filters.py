@@ -4,8 +4,10 @@ from datetime import timedelta
 from itertools import chain
 
 from django import forms
+from django.apps import apps
+from django.core.exceptions import FieldError
 from django.core.validators import MaxValueValidator
-from django.db.models import Q
+from django.db.models import Count, Q
 from django.db.models.constants import LOOKUP_SEP
 from django.forms.utils import pretty_name
 from django.utils.timezone import now
@@ -28,7 +30,12 @@ from .fields import (
     RangeField,
     TimeRangeField,
 )
-from .utils import get_model_field, label_for_filter
+from .utils import (
+    deduplicate,
+    get_model_field,
+    is_to_many_path,
+    label_for_filter,
+)
 
 try:
     from django.utils.choices import normalize_choices
@@ -85,6 +92,8 @@ class Filter:
         method=None,
         distinct=False,
         exclude=False,
+        cost=None,
+        selectivity=None,
         **kwargs
     ):
         if lookup_expr is None:
@@ -95,6 +104,8 @@ class Filter:
         self.method = method
         self.distinct = distinct
         self.exclude = exclude
+        self.cost = cost
+        self.selectivity = selectivity
 
         self.extra = kwargs
         self.extra.setdefault("required", False)
@@ -108,6 +119,39 @@ class Filter:
         """
         return qs.exclude if self.exclude else qs.filter
 
+    def get_cost(self):
+        """
+        Return the estimated cost of applying the filter, in seconds, or None
+        if it is unknown.
+        """
+        return self.cost
+
+    def get_selectivity(self, value):
+        """
+        Return the estimated fraction of rows that match the value, between 0
+        and 1, or None if it is unknown. If not declared, the selectivity is
+        estimated from the column statistics, when available.
+        """
+        if self.selectivity is not None:
+            return self.selectivity
+        if value in EMPTY_VALUES:
+            return 1
+
+        model = getattr(self, "model", None)
+        if model is None or self.method is not None:
+            return None
+        if not apps.is_installed("django_filters.stats"):
+            return None
+
+        from .stats import estimate_selectivity
+
+        selectivity = estimate_selectivity(
+            model, self.field_name, self.lookup_expr, value
+        )
+        if selectivity is not None and self.exclude:
+            return 1 - selectivity
+        return selectivity
+
     def method():
         """
         Filter method needs to be lazily resolved, as it may be dependent on
@@ -167,6 +211,13 @@ class Filter:
         qs = self.get_method(qs)(**{lookup: value})
         return qs
 
+    def filter_empty(self, qs):
+        """
+        Filter by a value that is known to match no rows, without querying
+        the database. e.g., a range whose start is after its end.
+        """
+        return qs if self.exclude else qs.none()
+
 
 class CharFilter(Filter):
     field_class = forms.CharField
@@ -223,6 +274,18 @@ class MultipleChoiceFilter(Filter):
 
     `distinct` defaults to `True` as to-many relationships will generally
     require this.
+
+    When `conjoined`, the `conjoined_strategy` determines how the AND of the
+    selected options is queried:
+
+    * `"join"` chains a `.filter()` call per option. Across a to-many
+      relationship, this adds a join per option.
+    * `"subquery"` matches the objects that have all of the options with
+      a single grouped subquery, i.e. `pk IN (SELECT ... GROUP BY pk HAVING
+      COUNT(DISTINCT ...) = N)`.
+
+    By default, `"subquery"` is used for to-many relationships, otherwise
+    `"join"`.
     """
 
     field_class = MultipleChoiceField
@@ -232,6 +295,11 @@ class MultipleChoiceFilter(Filter):
     def __init__(self, *args, **kwargs):
         kwargs.setdefault("distinct", True)
         self.conjoined = kwargs.pop("conjoined", False)
+        self.conjoined_strategy = kwargs.pop("conjoined_strategy", None)
+        assert self.conjoined_strategy in (None, "join", "subquery"), (
+            "'conjoined_strategy' must be one of 'join' or 'subquery', not %r."
+            % self.conjoined_strategy
+        )
         self.null_value = kwargs.get("null_value", settings.NULL_CHOICE_VALUE)
         super().__init__(*args, **kwargs)
 
@@ -257,30 +325,113 @@ class MultipleChoiceFilter(Filter):
         if self.is_noop(qs, value):
             return qs
 
+        values = [None if v == self.null_value else v for v in deduplicate(value)]
         if not self.conjoined:
-            q = Q()
-        for v in set(value):
-            if v == self.null_value:
-                v = None
-            predicate = self.get_filter_predicate(v)
-            if self.conjoined:
-                qs = self.get_method(qs)(**predicate)
-            else:
-                q |= Q(**predicate)
+            qs = self.get_method(qs)(self.get_filter_q(values))
+            return qs.distinct() if self.distinct else qs
 
-        if not self.conjoined:
-            qs = self.get_method(qs)(q)
+        q = None
+        if self.get_conjoined_strategy(qs) == "subquery":
+            q = self.get_conjoined_q(qs, values)
+
+        if q is not None:
+            # no rows are joined, so no duplicates to remove
+            return self.get_method(qs)(q)
 
+        for v in values:
+            qs = self.get_method(qs)(self.get_filter_q([v]))
         return qs.distinct() if self.distinct else qs
 
+    def get_conjoined_strategy(self, qs):
+        """
+        Return the `conjoined_strategy`, defaulting to `"subquery"` if the
+        filter spans a to-many relationship. Exclusion always uses `"join"`,
+        as it excludes the objects that have any of the selected options.
+        """
+        if self.exclude:
+            return "join"
+        if self.conjoined_strategy is not None:
+            return self.conjoined_strategy
+        if is_to_many_path(qs.model, self.field_name):
+            return "subquery"
+        return "join"
+
+    def get_conjoined_q(self, qs, values):
+        """
+        Return a `pk__in` predicate for a grouped subquery that matches the
+        objects having all of the `values`, or `None` if the predicates for
+        the values cannot be grouped (e.g., non-equality lookups or `None`).
+        """
+        field_name = self.get_predicate_field_name()
+        collapsible = {field_name, LOOKUP_SEP.join([field_name, "exact"])}
+        names, items = set(), []
+        for v in values:
+            predicate = self.get_filter_predicate(v)
+            if v is None or len(predicate) != 1:
+                return None
+            ((name, item),) = predicate.items()
+            names.add(name)
+            items.append(item)
+
+        if len(names) != 1 or not names <= collapsible:
+            return None
+
+        name = names.pop().removesuffix(LOOKUP_SEP + "exact")
+        subquery = (
+            qs.model._base_manager.filter(self.get_filter_q(values))
+            .values("pk")
+            .annotate(matches=Count(name, distinct=True))
+            .filter(matches=len(set(items)))
+            .values("pk")
+        )
+        return Q(pk__in=subquery)
+
+    def get_filter_q(self, values):
+        """
+        Return the OR of the filter predicates for ``values``.
+
+        Equality predicates against the same field are collapsed into a single
+        ``__in`` lookup, which is shorter to compile and better planned than a
+        chain of ORs. Any ``None`` value remains a separate ``IS NULL`` test.
+        """
+        q = Q()
+        field_name = self.get_predicate_field_name()
+        collapsible = {field_name, LOOKUP_SEP.join([field_name, "exact"])}
+        collapsed = OrderedDict()
+        for v in values:
+            predicate = self.get_filter_predicate(v)
+            if len(predicate) == 1:
+                ((name, item),) = predicate.items()
+                if item is not None and name in collapsible:
+                    collapsed.setdefault(name, []).append(item)
+                    continue
+            q |= Q(**predicate)
+
+        for name, items in collapsed.items():
+            if len(items) == 1:
+                q |= Q(**{name: items[0]})
+            else:
+                name = name.removesuffix(LOOKUP_SEP + "exact")
+                q |= Q(**{LOOKUP_SEP.join([name, "in"]): items})
+        return q
+
+    def get_predicate_field_name(self):
+        """
+        Return the field name that the cleaned values are compared against.
+        """
+        return self.field_name
+
     def get_filter_predicate(self, v):
-        name = self.field_name
+        name = self.field_name if v is None else self.get_predicate_field_name()
         if name and self.lookup_expr != settings.DEFAULT_LOOKUP_EXPR:
             name = LOOKUP_SEP.join([name, self.lookup_expr])
+        return {name: self.get_predicate_value(v)}
+
+    def get_predicate_value(self, v):
         try:
-            return {name: getattr(v, self.field.to_field_name)}
+            return getattr(v, self.field.to_field_name)
         except (AttributeError, TypeError):
-            return {name: v}
+            return v
 
 
 class TypedMultipleChoiceFilter(MultipleChoiceFilter):
@@ -369,17 +520,140 @@ class QuerySetRequestMixin:
         return super().field
 
 
-class ModelChoiceFilter(QuerySetRequestMixin, ChoiceFilter):
+class QuerySetMembershipMixin:
+    """
+    Add the ``validate`` argument to filters that support the ``queryset``
+    argument. By default (``validate="full"``), the form field queries the
+    database to check that each value is a member of the ``queryset``.
+
+    With ``validate="syntax"``, the form field only coerces each value to the
+    type of the target model field. Membership of the ``queryset`` is instead
+    enforced with a semi-join inside the filtered query, so that invalid values
+    simply match no rows. This saves a database round trip per filter.
+
+    Example::
+
+        class ArticleFilter(filters.FilterSet):
+            author = filters.ModelChoiceFilter(
+                queryset=User.objects.filter(is_active=True),
+                validate="syntax",
+            )
+            ...
+
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.validate = kwargs.get("validate", "full")
+        super().__init__(*args, **kwargs)
+
+    def get_membership_predicate(self):
+        """
+        Return the lookup restricting matches to the members of the choice
+        ``queryset``. This is empty unless validating by ``"syntax"``, or if
+        the relationship's integrity already guarantees membership.
+        """
+        if self.validate != "syntax":
+            return {}
+
+        queryset = self.field.queryset
+        key = self.field.to_field_name or "pk"
+        if self.is_integrity_enforced(queryset, key):
+            return {}
+        return {"%s__in" % self.get_predicate_field_name(): queryset.values(key)}
+
+    def has_no_members(self):
+        """
+        Return ``True`` if values validated by ``"syntax"`` cannot match any
+        row, as the choice ``queryset`` is known to be empty without querying
+        the database. e.g., a callable ``queryset`` that returns ``none()``.
+        """
+        return self.validate == "syntax" and self.field.queryset.query.is_empty()
+
+    def get_predicate_field_name(self):
+        """
+        Return the field name that the cleaned values are compared against.
+        Values validated by ``"syntax"`` are those of the ``to_field_name``
+        field, rather than model instances.
+        """
+        to_field_name = self.field.to_field_name
+        if self.validate == "syntax" and to_field_name:
+            return LOOKUP_SEP.join([self.field_name, to_field_name])
+        return self.field_name
+
+    def is_integrity_enforced(self, queryset, key):
+        """
+        Return ``True`` if any value stored in the related column is known to
+        be a member of ``queryset``. i.e., the filter spans a relationship to
+        the unrestricted queryset of the related model.
+        """
+        if queryset.query.where or queryset.query.is_sliced:
+            return False
+
+        model = getattr(self, "model", None)
+        field = get_model_field(model, self.field_name) if model else None
+        if field is None or field.related_model is not queryset.model:
+            return False
+
+        opts = queryset.model._meta
+        try:
+            target = field.target_field
+        except FieldError:
+            return False
+        return target.name == (opts.pk.name if key == "pk" else key)
+
+
+class ModelChoiceFilter(QuerySetRequestMixin, QuerySetMembershipMixin, ChoiceFilter):
     field_class = ModelChoiceField
 
     def __init__(self, *args, **kwargs):
         kwargs.setdefault("empty_label", settings.EMPTY_CHOICE_LABEL)
         super().__init__(*args, **kwargs)
 
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES or value == self.null_value:
+            return super().filter(qs, value)
+        if self.validate != "syntax":
+            return super().filter(qs, value)
+        if self.has_no_members():
+            return self.filter_empty(qs)
+
+        # apply the membership in the same call, so that joins are shared
+        if self.distinct:
+            qs = qs.distinct()
+        name = self.get_predicate_field_name()
+        predicate = {"%s__%s" % (name, self.lookup_expr): value}
+        predicate.update(self.get_membership_predicate())
+        return self.get_method(qs)(**predicate)
+
 
-class ModelMultipleChoiceFilter(QuerySetRequestMixin, MultipleChoiceFilter):
+class ModelMultipleChoiceFilter(
+    QuerySetRequestMixin, QuerySetMembershipMixin, MultipleChoiceFilter
+):
     field_class = ModelMultipleChoiceField
 
+    def filter(self, qs, value):
+        # only the null choice can match when there are no members
+        if value and self.null_value not in value and self.has_no_members():
+            return self.filter_empty(qs)
+        return super().filter(qs, value)
+
+    def get_filter_q(self, values):
+        membership = self.get_membership_predicate()
+        choices = [v for v in values if v is not None]
+        if not (membership and choices):
+            return super().get_filter_q(values)
+
+        q = super().get_filter_q(choices) & Q(**membership)
+        if len(choices) < len(values):
+            q |= super().get_filter_q([None])
+        return q
+
+    def get_predicate_value(self, v):
+        # values validated by "syntax" are coerced, rather than model instances
+        if self.validate == "syntax":
+            return v
+        return super().get_predicate_value(v)
+
 
 class NumberFilter(Filter):
     field_class = forms.DecimalField
@@ -425,6 +699,8 @@ class RangeFilter(Filter):
     def filter(self, qs, value):
         if value:
             if value.start is not None and value.stop is not None:
+                if value.start > value.stop:
+                    return self.filter_empty(qs)
                 self.lookup_expr = "range"
                 value = (value.start, value.stop)
             elif value.start is not None:
@@ -607,6 +883,14 @@ class BaseInFilter(BaseCSVFilter):
         kwargs.setdefault("lookup_expr", "in")
         super().__init__(*args, **kwargs)
 
+    def filter(self, qs, value):
+        if value:
+            value = deduplicate(value)
+            # null values are never matched by an IN lookup
+            if all(v is None for v in value):
+                return self.filter_empty(qs)
+        return super().filter(qs, value)
+
 
 class BaseRangeFilter(BaseCSVFilter):
     base_field_class = BaseRangeField
@@ -615,6 +899,13 @@ class BaseRangeFilter(BaseCSVFilter):
         kwargs.setdefault("lookup_expr", "range")
         super().__init__(*args, **kwargs)
 
+    def filter(self, qs, value):
+        if value and self.lookup_expr.endswith("range"):
+            start, stop = value
+            if start is not None and stop is not None and start > stop:
+                return self.filter_empty(qs)
+        return super().filter(qs, value)
+
 
 class LookupChoiceFilter(Filter):
     """
@@ -1,16 +1,35 @@
 import copy
+import math
+import time
 import warnings
 from collections import OrderedDict
 from enum import Enum
 
 from django import forms
+from django.core.cache import caches
 from django.db import models
 from django.db.models.constants import LOOKUP_SEP
 from django.db.models.fields.related import ManyToManyRel, ManyToOneRel, OneToOneRel
 from django.http import QueryDict
 
+from . import samples, signals, slowlog, workload
 from .conf import settings
-from .constants import ALL_FIELDS
+from .constants import ALL_FIELDS, EMPTY_VALUES
+from .explain import explain_filterset
+from .facets import (
+    get_date_histogram,
+    get_date_histogram_kind,
+    get_facet_choices,
+    get_facet_counts,
+    get_facets_cache_key,
+    get_numeric_histogram,
+    get_sample,
+    get_sample_rate,
+    is_date_histogram,
+    is_facet,
+    is_histogram,
+    scale_facet_choices,
+)
 from .filters import (
     BaseInFilter,
     BaseRangeFilter,
@@ -51,6 +70,11 @@ class UnknownFieldBehavior(Enum):
     IGNORE = "ignore"
 
 
+class FilterOrder(Enum):
+    DECLARED = "declared"
+    COST = "cost"
+
+
 class FilterSetOptions:
     def __init__(self, options=None):
         self.model = getattr(options, "model", None)
@@ -61,6 +85,8 @@ class FilterSetOptions:
 
         self.form = getattr(options, "form", forms.Form)
 
+        self.rollup = getattr(options, "rollup", None)
+
         behavior = getattr(
             options,
             "unknown_field_behavior",
@@ -72,6 +98,13 @@ class FilterSetOptions:
 
         self.unknown_field_behavior = behavior
 
+        order = getattr(options, "filter_order", FilterOrder.DECLARED)
+
+        if not isinstance(order, FilterOrder):
+            raise ValueError(f"Invalid filter_order: {order}")
+
+        self.filter_order = order
+
 
 class FilterSetMetaclass(type):
     def __new__(cls, name, bases, attrs):
@@ -80,6 +113,12 @@ class FilterSetMetaclass(type):
         new_class = super().__new__(cls, name, bases, attrs)
         new_class._meta = FilterSetOptions(getattr(new_class, "Meta", None))
         new_class.base_filters = new_class.get_filters()
+        new_class.learned_costs = {}
+
+        if new_class._meta.rollup:
+            from .rollups import register
+
+            register(new_class)
 
         return new_class
 
@@ -190,6 +229,9 @@ FILTER_FOR_DBFIELD_DEFAULTS = {
 class BaseFilterSet:
     FILTER_DEFAULTS = FILTER_FOR_DBFIELD_DEFAULTS
 
+    # set while filtering the querysets of facets, which are not instrumented
+    _facet_filtering = False
+
     def __init__(self, data=None, queryset=None, *, request=None, prefix=None):
         if queryset is None:
             queryset = self._meta.model._default_manager.all()
@@ -208,18 +250,40 @@ class BaseFilterSet:
             filter_.model = model
             filter_.parent = self
 
+        if settings.SLOW_THRESHOLD is not None:
+            slowlog.connect()
+
     def is_valid(self):
         """
         Return True if the underlying form has no errors, or False otherwise.
         """
-        return self.is_bound and self.form.is_valid()
+        if not self.is_bound:
+            return False
+        # validate the form, sending the validation signals
+        self.errors
+        return self.form.is_valid()
 
     @property
     def errors(self):
         """
         Return an ErrorDict for the data provided for the underlying form.
         """
-        return self.form.errors
+        form = self.form
+        if (
+            form.is_bound
+            and form._errors is None
+            and signals.is_enabled(
+                signals.pre_form_validation, signals.post_form_validation
+            )
+        ):
+            with signals.timed(
+                signals.pre_form_validation,
+                signals.post_form_validation,
+                "form_validation",
+                self,
+            ):
+                form.full_clean()
+        return form.errors
 
     def filter_queryset(self, queryset):
         """
@@ -228,9 +292,32 @@ class BaseFilterSet:
 
         This method should be overridden if additional filtering needs to be
         applied to the queryset before it is cached.
+
+        If a filter returns an empty queryset (i.e. ``queryset.none()``), the
+        remaining filters are skipped, as the result is known to be empty.
         """
-        for name, value in self.form.cleaned_data.items():
-            queryset = self.filters[name].filter(queryset, value)
+        instrumented = not self._facet_filtering
+        learn = instrumented and self._meta.filter_order is FilterOrder.COST
+        timed = instrumented and signals.is_enabled(
+            signals.pre_filter, signals.post_filter
+        )
+        for name, value in self.get_filter_values():
+            start = time.perf_counter()
+            if timed and value not in EMPTY_VALUES:
+                with signals.timed(
+                    signals.pre_filter,
+                    signals.post_filter,
+                    "filter",
+                    self,
+                    label=name,
+                    name=name,
+                    value=value,
+                ):
+                    queryset = self.filters[name].filter(queryset, value)
+            else:
+                queryset = self.filters[name].filter(queryset, value)
+            if learn and value not in EMPTY_VALUES:
+                self.learn_cost(name, time.perf_counter() - start)
             assert isinstance(
                 queryset, models.QuerySet
             ), "Expected '%s.%s' to return a QuerySet, but got a %s instead." % (
@@ -238,8 +325,56 @@ class BaseFilterSet:
                 name,
                 type(queryset).__name__,
             )
+            if queryset.query.is_empty():
+                return queryset.none()
         return queryset
 
+    def get_filter_values(self):
+        """
+        Return the ``(name, value)`` pairs of the form's `cleaned_data`, in the
+        order the filters are applied.
+
+        Filters are applied in their declared order, unless ``Meta.filter_order``
+        is ``FilterOrder.COST``. Then, cheap and selective filters are applied
+        first, and expensive or unselective filters last.
+        """
+        values = list(self.form.cleaned_data.items())
+        if self._meta.filter_order is FilterOrder.COST:
+            values.sort(key=lambda item: self.get_filter_rank(*item))
+        return values
+
+    def get_filter_rank(self, name, value):
+        """
+        Return the rank of the named filter, with lower ranks applied first.
+
+        The rank is the filter's cost per fraction of rows it removes. Filters
+        without a declared cost use the cost learned from applying them, and
+        filters without an estimated selectivity are assumed to match half
+        of the rows.
+        """
+        filter_ = self.filters[name]
+        cost = filter_.get_cost()
+        if cost is None:
+            cost = self.learned_costs.get(name, 0)
+
+        selectivity = filter_.get_selectivity(value)
+        if selectivity is None:
+            selectivity = 0.5
+        if selectivity >= 1:
+            return math.inf
+        return cost / (1 - selectivity)
+
+    def learn_cost(self, name, duration):
+        """
+        Update the learned cost of the named filter with the duration of its
+        latest application, as an exponential moving average.
+        """
+        cost = self.learned_costs.get(name)
+        if cost is None:
+            self.learned_costs[name] = duration
+        else:
+            self.learned_costs[name] = cost + (duration - cost) / 5
+
     @property
     def qs(self):
         if not hasattr(self, "_qs"):
@@ -247,10 +382,151 @@ class BaseFilterSet:
             if self.is_bound:
                 # ensure form validation before filtering
                 self.errors
+                if settings.WORKLOAD_STORE:
+                    workload.record(self)
+                if settings.SAMPLE_FILE:
+                    samples.record(self)
                 qs = self.filter_queryset(qs)
+            if signals.is_enabled(
+                signals.pre_qs_evaluation, signals.post_qs_evaluation
+            ):
+                qs = signals.instrument_queryset(qs, self)
             self._qs = qs
         return self._qs
 
+    def facets(self, cache_timeout=None, sample_size=None):
+        """
+        Return the faceted counts for the filterset's choice and boolean
+        filters, keyed by filter name. Each facet is a list of
+        ``{"value", "label", "count"}`` dicts, counted over the queryset as
+        filtered by every filter except the facet's own.
+
+        If a ``cache_timeout`` is given, the facets are cached for any data
+        that cleans to the same filter values. Facets of the filters in
+        ``Meta.rollup`` are read from the rollup table when possible.
+
+        If a ``sample_size`` is given, the facets of large querysets are
+        estimated from a sample of about that many rows, and each choice
+        also has an ``"error"`` bound for its count.
+        """
+        if cache_timeout is not None:
+            cache = caches[settings.FACETS_CACHE]
+            key = get_facets_cache_key(self, sample_size)
+            result = cache.get(key)
+            if result is None:
+                result = self.facets(sample_size=sample_size)
+                cache.set(key, result, cache_timeout)
+            return result
+
+        rollup_counts = {}
+        if self._meta.rollup:
+            from .rollups import get_rollup_counts
+
+            rollup_counts = get_rollup_counts(self)
+
+        result = {}
+        for name, filter_ in self.filters.items():
+            if not is_facet(filter_):
+                continue
+            scale = 1
+            if name in rollup_counts:
+                counts = rollup_counts[name]
+            else:
+                qs = self.get_facet_queryset(name)
+                # the rate of each facet's own queryset, as filters may be
+                # selective enough to count exactly
+                if sample_size is not None:
+                    threshold = settings.FACETS_SAMPLE_THRESHOLD
+                    scale = get_sample_rate(qs, sample_size, threshold)
+                counts = get_facet_counts(filter_, get_sample(qs, scale))
+            choices = get_facet_choices(filter_, counts)
+            if sample_size is not None:
+                choices = scale_facet_choices(choices, scale)
+            result[name] = choices
+        return result
+
+    def histograms(self, buckets=10):
+        """
+        Return the histograms for the filterset's range filters, keyed by
+        filter name. See ``histogram()``.
+        """
+        return {
+            name: self.histogram(name, buckets=buckets)
+            for name, filter_ in self.filters.items()
+            if is_histogram(filter_)
+        }
+
+    def histogram(self, name, buckets=10, start=None, end=None, kind=None):
+        """
+        Return the histogram for the named range filter, as a list of
+        ``{"start", "end", "count"}`` dicts.
+
+        Numeric ranges are divided into ``buckets`` of equal width between
+        ``start`` and ``end``, which default to the smallest and largest
+        values. Finding those takes an extra ``Min``/``Max`` query, so pass
+        both bounds to count the histogram in one query. The buckets are
+        counted over the queryset as filtered by every filter except the
+        named filter.
+
+        Date ranges are truncated to the ``kind`` of period, which defaults
+        to a drill-down from years, to months, to days as the filter's range
+        narrows. They are counted over the filtered queryset.
+        """
+        filter_ = self.filters[name]
+        assert is_histogram(filter_), "'%s.%s' is not a range filter." % (
+            type(self).__name__,
+            name,
+        )
+
+        if is_date_histogram(filter_):
+            qs = self.qs
+            if kind is None:
+                value = self.form.cleaned_data.get(name) if self.is_bound else None
+                kind = get_date_histogram_kind(value)
+            return get_date_histogram(filter_, qs, kind)
+
+        qs = self.get_facet_queryset(name)
+        return get_numeric_histogram(filter_, qs, buckets, start, end)
+
+    def get_facet_queryset(self, name):
+        """
+        Return the queryset the named filter's facet is counted over. This is
+        the filtered queryset, without the filtering of the named filter.
+
+        The facet queries are not part of the request's filtering, so they do
+        not send the filter and evaluation signals, nor are the costs of the
+        filters learned from them.
+        """
+        qs = signals.uninstrument_queryset(self.qs)
+        if not self.is_bound or self.form.cleaned_data.get(name) in EMPTY_VALUES:
+            return qs
+
+        cleaned_data = self.form.cleaned_data
+        try:
+            self.form.cleaned_data = {
+                key: value for key, value in cleaned_data.items() if key != name
+            }
+            self._facet_filtering = True
+            return self.filter_queryset(self.queryset.all())
+        finally:
+            self.form.cleaned_data = cleaned_data
+            self._facet_filtering = False
+
+    def explain(self, **options):
+        """
+        Return a dict that describes the SQL of the filtered queryset. Its
+        ``"filters"`` are a list of dicts for each active filter, in the order
+        the filters are applied, with the SQL ``"sql"`` and ``"params"`` the
+        filter added to the WHERE clause, the tables it ``"joins"``, the
+        number of table ``"aliases"`` before and after, and whether it made
+        the queryset ``"distinct"``. Its ``"plan"`` is the database's plan for
+        the filtered queryset, and ``"seq_scan"`` whether the plan reads a
+        whole table.
+
+        The ``options`` are passed to ``QuerySet.explain()``.
+        """
+        return explain_filterset(self, **options)
+
     def get_form_class(self):
         """
         Returns a django Form suitable of validating the filterset data.
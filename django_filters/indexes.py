@@ -0,0 +1,399 @@
+"""
+Index advice for the filters of a ``FilterSet``.
+
+The filtered and ordered field paths of a ``FilterSet`` are compared against
+the indexes declared by their models: primary keys, ``unique`` and
+``db_index`` fields, ``Meta.indexes``, ``Meta.unique_together`` and unique
+constraints. Filters that no index can serve, and which will therefore scan
+the model's table, are reported along with an index that would serve them.
+
+On PostgreSQL, prefix lookups compile to ``LIKE``, which a B-tree index can
+only serve with a pattern operator class, unless the column uses the ``C``
+collation. Django adds such an index for ``unique`` and ``db_index`` text
+columns, but not for ``Meta.indexes``.
+"""
+
+import hashlib
+from collections import namedtuple
+
+from django.core.exceptions import FieldError
+from django.db import models
+from django.db.models.functions import Lower, Upper
+
+from .exceptions import FieldLookupError
+from .facets import is_facet
+from .filters import BooleanFilter, OrderingFilter
+from .utils import get_field_parts, resolve_field
+
+# Lookups that a B-tree index on the column can serve.
+INDEXED_LOOKUPS = {
+    "exact",
+    "in",
+    "gt",
+    "gte",
+    "lt",
+    "lte",
+    "range",
+    "isnull",
+    "startswith",
+}
+
+# Lookups that compare the uppercased column, except on MySQL, whose default
+# collations are case-insensitive, and SQLite, which uses ``LIKE``.
+CASE_INSENSITIVE_LOOKUPS = {"iexact", "istartswith"}
+
+# Lookups that match a pattern anywhere in the value.
+PATTERN_LOOKUPS = {"contains", "icontains", "endswith", "iendswith", "regex", "iregex"}
+
+# Lookups that match a prefix of the value with ``LIKE`` on PostgreSQL.
+PREFIX_LOOKUPS = {"startswith", "istartswith"}
+
+# The PostgreSQL operator classes whose B-tree indexes serve ``LIKE`` prefixes.
+PATTERN_OPCLASSES = {"varchar_pattern_ops", "text_pattern_ops", "bpchar_pattern_ops"}
+
+
+class Advice(
+    namedtuple("Advice", ("filterset", "name", "model", "lookup", "reason", "index"))
+):
+    """
+    A filter or ordering that no index serves. The ``index`` is the suggested
+    index for the ``model``, or ``None`` if no index would serve it.
+    """
+
+
+def get_index_name(model, parts):
+    """
+    Return a name for an index of the model's ``parts``, in the style of the
+    names generated by ``Index.set_name_with_model()``.
+    """
+    table = model._meta.db_table
+    digest = hashlib.md5(repr((table, parts)).encode(), usedforsecurity=False)
+    return "%s_%s_%s_idx" % (table[:11], "_".join(parts)[:7], digest.hexdigest()[:6])
+
+
+def get_expression_key(expression):
+    """
+    Return the field name, or the ``(function, field name)`` pair of an
+    uppercased or lowercased field, that an index expression refers to. The
+    key of an expression with a pattern operator class is the
+    ``("pattern_ops", key)`` pair of the expression's key.
+    """
+    if isinstance(expression, str):
+        return expression.lstrip("-")
+    if isinstance(expression, models.F):
+        return expression.name
+    if isinstance(expression, (Lower, Upper)):
+        source = get_expression_key(expression.get_source_expressions()[0])
+        if isinstance(source, str):
+            return (expression.function.lower(), source)
+    # i.e. django.contrib.postgres.indexes.OpClass
+    if (
+        isinstance(expression, models.Func)
+        and expression.extra.get("name") in PATTERN_OPCLASSES
+    ):
+        source = get_expression_key(expression.get_source_expressions()[0])
+        if source is not None:
+            return ("pattern_ops", source)
+    return None
+
+
+def get_pattern_opclass(field):
+    """
+    Return the PostgreSQL pattern operator class of the field's column, or
+    ``None`` if it isn't a text column.
+    """
+    if field.is_relation:
+        field = field.target_field
+    if isinstance(field, models.TextField):
+        return "text_pattern_ops"
+    if isinstance(field, models.CharField):
+        return "varchar_pattern_ops"
+    return None
+
+
+def get_indexes(model):
+    """
+    Return the model's indexes, as tuples of the keys they are ordered by.
+    """
+    opts = model._meta
+    indexes = []
+    for field in opts.local_fields:
+        if field.primary_key or field.unique or field.db_index:
+            indexes.append((field.name,))
+            # the "_like" index that PostgreSQL adds for text columns
+            if get_pattern_opclass(field) is not None:
+                indexes.append((("pattern_ops", field.name),))
+
+    for fields in opts.unique_together:
+        indexes.append(tuple(fields))
+    for index in opts.indexes:
+        if not index.fields:
+            indexes.append(tuple(map(get_expression_key, index.expressions)))
+            continue
+        keys = []
+        opclasses = index.opclasses or [None] * len(index.fields)
+        for name, opclass in zip(index.fields, opclasses):
+            key = get_expression_key(name)
+            keys.append(("pattern_ops", key) if opclass in PATTERN_OPCLASSES else key)
+        indexes.append(tuple(keys))
+    for constraint in opts.constraints:
+        if isinstance(constraint, models.UniqueConstraint):
+            indexes.append(
+                tuple(
+                    get_expression_key(expression)
+                    for expression in constraint.fields or constraint.expressions
+                )
+            )
+    return indexes
+
+
+def is_indexed(model, keys):
+    """
+    Return True if an index of the model is ordered by the keys, or by keys
+    that begin with them.
+    """
+    keys = tuple(keys)
+    return any(index[: len(keys)] == keys for index in get_indexes(model))
+
+
+def advise(filterset_class, vendor):
+    """
+    Return a list of ``Advice`` for the filters and orderings of the
+    filterset that no index serves on the database ``vendor``.
+    """
+    model = filterset_class._meta.model
+    orderings = get_orderings(filterset_class)
+
+    result = []
+    for name, filter_ in filterset_class.base_filters.items():
+        if isinstance(filter_, OrderingFilter) or filter_.method is not None:
+            continue
+        parts = get_field_parts(model, filter_.field_name or "")
+        if not parts:
+            continue
+
+        result.extend(advise_joins(filterset_class, name, filter_, parts))
+        field = parts[-1]
+        if not field.concrete or field.many_to_many:
+            # the related rows are filtered by their indexed primary keys
+            continue
+
+        if len(parts) == 1 and orderings and is_facet(filter_):
+            result.extend(
+                advise_composite(filterset_class, name, filter_, field, orderings)
+            )
+            continue
+        advice = advise_lookup(filterset_class, name, filter_, field, vendor)
+        if advice is not None:
+            result.append(advice)
+
+    for name, field in orderings:
+        if not is_indexed(field.model, [field.name]):
+            result.append(
+                Advice(
+                    filterset_class,
+                    name,
+                    field.model,
+                    field.name,
+                    "ordering by '%s' sorts every row" % field.name,
+                    models.Index(
+                        fields=[field.name],
+                        name=get_index_name(field.model, [field.name]),
+                    ),
+                )
+            )
+    return result
+
+
+def get_orderings(filterset_class):
+    """
+    Return ``(filter name, model field)`` pairs for the model's own fields
+    that the filterset's ``OrderingFilter``\\s order by.
+    """
+    model = filterset_class._meta.model
+    result = []
+    for name, filter_ in filterset_class.base_filters.items():
+        if isinstance(filter_, OrderingFilter):
+            for path in filter_.param_map.values():
+                parts = get_field_parts(model, path)
+                if parts and len(parts) == 1 and parts[0].concrete:
+                    result.append((name, parts[0]))
+    return result
+
+
+def advise_joins(filterset_class, name, filter_, parts):
+    # Joins are driven from the filtered rows, by the relation's foreign key.
+    result = []
+    joins = parts[:-1] if parts[-1].concrete else parts
+    for field in joins:
+        if field.many_to_one or (field.one_to_one and field.concrete):
+            fk = field
+        elif field.one_to_many:
+            fk = field.remote_field
+        else:
+            continue
+
+        if not is_indexed(fk.model, [fk.name]):
+            result.append(
+                Advice(
+                    filterset_class,
+                    name,
+                    fk.model,
+                    filter_.lookup_expr,
+                    "joining '%s' scans '%s'" % (fk.name, fk.model._meta.db_table),
+                    models.Index(
+                        fields=[fk.name], name=get_index_name(fk.model, [fk.name])
+                    ),
+                )
+            )
+    return result
+
+
+def advise_composite(filterset_class, name, filter_, field, orderings):
+    # A low-cardinality equality filter combined with an ordering is served by
+    # an index of both, which returns the filtered rows in order.
+    result = []
+    for _, ordering in orderings:
+        keys = [field.name, ordering.name]
+        if field.model is not ordering.model or field.name == ordering.name:
+            continue
+        if is_indexed(field.model, keys):
+            continue
+        result.append(
+            Advice(
+                filterset_class,
+                name,
+                field.model,
+                filter_.lookup_expr,
+                "filtering by '%s' and ordering by '%s' sorts the filtered rows"
+                % tuple(keys),
+                models.Index(fields=keys, name=get_index_name(field.model, keys)),
+            )
+        )
+    return result
+
+
+def advise_lookup(filterset_class, name, filter_, field, vendor):
+    model, key = field.model, field.name
+    lookup_expr = filter_.lookup_expr
+
+    try:
+        lookup = resolve_field(field, lookup_expr)[1]
+    except (FieldError, FieldLookupError):
+        return None
+
+    if lookup != lookup_expr:
+        reason = "the lookup '%s' transforms '%s' before comparing it" % (
+            lookup_expr,
+            key,
+        )
+        index = None
+    elif lookup in PREFIX_LOOKUPS and vendor == "postgresql":
+        source = ("upper", key) if lookup == "istartswith" else key
+        if is_indexed(model, [("pattern_ops", source)]):
+            return None
+        reason, index = get_prefix_index(field, lookup)
+    elif lookup in PATTERN_LOOKUPS or (
+        lookup in CASE_INSENSITIVE_LOOKUPS and vendor != "mysql"
+    ):
+        # an index of the uppercased column serves exact and prefix matches
+        upper = is_indexed(model, [("upper", key)]) and vendor != "sqlite"
+        if upper and lookup in CASE_INSENSITIVE_LOOKUPS:
+            return None
+        reason, index = get_text_index(model, key, lookup, vendor)
+    elif lookup in INDEXED_LOOKUPS | CASE_INSENSITIVE_LOOKUPS:
+        if is_indexed(model, [key]):
+            return None
+        reason = "no index on '%s'" % key
+        index = get_column_index(filter_, field, lookup)
+    else:
+        return None
+
+    return Advice(filterset_class, name, model, lookup_expr, reason, index)
+
+
+def get_text_index(model, key, lookup, vendor):
+    """
+    Return the reason a B-tree index on the column cannot serve the text
+    lookup, and the index that would serve it, if any.
+    """
+    if lookup in PATTERN_LOOKUPS:
+        reason = "'%s' matches a pattern anywhere in '%s'" % (lookup, key)
+        if vendor != "postgresql":
+            return reason, None
+        return reason, get_trigram_index(model, key, lookup.startswith("i"))
+
+    if vendor == "sqlite":
+        return "SQLite matches '%s' with LIKE" % lookup, None
+    return (
+        "'%s' compares UPPER(%s)" % (lookup, key),
+        models.Index(Upper(key), name=get_index_name(model, [key, "upper"])),
+    )
+
+
+def get_prefix_index(field, lookup):
+    """
+    Return the reason a B-tree index on the column cannot serve the prefix
+    lookup on PostgreSQL, and the index with a pattern operator class that
+    would serve it, if any.
+    """
+    from django.contrib.postgres.indexes import OpClass
+
+    model, key = field.model, field.name
+    opclass = get_pattern_opclass(field)
+    if opclass is None:
+        return "'%s' casts '%s' to text" % (lookup, key), None
+
+    if lookup == "istartswith":
+        # UPPER() returns text, whatever the type of the column
+        reason = "'istartswith' matches UPPER(%s) with LIKE" % key
+        expression, opclass, parts = Upper(key), "text_pattern_ops", [key, "ulike"]
+    else:
+        reason = "'startswith' matches '%s' with LIKE" % key
+        expression, parts = models.F(key), [key, "like"]
+    return reason, models.Index(
+        OpClass(expression, name=opclass), name=get_index_name(model, parts)
+    )
+
+
+def get_column_index(filter_, field, lookup):
+    model, key = field.model, field.name
+
+    # Index only the rows that the filter selects, when the other rows are
+    # likely the majority of the table.
+    if lookup == "isnull" and field.null:
+        return models.Index(
+            fields=[key],
+            condition=models.Q(**{"%s__isnull" % key: False}),
+            name=get_index_name(model, [key, "notnull"]),
+        )
+    if isinstance(filter_, BooleanFilter) and lookup == "exact":
+        return models.Index(
+            fields=[key],
+            condition=models.Q(**{key: True}),
+            name=get_index_name(model, [key, "true"]),
+        )
+    return models.Index(fields=[key], name=get_index_name(model, [key]))
+
+
+def get_trigram_index(model, key, case_insensitive):
+    # requires the pg_trgm extension
+    from django.contrib.postgres.indexes import GinIndex, OpClass
+
+    expression = Upper(key) if case_insensitive else models.F(key)
+    return GinIndex(
+        OpClass(expression, name="gin_trgm_ops"),
+        name=get_index_name(model, [key, "trgm"]),
+    )
+
+
+def get_suggested_indexes(advice):
+    """
+    Return a dict of the suggested indexes for each model, without duplicates.
+    """
+    result = {}
+    for item in advice:
+        if item.index is not None:
+            indexes = result.setdefault(item.model, {})
+            indexes.setdefault(item.index.name, item.index)
+    return {model: list(indexes.values()) for model, indexes in result.items()}
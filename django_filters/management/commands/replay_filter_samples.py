@@ -0,0 +1,91 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from ...conf import settings
+from ...samples import percentile, read_samples, replay
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay the FilterSet samples recorded in FILTERS_SAMPLE_FILE against "
+        "a database, and report the latency percentiles and query counts of "
+        "each shape of request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            help="The samples file. Defaults to FILTERS_SAMPLE_FILE.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="The database to replay the samples against. Defaults to "
+            "'default'.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=1,
+            help="The number of times to replay each sample. Defaults to 1.",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=25,
+            help="The number of results fetched for each sample. Defaults to 25.",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Report the results as JSON lines.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"] or settings.SAMPLE_FILE
+        if not path:
+            raise CommandError(
+                "No samples file given, and FILTERS_SAMPLE_FILE is unset."
+            )
+        try:
+            samples = read_samples(path)
+        except FileNotFoundError:
+            raise CommandError("The samples file '%s' does not exist." % path)
+
+        results = replay(
+            samples * options["repeat"], options["database"], options["page_size"]
+        )
+        for (filterset, params), result in sorted(results.items()):
+            durations, queries = result["durations"], result["queries"]
+            report = {
+                "filterset": filterset,
+                "params": list(params),
+                "count": len(durations),
+                "p50": percentile(durations, 50),
+                "p95": percentile(durations, 95),
+                "p99": percentile(durations, 99),
+                "queries": max(queries),
+            }
+            if options["json"]:
+                self.stdout.write(json.dumps(report))
+            else:
+                self.write_report(report)
+
+    def write_report(self, report):
+        self.stdout.write(
+            "%s: %s"
+            % (report["filterset"], ", ".join(report["params"]) or "(no params)")
+        )
+        self.stdout.write(
+            "   %d requests, p50 %.1fms, p95 %.1fms, p99 %.1fms, %d queries"
+            % (
+                report["count"],
+                report["p50"] * 1000,
+                report["p95"] * 1000,
+                report["p99"] * 1000,
+                report["queries"],
+            )
+        )
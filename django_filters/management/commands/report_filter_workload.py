@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from django.db.migrations.writer import MigrationWriter
+
+from ...workload import flush, get_recommendations, get_store
+
+
+class Command(BaseCommand):
+    help = (
+        "Recommend composite indexes for the filter combinations recorded in "
+        "FILTERS_WORKLOAD_STORE, ranked by the number of requests times the "
+        "number of rows in the model's table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=10,
+            help="The number of recommendations to report. Defaults to 10.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="The database to count rows in. Defaults to 'default'.",
+        )
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Clear the recorded workload after reporting it.",
+        )
+
+    def handle(self, *args, **options):
+        flush()
+        store = get_store()
+        recommendations = get_recommendations(store.read(), using=options["database"])
+        if not recommendations:
+            self.stdout.write("No index recommendations for the recorded workload.")
+
+        for i, item in enumerate(recommendations[: options["limit"]], 1):
+            index, _ = MigrationWriter.serialize(item.index)
+            self.stdout.write("%d. %s: %s" % (i, item.model._meta.label, index))
+            self.stdout.write(
+                "   %d requests x %d rows = %d" % (item.count, item.rows, item.score)
+            )
+            for (path, names, ordering), count in item.combinations:
+                description = ", ".join(names) or "(no filters)"
+                if ordering:
+                    description += " ordered by %s" % ", ".join(ordering)
+                self.stdout.write("   %s: %s (%d)" % (path, description, count))
+
+        if options["clear"]:
+            store.clear()
@@ -0,0 +1,93 @@
+import os
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections, migrations
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+
+from ...indexes import advise, get_suggested_indexes
+from ...utils import get_model_filtersets, import_filterset_class
+
+
+class Command(BaseCommand):
+    help = (
+        "Report the filters and orderings of FilterSets that no index serves, "
+        "and suggest indexes for them. Without arguments, all FilterSets that "
+        "are imported by the root URLconf are inspected."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "filtersets",
+            nargs="*",
+            metavar="filterset",
+            help="Dotted path of a FilterSet class, e.g. 'myapp.filters.F'.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="The database whose vendor the indexes are suggested for. "
+            "Defaults to 'default'.",
+        )
+        parser.add_argument(
+            "--migrations",
+            metavar="DIRECTORY",
+            help="Write a migration stub that adds the suggested indexes for "
+            "each app to the directory.",
+        )
+
+    def handle(self, *args, **options):
+        if options["filtersets"]:
+            filterset_classes = [
+                import_filterset_class(path) for path in options["filtersets"]
+            ]
+        else:
+            filterset_classes = get_model_filtersets()
+
+        vendor = connections[options["database"]].vendor
+        advice = []
+        for filterset_class in filterset_classes:
+            items = advise(filterset_class, vendor)
+            if items:
+                self.write_advice(filterset_class, items)
+            advice.extend(items)
+
+        if not advice and options["verbosity"] >= 1:
+            self.stdout.write("No missing indexes found.")
+        if options["migrations"]:
+            self.write_migrations(get_suggested_indexes(advice), options["migrations"])
+
+    def write_advice(self, filterset_class, advice):
+        self.stdout.write(
+            "%s.%s (%s)"
+            % (
+                filterset_class.__module__,
+                filterset_class.__qualname__,
+                filterset_class._meta.model._meta.label,
+            )
+        )
+        for item in advice:
+            self.stdout.write("  %s (%s): %s" % (item.name, item.lookup, item.reason))
+            if item.index is not None:
+                index, _ = MigrationWriter.serialize(item.index)
+                self.stdout.write("    %s: %s" % (item.model._meta.label, index))
+
+    def write_migrations(self, indexes, directory):
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        apps = {}
+        for model, model_indexes in indexes.items():
+            apps.setdefault(model._meta.app_label, []).extend(
+                migrations.AddIndex(model._meta.model_name, index)
+                for index in model_indexes
+            )
+
+        os.makedirs(directory, exist_ok=True)
+        for app_label, operations in sorted(apps.items()):
+            migration = migrations.Migration("filter_indexes", app_label)
+            migration.dependencies = loader.graph.leaf_nodes(app_label)
+            migration.operations = operations
+
+            path = os.path.join(directory, "%s_filter_indexes.py" % app_label)
+            with open(path, "w") as f:
+                f.write(MigrationWriter(migration).as_string())
+            self.stdout.write("Wrote %s" % path)
@@ -0,0 +1,414 @@
+"""
+Counters and histograms of ``FilterSet`` usage, in Prometheus text format.
+
+Add ``"django_filters.metrics"`` to ``INSTALLED_APPS`` to record, from the
+timing signals:
+
+* the requests to each ``FilterSet`` class, i.e. its form validations,
+* the activations of each filter,
+* the validation failures by field and error code,
+* the latency of validation, of each filter, and of queryset evaluation.
+
+The ``django_filters.metrics.views.metrics`` view renders the metrics. They
+are kept in-process, unless ``FILTERS_METRICS_DIR`` is set. Then, each
+process keeps its metrics in a memory-mapped file in the directory, and the
+view adds up the files of all processes, e.g. the workers of a gunicorn
+server. The directory should be emptied before the server starts.
+"""
+
+import bisect
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+
+from .. import signals
+from ..conf import settings
+from ..workload import get_filterset_path
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    math.inf,
+)
+
+
+class MemoryValues:
+    """
+    Values kept in a dict, for a single process.
+    """
+
+    def __init__(self):
+        self.values = {}
+
+    def incr(self, key, amount):
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def items(self):
+        return list(self.values.items())
+
+    def close(self):
+        self.values = {}
+
+
+class MmapValues:
+    """
+    Values kept in a memory-mapped file. The file starts with the number of
+    bytes used, which is followed by entries of a length-prefixed key, padded
+    to 8 bytes, and a double. The values of a key are only written by the
+    process that owns the file, while other processes may read them.
+    """
+
+    initial_size = 1 << 16
+
+    def __init__(self, path):
+        self.path = path
+        self.positions = {}
+        self.file = open(path, "a+b")
+        size = os.fstat(self.file.fileno()).st_size
+        if size == 0:
+            size = self.initial_size
+            self.file.truncate(size)
+        self.mmap = mmap.mmap(self.file.fileno(), size)
+        self.used = struct.unpack_from("q", self.mmap, 0)[0] or 8
+        for key, _, position in read_entries(self.mmap, self.used):
+            self.positions[key] = position
+
+    def incr(self, key, amount):
+        position = self.positions.get(key)
+        if position is None:
+            position = self.add(key)
+        value = struct.unpack_from("d", self.mmap, position)[0]
+        struct.pack_into("d", self.mmap, position, value + amount)
+
+    def add(self, key):
+        encoded = key.encode()
+        padding = -(4 + len(encoded)) % 8
+        entry = struct.pack("i", len(encoded)) + encoded + b" " * padding
+        end = self.used + len(entry) + 8
+        if end > len(self.mmap):
+            size = len(self.mmap)
+            while end > size:
+                size *= 2
+            self.mmap.close()
+            self.file.truncate(size)
+            self.mmap = mmap.mmap(self.file.fileno(), size)
+
+        start, position = self.used, self.used + len(entry)
+        self.mmap[start:position] = entry
+        struct.pack_into("d", self.mmap, position, 0.0)
+        # publish the entry to readers after it is written
+        self.used = end
+        struct.pack_into("q", self.mmap, 0, self.used)
+        self.positions[key] = position
+        return position
+
+    def items(self):
+        return [(key, value) for key, value, _ in read_entries(self.mmap, self.used)]
+
+    def close(self):
+        self.mmap.close()
+        self.file.close()
+
+
+def read_entries(data, used):
+    """
+    Yield the ``(key, value, position)`` entries of the mmap'd file data.
+    """
+    position = 8
+    while position < used:
+        (length,) = struct.unpack_from("i", data, position)
+        start, end = position + 4, position + 4 + length
+        key = bytes(data[start:end]).decode()
+        position = end + -(4 + length) % 8
+        yield key, struct.unpack_from("d", data, position)[0], position
+        position += 8
+
+
+def read_file(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < 8:
+        return []
+    used = struct.unpack_from("q", data, 0)[0]
+    return [(key, value) for key, value, _ in read_entries(data, used)]
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, registry, name, documentation, labelnames):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def get_key(self, suffix, labels):
+        return json.dumps([self.name, suffix, labels])
+
+    def get_labels(self, labels):
+        return [[name, str(labels[name])] for name in self.labelnames]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self.get_key("", self.get_labels(labels))
+        self.registry.incr([(key, amount)])
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, documentation, labelnames, buckets):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        labels = self.get_labels(labels)
+        bucket = self.buckets[bisect.bisect_left(self.buckets, value)]
+        self.registry.incr(
+            [
+                (self.get_key("_bucket", labels + [["le", bucket]]), 1),
+                (self.get_key("_sum", labels), value),
+                (self.get_key("_count", labels), 1),
+            ]
+        )
+
+
+class Registry:
+    """
+    A registry of metrics. Their values are kept in-process, or in a file of
+    the ``FILTERS_METRICS_DIR`` directory for each process.
+    """
+
+    def __init__(self):
+        self.metrics = OrderedDict()
+        self.lock = threading.Lock()
+        self.store = None
+        self.store_key = None
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(self, name, documentation, labelnames)
+        self.metrics[name] = metric
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(self, name, documentation, labelnames, buckets)
+        self.metrics[name] = metric
+        return metric
+
+    def get_store(self):
+        # reopen the store in forked processes, and when the setting changes
+        key = (os.getpid(), settings.METRICS_DIR)
+        if key != self.store_key:
+            if self.store is not None and self.store_key[0] == key[0]:
+                self.store.close()
+            pid, directory = key
+            if directory:
+                self.store = MmapValues(os.path.join(directory, "%d.db" % pid))
+            else:
+                self.store = MemoryValues()
+            self.store_key = key
+        return self.store
+
+    def incr(self, amounts):
+        with self.lock:
+            store = self.get_store()
+            for key, amount in amounts:
+                store.incr(key, amount)
+
+    def collect(self):
+        """
+        Return a dict of the values of all processes, by key.
+        """
+        directory = settings.METRICS_DIR
+        if not directory:
+            with self.lock:
+                return dict(self.get_store().items())
+
+        values = {}
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith(".db"):
+                for key, value in read_file(os.path.join(directory, filename)):
+                    values[key] = values.get(key, 0) + value
+        return values
+
+    def clear(self):
+        """
+        Clear the values of this process.
+        """
+        with self.lock:
+            if self.store is not None:
+                self.store.close()
+                if isinstance(self.store, MmapValues):
+                    os.remove(self.store.path)
+            self.store = self.store_key = None
+
+    def render(self):
+        """
+        Return the metrics in the Prometheus text format.
+        """
+        samples = {}
+        for key, value in self.collect().items():
+            name, suffix, labels = json.loads(key)
+            samples.setdefault(name, []).append((suffix, labels, value))
+
+        lines = []
+        for metric in self.metrics.values():
+            lines.append("# HELP %s %s" % (metric.name, metric.documentation))
+            lines.append("# TYPE %s %s" % (metric.name, metric.kind))
+            if metric.kind == "histogram":
+                metric_samples = get_histogram_samples(
+                    metric, samples.get(metric.name, [])
+                )
+            else:
+                metric_samples = sorted(samples.get(metric.name, []))
+            for suffix, labels, value in metric_samples:
+                lines.append(
+                    "%s%s%s %s"
+                    % (metric.name, suffix, format_labels(labels), format_value(value))
+                )
+        return "\n".join(lines) + "\n"
+
+
+def get_histogram_samples(metric, samples):
+    """
+    Return the samples of a histogram, with cumulative bucket counts.
+    """
+    series = {}
+    for suffix, labels, value in samples:
+        if suffix == "_bucket":
+            le = labels.pop()[1]
+            series.setdefault(tuple(map(tuple, labels)), {})[le] = value
+        else:
+            series.setdefault(tuple(map(tuple, labels)), {})[suffix] = value
+
+    result = []
+    for labels in sorted(series):
+        values, total = series[labels], 0
+        labels = [list(label) for label in labels]
+        for bucket in metric.buckets:
+            total += values.get(bucket, 0)
+            result.append(("_bucket", labels + [["le", bucket]], total))
+        result.append(("_sum", labels, values.get("_sum", 0)))
+        result.append(("_count", labels, values.get("_count", 0)))
+    return result
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{%s}" % ",".join(
+        '%s="%s"' % (name, escape(format_value(value) if name == "le" else value))
+        for name, value in labels
+    )
+
+
+def escape(value):
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+registry = Registry()
+
+REQUESTS = registry.counter(
+    "django_filters_requests_total",
+    "Requests to FilterSets with filter data.",
+    ["filterset"],
+)
+FILTER_ACTIVATIONS = registry.counter(
+    "django_filters_filter_activations_total",
+    "Applications of filters with a value.",
+    ["filterset", "filter"],
+)
+VALIDATION_FAILURES = registry.counter(
+    "django_filters_validation_failures_total",
+    "Validation errors of FilterSet forms.",
+    ["filterset", "field", "code"],
+)
+VALIDATION_SECONDS = registry.histogram(
+    "django_filters_validation_seconds",
+    "Duration of FilterSet form validation.",
+    ["filterset"],
+)
+FILTER_SECONDS = registry.histogram(
+    "django_filters_filter_seconds",
+    "Duration of building the queryset of a filter.",
+    ["filterset", "filter"],
+)
+EVALUATION_SECONDS = registry.histogram(
+    "django_filters_evaluation_seconds",
+    "Duration of the queries of filtered querysets.",
+    ["filterset", "method"],
+)
+
+
+def record_form_validation(sender, filterset, duration, exception=None, **kwargs):
+    if exception is not None:
+        return
+    path = get_filterset_path(sender)
+    REQUESTS.inc(filterset=path)
+    VALIDATION_SECONDS.observe(duration, filterset=path)
+    for field, errors in filterset.form.errors.as_data().items():
+        for error in errors:
+            code = error.code or "invalid"
+            VALIDATION_FAILURES.inc(filterset=path, field=field, code=code)
+
+
+def record_filter(sender, name, duration, exception=None, **kwargs):
+    if exception is not None:
+        return
+    path = get_filterset_path(sender)
+    FILTER_ACTIVATIONS.inc(filterset=path, filter=name)
+    FILTER_SECONDS.observe(duration, filterset=path, filter=name)
+
+
+def record_qs_evaluation(sender, method, duration, exception=None, **kwargs):
+    if exception is not None:
+        return
+    path = get_filterset_path(sender)
+    EVALUATION_SECONDS.observe(duration, filterset=path, method=method)
+
+
+RECEIVERS = [
+    (signals.post_form_validation, record_form_validation),
+    (signals.post_filter, record_filter),
+    (signals.post_qs_evaluation, record_qs_evaluation),
+]
+
+
+def connect():
+    """
+    Record metrics from the timing signals.
+    """
+    for signal, receiver in RECEIVERS:
+        signal.connect(receiver, dispatch_uid="django_filters.metrics")
+
+
+def disconnect():
+    for signal, receiver in RECEIVERS:
+        signal.disconnect(receiver, dispatch_uid="django_filters.metrics")
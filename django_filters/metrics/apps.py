@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+from django.utils.translation import gettext_lazy as _
+
+
+class MetricsConfig(AppConfig):
+    name = "django_filters.metrics"
+    label = "django_filters_metrics"
+    verbose_name = _("Filter metrics")
+
+    def ready(self):
+        from . import connect
+
+        connect()
@@ -0,0 +1,10 @@
+from django.http import HttpResponse
+
+from . import CONTENT_TYPE, registry
+
+
+def metrics(request):
+    """
+    Render the metrics of all processes in the Prometheus text format.
+    """
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
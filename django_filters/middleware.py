@@ -0,0 +1,54 @@
+from collections import OrderedDict
+
+from .signals import collect_timings
+
+# The Server-Timing metric names of the phases.
+METRIC_NAMES = {
+    "filterset_class": "filterset-class",
+    "filterset_init": "filterset-init",
+    "form_validation": "form-validation",
+    "filter": "filter",
+    "qs_evaluation": "qs",
+}
+
+
+class ServerTimingMiddleware:
+    """
+    Add a ``Server-Timing`` header with the timings of the ``FilterSet``\\s
+    used by the response's view, such as a ``FilterView`` or a view that is
+    filtered by the ``DjangoFilterBackend``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with collect_timings() as timings:
+            response = self.get_response(request)
+
+        if timings:
+            header = get_server_timing(timings)
+            if response.has_header("Server-Timing"):
+                header = "%s, %s" % (response["Server-Timing"], header)
+            response["Server-Timing"] = header
+        return response
+
+
+def get_server_timing(timings):
+    """
+    Return the ``Server-Timing`` header value for the ``Timing``\\s, with a
+    metric for each phase and name, summed over repeats of the phase. The
+    metric's description is the name of its ``FilterSet`` class.
+    """
+    metrics = OrderedDict()
+    for timing in timings:
+        name = METRIC_NAMES.get(timing.phase, timing.phase)
+        if timing.name is not None:
+            name = "%s.%s" % (name, timing.name)
+        key = (name, timing.filterset.__name__)
+        metrics[key] = metrics.get(key, 0) + timing.duration
+
+    return ", ".join(
+        '%s;dur=%.3f;desc="%s"' % (name, duration * 1000, desc)
+        for (name, desc), duration in metrics.items()
+    )
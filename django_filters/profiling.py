@@ -0,0 +1,164 @@
+"""
+Sampling of the stacks of slow requests that use a ``FilterSet``.
+
+The ``SamplingProfilerMiddleware`` samples the stack of the request's thread
+from a background thread, every ``FILTERS_PROFILE_INTERVAL`` seconds, for
+the views that are backed by a ``FilterSet``. When the request takes longer
+than ``FILTERS_PROFILE_THRESHOLD`` seconds, the samples are written to the
+``FILTERS_PROFILE_DIR`` directory, in the collapsed stack format of
+flamegraph tools. The stacks are rooted at a frame of the ``FilterSet``
+classes and their active filters.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .conf import settings
+from .signals import collect_timings
+
+
+class Sampler:
+    """
+    Sample the stacks of the registered threads from a background thread,
+    which runs while threads are registered.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stacks = {}
+        self.thread = None
+
+    def register(self, thread_id):
+        """
+        Start sampling the thread, and return the ``Counter`` of its stacks.
+        """
+        stacks = Counter()
+        with self.lock:
+            self.stacks[thread_id] = stacks
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.run, name="django_filters.profiling", daemon=True
+                )
+                self.thread.start()
+        return stacks
+
+    def unregister(self, thread_id):
+        with self.lock:
+            self.stacks.pop(thread_id, None)
+
+    def run(self):
+        while True:
+            time.sleep(settings.PROFILE_INTERVAL)
+            with self.lock:
+                if not self.stacks:
+                    self.thread = None
+                    return
+                frames = sys._current_frames()
+                for thread_id, stacks in self.stacks.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stacks[collapse_stack(frame)] += 1
+
+
+sampler = Sampler()
+
+
+def collapse_stack(frame):
+    """
+    Return the stack of the frame as ``module:function`` frames joined by
+    semicolons, from the outermost frame.
+    """
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        name = getattr(code, "co_qualname", code.co_name)
+        names.append("%s:%s" % (frame.f_globals.get("__name__", "?"), name))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def is_filterset_view(view_func):
+    """
+    Return True if the view is a ``FilterView``, or is filtered by the
+    ``DjangoFilterBackend``.
+    """
+    from .views import FilterMixin
+
+    cls = getattr(view_func, "cls", None) or getattr(view_func, "view_class", None)
+    if cls is None:
+        return False
+    if issubclass(cls, FilterMixin):
+        return True
+
+    backends = getattr(cls, "filter_backends", None)
+    if not backends:
+        return False
+
+    # views with filter backends are REST framework views
+    from .rest_framework import DjangoFilterBackend
+
+    return any(issubclass(backend, DjangoFilterBackend) for backend in backends)
+
+
+def get_tag(timings):
+    """
+    Return the root frame of the stacks, of the ``FilterSet`` classes and the
+    filters that were applied.
+    """
+    filtersets = {}
+    for timing in timings:
+        names = filtersets.setdefault(timing.filterset.__name__, [])
+        if timing.phase == "filter" and timing.name not in names:
+            names.append(timing.name)
+    return " ".join(
+        "%s(%s)" % (filterset, ",".join(names))
+        for filterset, names in filtersets.items()
+    )
+
+
+class SamplingProfilerMiddleware:
+    """
+    Write the sampled stacks of the requests to ``FilterSet``-backed views
+    that take longer than ``FILTERS_PROFILE_THRESHOLD`` seconds.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILE_DIR:
+            raise ImproperlyConfigured(
+                "SamplingProfilerMiddleware requires the FILTERS_PROFILE_DIR setting."
+            )
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with collect_timings() as timings:
+            start = time.perf_counter()
+            try:
+                response = self.get_response(request)
+            finally:
+                stacks = getattr(request, "_filter_stacks", None)
+                if stacks is not None:
+                    sampler.unregister(threading.get_ident())
+            duration = time.perf_counter() - start
+
+        if stacks and timings and duration > settings.PROFILE_THRESHOLD:
+            self.write_stacks(stacks, get_tag(timings), duration)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if is_filterset_view(view_func):
+            request._filter_stacks = sampler.register(threading.get_ident())
+
+    def write_stacks(self, stacks, tag, duration):
+        filename = "%s-%dms-%d.collapsed" % (
+            time.strftime("%Y%m%d%H%M%S"),
+            duration * 1000,
+            threading.get_ident(),
+        )
+        lines = ["%s;%s %d\n" % (tag, stack, count) for stack, count in stacks.items()]
+        with open(os.path.join(settings.PROFILE_DIR, filename), "w") as f:
+            f.write("".join(lines))
@@ -1,6 +1,8 @@
+import time
+
 from django.template import loader
 
-from .. import compat, utils
+from .. import compat, signals, utils
 from . import filterset
 
 
@@ -15,12 +17,17 @@ class DjangoFilterBackend:
         return "django_filters/rest_framework/form.html"
 
     def get_filterset(self, request, queryset, view):
+        start = time.perf_counter()
         filterset_class = self.get_filterset_class(view, queryset)
         if filterset_class is None:
             return None
+        signals.add_timing("filterset_class", filterset_class, start)
 
+        start = time.perf_counter()
         kwargs = self.get_filterset_kwargs(request, queryset, view)
-        return filterset_class(**kwargs)
+        filterset = filterset_class(**kwargs)
+        signals.add_timing("filterset_init", filterset_class, start)
+        return filterset
 
     def get_filterset_class(self, view, queryset=None):
         """
@@ -0,0 +1,296 @@
+"""
+Pre-aggregated facet counts for a ``FilterSet``'s low-cardinality filters.
+
+A ``FilterSet`` that declares ``Meta.rollup`` has the number of rows for each
+combination of its rolled up filters' values stored in a side table. The
+table is updated from the model's signals and may be rebuilt with the
+``rebuild_rollups`` management command. ``FilterSet.facets()`` answers the
+facets of the rolled up filters from the table, as long as the queryset is
+unfiltered and only rolled up filters are in use.
+
+Add ``"django_filters.rollups"`` to ``INSTALLED_APPS`` to use rollups. A
+rollup is only kept up to date by the processes that have imported its
+``FilterSet``. So that every process does, such as task workers and
+management commands, the app imports the ``filters`` and ``filtersets``
+modules of the installed apps when it is ready. Import the ``FilterSet``\\s
+with rollups that are declared elsewhere from one of these modules, or from
+an ``AppConfig.ready()``.
+"""
+
+import hashlib
+import json
+from collections import defaultdict
+
+from django.apps import apps as global_apps
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import router, transaction
+from django.db.models import Count, F
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from ..constants import EMPTY_VALUES
+from ..facets import get_facet_key, is_facet
+from ..filters import MultipleChoiceFilter
+from ..utils import get_model_field
+
+# FilterSet classes with rollups, keyed by model and rollup name
+registry = defaultdict(dict)
+
+
+def get_rollup_model():
+    try:
+        return global_apps.get_model("django_filters_rollups", "FacetRollup")
+    except LookupError:
+        raise ImproperlyConfigured(
+            "'Meta.rollup' requires 'django_filters.rollups' in INSTALLED_APPS."
+        ) from None
+
+
+def get_rollup_class(filterset_class):
+    """
+    Return the class that declares the filterset's rollup. Subclasses that
+    inherit the ``Meta.rollup`` of a class, for the same model, share its
+    rollup.
+    """
+    for cls in filterset_class.__mro__:
+        meta = vars(cls).get("Meta")
+        if meta is None or "rollup" not in vars(meta):
+            continue
+        if (
+            getattr(cls, "_meta", None) is not None
+            and cls._meta.model is filterset_class._meta.model
+            and cls._meta.rollup == filterset_class._meta.rollup
+        ):
+            return cls
+        break
+    return filterset_class
+
+
+def get_rollup_name(filterset_class):
+    """
+    Return the name the filterset's rows are stored under. The dimensions are
+    part of the name, so that rows for outdated dimensions are not used.
+    """
+    rollup_class = get_rollup_class(filterset_class)
+    return "%s.%s:%s" % (
+        rollup_class.__module__,
+        rollup_class.__qualname__,
+        ",".join(filterset_class._meta.rollup),
+    )
+
+
+def get_rollup_fields(filterset_class):
+    """
+    Return the model fields of the filterset's rolled up filters.
+    """
+    model = filterset_class._meta.model
+    fields = []
+    for name in filterset_class._meta.rollup:
+        filter_ = filterset_class.base_filters[name]
+        fields.append(get_model_field(model, get_facet_key(filter_)))
+    return fields
+
+
+def get_key(values):
+    data = json.dumps(values, cls=DjangoJSONEncoder, separators=(",", ":"))
+    return hashlib.sha1(data.encode(), usedforsecurity=False).hexdigest()
+
+
+def register(filterset_class):
+    """
+    Validate the filterset's rolled up dimensions, and keep its rollup up to
+    date with changes to the model's rows. Subclasses that inherit a rollup
+    are not registered, and a class that is declared again, e.g. in a
+    function, replaces the class of the same name.
+    """
+    if get_rollup_class(filterset_class) is not filterset_class:
+        return
+
+    model = filterset_class._meta.model
+    assert model is not None, (
+        "'%s' declares 'Meta.rollup' without a 'Meta.model'." % filterset_class.__name__
+    )
+
+    for name in filterset_class._meta.rollup:
+        filter_ = filterset_class.base_filters.get(name)
+        assert filter_ is not None and is_facet(filter_), (
+            "'%s.Meta.rollup' includes '%s', which is not a choice or boolean "
+            "filter." % (filterset_class.__name__, name)
+        )
+
+        # Only the model's own fields are known when its rows are saved.
+        key = get_facet_key(filter_)
+        field = get_model_field(model, key)
+        assert (
+            LOOKUP_SEP not in key
+            and field is not None
+            and field.concrete
+            and not field.many_to_many
+        ), (
+            "'%s.Meta.rollup' includes '%s', which does not filter a "
+            "single-valued field of '%s'."
+            % (filterset_class.__name__, name, model._meta.object_name)
+        )
+
+    if not registry[model]:
+        uid = "django_filters.rollups.%s" % model._meta.label_lower
+        pre_save.connect(handle_pre_save, sender=model, dispatch_uid=uid)
+        post_save.connect(handle_post_save, sender=model, dispatch_uid=uid)
+        post_delete.connect(handle_post_delete, sender=model, dispatch_uid=uid)
+    registry[model][get_rollup_name(filterset_class)] = filterset_class
+
+
+def unregister(filterset_class):
+    """
+    Stop updating the filterset's rollup.
+    """
+    model = filterset_class._meta.model
+    registry[model].pop(get_rollup_name(filterset_class), None)
+
+    if not registry[model]:
+        uid = "django_filters.rollups.%s" % model._meta.label_lower
+        pre_save.disconnect(sender=model, dispatch_uid=uid)
+        post_save.disconnect(sender=model, dispatch_uid=uid)
+        post_delete.disconnect(sender=model, dispatch_uid=uid)
+
+
+def get_instance_values(filterset_class, instance):
+    return [
+        field.to_python(getattr(instance, field.attname))
+        for field in get_rollup_fields(filterset_class)
+    ]
+
+
+def update_count(filterset_class, values, delta, using):
+    FacetRollup = get_rollup_model()
+    name, key = get_rollup_name(filterset_class), get_key(values)
+    rows = FacetRollup.objects.using(using).filter(rollup=name, key=key)
+
+    if not rows.update(count=F("count") + delta) and delta > 0:
+        with transaction.atomic(using=using):
+            _, created = FacetRollup.objects.using(using).get_or_create(
+                rollup=name, key=key, defaults={"values": values, "count": delta}
+            )
+        if not created:
+            rows.update(count=F("count") + delta)
+
+
+def handle_pre_save(sender, instance, raw, using, **kwargs):
+    # Remember the stored values, so that their count can be decremented.
+    if instance._state.adding or instance.pk is None:
+        return
+
+    stored = sender._base_manager.using(using).filter(pk=instance.pk).first()
+    if stored is not None:
+        instance._rollup_values = {
+            filterset_class: get_instance_values(filterset_class, stored)
+            for filterset_class in registry[sender].values()
+        }
+
+
+def handle_post_save(sender, instance, created, raw, using, **kwargs):
+    stored_values = instance.__dict__.pop("_rollup_values", {})
+    for filterset_class in registry[sender].values():
+        values = get_instance_values(filterset_class, instance)
+        stored = stored_values.get(filterset_class)
+        if stored == values:
+            continue
+        if stored is not None:
+            update_count(filterset_class, stored, -1, using)
+        update_count(filterset_class, values, 1, using)
+
+
+def handle_post_delete(sender, instance, using, **kwargs):
+    for filterset_class in registry[sender].values():
+        values = get_instance_values(filterset_class, instance)
+        update_count(filterset_class, values, -1, using)
+
+
+def rebuild(filterset_class, using=None):
+    """
+    Recount the filterset's rollup from the model's rows.
+    """
+    FacetRollup = get_rollup_model()
+    model = filterset_class._meta.model
+    using = using or router.db_for_write(FacetRollup)
+    name = get_rollup_name(filterset_class)
+    prefix = name.rsplit(":", 1)[0] + ":"
+
+    fields = get_rollup_fields(filterset_class)
+    rows = model._base_manager.using(using).order_by()
+    rows = rows.values_list(*[field.attname for field in fields])
+    rows = rows.annotate(count=Count("pk"))
+
+    objs = []
+    for *values, count in rows:
+        values = [field.to_python(value) for field, value in zip(fields, values)]
+        objs.append(
+            FacetRollup(rollup=name, key=get_key(values), values=values, count=count)
+        )
+
+    with transaction.atomic(using=using):
+        FacetRollup.objects.using(using).filter(rollup__startswith=prefix).delete()
+        FacetRollup.objects.using(using).bulk_create(objs)
+
+
+def get_rollup_counts(filterset):
+    """
+    Return the facet counts of the filterset's rolled up filters, keyed by
+    filter name, or an empty dict if the rollup cannot answer the facets.
+    """
+    query = filterset.queryset.query
+    if query.where or query.is_sliced or query.combinator:
+        return {}
+
+    dimensions = filterset._meta.rollup
+    allowed = {}
+    if filterset.is_bound:
+        filterset.errors
+        for name, value in filterset.form.cleaned_data.items():
+            if value in EMPTY_VALUES:
+                continue
+            values = get_allowed_values(filterset.filters[name], value)
+            if name not in dimensions or values is None:
+                return {}
+            allowed[name] = values
+
+    FacetRollup = get_rollup_model()
+    rows = FacetRollup.objects.using(filterset.queryset.db)
+    rows = rows.filter(rollup=get_rollup_name(type(filterset)))
+
+    counts = {name: defaultdict(int) for name in dimensions}
+    for values, count in rows.values_list("values", "count"):
+        row = {
+            name: None if value is None else str(value)
+            for name, value in zip(dimensions, values)
+        }
+        matches = {name for name in allowed if row[name] in allowed[name]}
+        for name, value in zip(dimensions, values):
+            # a facet is counted without the filtering of its own filter
+            if matches >= allowed.keys() - {name}:
+                counts[name][value] += count
+
+    return {name: dict(counts[name]) for name in dimensions}
+
+
+def get_allowed_values(filter_, value):
+    """
+    Return the set of stored values, as strings, that match the filter's
+    value, or None if the filter cannot be answered from the rollup.
+    """
+    if filter_.exclude:
+        return None
+
+    if isinstance(filter_, MultipleChoiceFilter):
+        if filter_.conjoined and len(value) > 1:
+            return None
+        values = list(value)
+    else:
+        values = [value]
+
+    null_value = getattr(filter_, "null_value", None)
+    return {
+        None if v is None or v == null_value else str(getattr(v, "pk", v))
+        for v in values
+    }
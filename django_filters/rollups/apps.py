@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+from django.utils.translation import gettext_lazy as _
+
+
+class RollupsConfig(AppConfig):
+    name = "django_filters.rollups"
+    label = "django_filters_rollups"
+    verbose_name = _("Filter rollups")
+    default_auto_field = "django.db.models.BigAutoField"
+
+    def ready(self):
+        # declare the FilterSets with rollups, which connects their handlers
+        autodiscover_modules("filters", "filtersets")
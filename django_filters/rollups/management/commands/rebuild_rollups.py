@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from ....utils import import_filterset_class
+from ... import get_rollup_name, rebuild, registry
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the rollup tables of FilterSets that declare 'Meta.rollup'. "
+        "Without arguments, all FilterSets that have been imported are rebuilt."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "filtersets",
+            nargs="*",
+            metavar="filterset",
+            help="Dotted path of a FilterSet class, e.g. 'myapp.filters.F'.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="The database to rebuild the rollups in. Defaults to 'default'.",
+        )
+
+    def handle(self, *args, **options):
+        if options["filtersets"]:
+            filterset_classes = [
+                self.get_filterset_class(path) for path in options["filtersets"]
+            ]
+        else:
+            filterset_classes = [
+                f for classes in registry.values() for f in classes.values()
+            ]
+
+        for filterset_class in filterset_classes:
+            rebuild(filterset_class, using=options["database"])
+            if options["verbosity"] >= 1:
+                self.stdout.write("Rebuilt %s" % get_rollup_name(filterset_class))
+
+    def get_filterset_class(self, path):
+        filterset_class = import_filterset_class(path)
+        if not filterset_class._meta.rollup:
+            raise CommandError("'%s' does not declare 'Meta.rollup'." % path)
+        return filterset_class
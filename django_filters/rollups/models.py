@@ -0,0 +1,24 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class FacetRollup(models.Model):
+    """
+    The number of rows of a model that have a combination of values for the
+    rolled up dimensions of a ``FilterSet``.
+    """
+
+    rollup = models.CharField(max_length=255)
+    key = models.CharField(max_length=40)
+    values = models.JSONField(encoder=DjangoJSONEncoder)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["rollup", "key"], name="django_filters_rollup_key"
+            ),
+        ]
+
+    def __str__(self):
+        return "%s %s: %d" % (self.rollup, self.values, self.count)
@@ -0,0 +1,155 @@
+"""
+Recording and replay of the params that ``FilterSet``\\s are used with.
+
+When ``FILTERS_SAMPLE_FILE`` is set, a ``FILTERS_SAMPLE_RATE`` fraction of
+the evaluated ``FilterSet``\\s append their class and params to the file, as
+JSON lines. Params that do not belong to a filter are dropped, and the
+values of free text filters are masked. The ``replay_filter_samples``
+management command replays the samples against a database, and reports the
+latency and query counts of each shape of request.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+
+from django import forms
+from django.db import connections
+from django.http import QueryDict
+from django.test.utils import CaptureQueriesContext
+from django.utils.module_loading import import_string
+
+from .conf import settings
+from .workload import get_filterset_path
+
+_lock = threading.Lock()
+
+
+def record(filterset):
+    """
+    Append a sample of the filterset's class and params to the sample file,
+    for a ``FILTERS_SAMPLE_RATE`` fraction of calls.
+    """
+    if random.random() >= settings.SAMPLE_RATE:
+        return
+
+    sample = {
+        "filterset": get_filterset_path(type(filterset)),
+        "params": anonymize(filterset),
+    }
+    line = json.dumps(sample) + "\n"
+    with _lock:
+        with open(settings.SAMPLE_FILE, "a") as f:
+            f.write(line)
+
+
+def anonymize(filterset):
+    """
+    Return a dict of the filterset's params that belong to its filters, with
+    the values of free text filters masked.
+    """
+    params = {}
+    for key, values in get_lists(filterset.data):
+        name = get_filter_name(filterset, key)
+        if name is None:
+            continue
+        values = [str(value) for value in values]
+        if is_free_text(filterset.filters[name]):
+            values = [mask(value) for value in values]
+        params[key] = values
+    return params
+
+
+def get_lists(data):
+    """
+    Return the ``(key, values)`` pairs of a ``QueryDict`` or a plain dict.
+    """
+    if hasattr(data, "lists"):
+        return data.lists()
+    return [
+        (key, value if isinstance(value, (list, tuple)) else [value])
+        for key, value in data.items()
+    ]
+
+
+def get_filter_name(filterset, key):
+    """
+    Return the name of the filter that the param ``key`` belongs to, either
+    directly, or as one of the params of a multi-value widget.
+    """
+    candidates = []
+    for name in filterset.filters:
+        param = filterset.form.add_prefix(name)
+        if key == param:
+            return name
+        if key.startswith(param + "_"):
+            candidates.append(name)
+    if candidates:
+        return max(candidates, key=len)
+    return None
+
+
+def is_free_text(filter_):
+    field_class = filter_.field_class
+    return issubclass(field_class, forms.CharField) and not issubclass(
+        field_class, (forms.ChoiceField, forms.UUIDField)
+    )
+
+
+def mask(value):
+    """
+    Replace the letters of the value with 'x', and its digits with '0', so
+    that its length and form are kept.
+    """
+    return re.sub(r"\d", "0", re.sub(r"[^\W\d_]", "x", value))
+
+
+def read_samples(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def get_shape(sample):
+    return (sample["filterset"], tuple(sorted(sample["params"])))
+
+
+def replay(samples, using, page_size):
+    """
+    Replay the samples against the ``using`` database, and return a dict of
+    the durations and query counts of the samples, by shape. Each sample is
+    counted, and a page of ``page_size`` results is fetched, as a paginated
+    view would. Samples of FilterSets that cannot be imported are skipped.
+    """
+    results = {}
+    for sample in samples:
+        try:
+            filterset_class = import_string(sample["filterset"])
+        except ImportError:
+            continue
+        data = QueryDict(mutable=True)
+        for key, values in sample["params"].items():
+            data.setlist(key, values)
+        queryset = filterset_class._meta.model._default_manager.using(using)
+
+        with CaptureQueriesContext(connections[using]) as queries:
+            start = time.perf_counter()
+            qs = filterset_class(data, queryset=queryset).qs
+            qs.count()
+            list(qs[:page_size])
+            duration = time.perf_counter() - start
+
+        result = results.setdefault(get_shape(sample), {"durations": [], "queries": []})
+        result["durations"].append(duration)
+        result["queries"].append(len(queries))
+    return results
+
+
+def percentile(values, percent):
+    """
+    Return the nearest-rank percentile of the values.
+    """
+    values = sorted(values)
+    rank = max(int(-(-len(values) * percent // 100)), 1)
+    return values[rank - 1]
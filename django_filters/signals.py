@@ -0,0 +1,200 @@
+"""
+Signals sent around the phases of a ``FilterSet``'s work, with timings.
+
+Each ``pre_*`` signal is sent before a phase, and each ``post_*`` signal
+after it, with the phase's ``duration`` in seconds, as measured by
+``time.perf_counter()``. The sender is the ``FilterSet`` class, and every
+signal is sent with the ``filterset`` instance:
+
+* ``pre_form_validation`` and ``post_form_validation``, around the
+  validation of the filterset's form.
+* ``pre_filter`` and ``post_filter``, around the ``filter()`` call of each
+  filter with a value, including ``method`` filters, with the filter's
+  ``name`` and ``value``.
+* ``pre_qs_evaluation`` and ``post_qs_evaluation``, around each query of
+  ``FilterSet.qs``, or of a queryset derived from it, with the ``queryset``
+  and the queryset ``method`` that queried the database: ``"fetch"``,
+  ``"count"`` or ``"exists"``.
+
+If a phase raises, its ``post_*`` signal is still sent, so that each
+``pre_*`` signal is paired, with the raised ``exception``. It is ``None`` if
+the phase succeeded. Receivers should not record a failed phase as a finished
+one, and ``collect_timings()`` does not collect it.
+
+The phases are not timed unless a signal has receivers, or timings are
+being collected with ``collect_timings()``.
+"""
+
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.dispatch import Signal
+
+pre_form_validation = Signal(use_caching=True)
+post_form_validation = Signal(use_caching=True)
+pre_filter = Signal(use_caching=True)
+post_filter = Signal(use_caching=True)
+pre_qs_evaluation = Signal(use_caching=True)
+post_qs_evaluation = Signal(use_caching=True)
+
+Timing = namedtuple("Timing", ("phase", "filterset", "name", "duration"))
+
+# The lists of the active collect_timings() blocks.
+_collectors = ContextVar("django_filters_timings", default=())
+
+
+@contextmanager
+def collect_timings():
+    """
+    Collect a ``Timing`` for each phase of the ``FilterSet``\\s used in the
+    block, in the order the phases end. Ex::
+
+        with collect_timings() as timings:
+            list(f.qs)
+
+        for timing in timings:
+            print(timing.phase, timing.name, timing.duration)
+
+    The ``phase`` is ``"form_validation"``, ``"filter"`` or
+    ``"qs_evaluation"``, and the ``name`` is the filter's name, the queryset
+    method, or ``None``. Views also collect the ``"filterset_class"`` and
+    ``"filterset_init"`` phases, for the resolution of the filterset class
+    and the filterset's instantiation. Timings are collected per thread and
+    asyncio task.
+    """
+    timings = []
+    token = _collectors.set(_collectors.get() + (timings,))
+    try:
+        yield timings
+    finally:
+        _collectors.reset(token)
+
+
+def is_enabled(pre, post):
+    """
+    Return True if the phase of the ``pre`` and ``post`` signals is timed.
+    """
+    return bool(_collectors.get() or pre.receivers or post.receivers)
+
+
+@contextmanager
+def timed(pre, post, phase, filterset, label=None, **kwargs):
+    """
+    Send the ``pre`` and ``post`` signals around the block, and collect its
+    timing with the ``label`` as its name, unless it raised. The phase should
+    only be timed if ``is_enabled()``.
+    """
+    sender = type(filterset)
+    pre.send(sender=sender, filterset=filterset, **kwargs)
+    start = time.perf_counter()
+    exception = None
+    try:
+        yield
+    except BaseException as e:
+        exception = e
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        post.send(
+            sender=sender,
+            filterset=filterset,
+            duration=duration,
+            exception=exception,
+            **kwargs,
+        )
+        if exception is None:
+            for timings in _collectors.get():
+                timings.append(Timing(phase, sender, label, duration))
+
+
+def add_timing(phase, filterset_class, start, label=None):
+    """
+    Collect the timing of a phase that began at the ``time.perf_counter()``
+    value ``start``, if timings are being collected.
+    """
+    collectors = _collectors.get()
+    if collectors:
+        timing = Timing(phase, filterset_class, label, time.perf_counter() - start)
+        for timings in collectors:
+            timings.append(timing)
+
+
+class InstrumentedQuerySetMixin:
+    """
+    Time the queries of a ``FilterSet``'s queryset, and of its clones.
+    """
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._filterset = self._filterset
+        return clone
+
+    def __reduce__(self):
+        # The instrumented classes are created at runtime, and can't be
+        # imported, so unpickle as an instance of the queryset class that
+        # they instrument.
+        state = self.__getstate__()
+        state.pop("_filterset", None)
+        return (object.__new__, (self._queryset_class,), state)
+
+    def _evaluate(self, method, func):
+        with timed(
+            pre_qs_evaluation,
+            post_qs_evaluation,
+            "qs_evaluation",
+            self._filterset,
+            label=method,
+            queryset=self,
+            method=method,
+        ):
+            return func()
+
+    def _fetch_all(self):
+        if self._result_cache is not None:
+            return super()._fetch_all()
+        return self._evaluate("fetch", super()._fetch_all)
+
+    def count(self):
+        if self._result_cache is not None:
+            return super().count()
+        return self._evaluate("count", super().count)
+
+    def exists(self):
+        if self._result_cache is not None:
+            return super().exists()
+        return self._evaluate("exists", super().exists)
+
+
+_instrumented_classes = {}
+
+
+def instrument_queryset(queryset, filterset):
+    """
+    Return a copy of the queryset that times its queries for the filterset.
+    """
+    cls = type(queryset)
+    if not issubclass(cls, InstrumentedQuerySetMixin):
+        if cls not in _instrumented_classes:
+            _instrumented_classes[cls] = type(
+                "Instrumented%s" % cls.__name__,
+                (InstrumentedQuerySetMixin, cls),
+                {"_queryset_class": cls},
+            )
+        queryset = queryset.all()
+        queryset.__class__ = _instrumented_classes[cls]
+    queryset._filterset = filterset
+    return queryset
+
+
+def uninstrument_queryset(queryset):
+    """
+    Return a copy of the queryset that does not time its queries.
+    """
+    if not isinstance(queryset, InstrumentedQuerySetMixin):
+        return queryset
+    queryset = queryset.all()
+    queryset.__class__ = queryset._queryset_class
+    del queryset._filterset
+    return queryset
@@ -0,0 +1,185 @@
+"""
+Logging of the ``FilterSet``\\s whose validation and evaluation are slow.
+
+When ``FILTERS_SLOW_THRESHOLD`` is set, ``FilterSet``\\s time their phases,
+and a record is logged to the ``django_filters.slow`` logger when the form
+validation, filters and a query of the filtered queryset together take
+longer than the threshold. Records describe the shape of the request, i.e.
+its active filters with their values replaced by type and size, so that no
+values are logged. Each shape is logged at most once every
+``FILTERS_SLOW_LOG_INTERVAL`` seconds, with the number of slow requests of
+the shape that were not logged. Queries that raise, e.g. on a statement
+timeout, are logged with the name of the exception as their ``error``.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+
+from django.core.exceptions import EmptyResultSet, FullResultSet
+
+from . import signals
+from .conf import settings
+from .constants import EMPTY_VALUES
+from .workload import get_filterset_path
+
+logger = logging.getLogger("django_filters.slow")
+
+# The shapes to remember for rate limiting, before the oldest are dropped.
+MAX_SHAPES = 1000
+
+SIZED_TYPES = (str, bytes, list, tuple, set, frozenset, dict)
+
+_shapes = {}
+_lock = threading.Lock()
+_state = {"connected": False}
+
+
+def connect():
+    """
+    Time the phases of ``FilterSet``\\s for the slow log.
+    """
+    if _state["connected"]:
+        return
+    signals.post_form_validation.connect(record_validation, dispatch_uid=__name__)
+    signals.post_filter.connect(record_filter, dispatch_uid=__name__)
+    signals.post_qs_evaluation.connect(record_evaluation, dispatch_uid=__name__)
+    _state["connected"] = True
+
+
+def disconnect():
+    signals.post_form_validation.disconnect(dispatch_uid=__name__)
+    signals.post_filter.disconnect(dispatch_uid=__name__)
+    signals.post_qs_evaluation.disconnect(dispatch_uid=__name__)
+    _state["connected"] = False
+
+
+def get_timings(filterset):
+    timings = vars(filterset).get("_slow_timings")
+    if timings is None:
+        timings = filterset._slow_timings = {"validation": 0, "filters": {}}
+    return timings
+
+
+def record_validation(sender, filterset, duration, exception=None, **kwargs):
+    if exception is not None:
+        return
+    get_timings(filterset)["validation"] += duration
+
+
+def record_filter(sender, filterset, name, duration, exception=None, **kwargs):
+    if exception is not None:
+        return
+    filters = get_timings(filterset)["filters"]
+    filters[name] = filters.get(name, 0) + duration
+
+
+def record_evaluation(
+    sender, filterset, queryset, method, duration, exception=None, **kwargs
+):
+    threshold = settings.SLOW_THRESHOLD
+    if threshold is None:
+        return
+
+    timings = get_timings(filterset)
+    total = timings["validation"] + sum(timings["filters"].values()) + duration
+    if total <= threshold:
+        return
+
+    shape = get_shape(filterset)
+    suppressed = throttle((sender, json.dumps(shape)))
+    if suppressed is None:
+        return
+
+    rows = None
+    if method == "fetch" and exception is None:
+        rows = len(queryset._result_cache)
+    record = {
+        "filterset": get_filterset_path(sender),
+        "shape": shape,
+        "sql_fingerprint": get_sql_fingerprint(queryset),
+        "method": method,
+        "rows": rows,
+        "error": type(exception).__name__ if exception is not None else None,
+        "timings": {
+            "validation": timings["validation"],
+            "filters": timings["filters"],
+            "evaluation": duration,
+            "total": total,
+        },
+        "suppressed": suppressed,
+    }
+    logger.warning(json.dumps(record), extra={"slow_filterset": record})
+
+
+def get_shape(filterset):
+    """
+    Return the active filters of the filterset, as a list of dicts of their
+    name and lookup, and the type and size of their value.
+    """
+    shape = []
+    if not filterset.is_bound or not hasattr(filterset.form, "cleaned_data"):
+        return shape
+
+    for name, value in filterset.form.cleaned_data.items():
+        if value in EMPTY_VALUES:
+            continue
+        shape.append(
+            {
+                "name": name,
+                "lookup": filterset.filters[name].lookup_expr,
+                "type": type(value).__name__,
+                "size": len(value) if isinstance(value, SIZED_TYPES) else None,
+            }
+        )
+    return shape
+
+
+def get_sql_template(queryset):
+    """
+    Return the queryset's SQL without its params, with lists of placeholders
+    and the limits of slices collapsed, or None if the queryset cannot match
+    any rows.
+    """
+    compiler = queryset.query.get_compiler(queryset.db)
+    try:
+        sql, _ = compiler.as_sql()
+    except (EmptyResultSet, FullResultSet):
+        return None
+    sql = re.sub(r"%s(, %s)+", "%s", sql)
+    return re.sub(r"\b(LIMIT|OFFSET) \d+", r"\1 %s", sql)
+
+
+def get_sql_fingerprint(queryset):
+    """
+    Return a hash of the queryset's SQL template, or None if the queryset
+    cannot match any rows. See ``get_sql_template()``.
+    """
+    sql = get_sql_template(queryset)
+    if sql is None:
+        return None
+    return hashlib.md5(sql.encode(), usedforsecurity=False).hexdigest()
+
+
+def throttle(key):
+    """
+    Return the number of times the key was throttled since it was last
+    allowed, or None if it is throttled now.
+    """
+    now = time.monotonic()
+    interval = settings.SLOW_LOG_INTERVAL
+    with _lock:
+        logged, suppressed = _shapes.get(key, (None, 0))
+        if logged is not None and now - logged < interval:
+            _shapes[key] = (logged, suppressed + 1)
+            return None
+
+        # keep the shapes in the order they were logged, oldest first
+        _shapes.pop(key, None)
+        while len(_shapes) >= MAX_SHAPES:
+            del _shapes[next(iter(_shapes))]
+        _shapes[key] = (now, 0)
+        return suppressed
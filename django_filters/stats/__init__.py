@@ -0,0 +1,252 @@
+"""
+Column statistics for estimating the selectivity of filters.
+
+The ``collect_filter_statistics`` management command samples the fields
+referenced by ``FilterSet``\\s, and stores their row count, distinct count,
+null fraction, most common values and an equi-depth histogram. The stored
+statistics are cached in-process, and refreshed every
+``FILTERS_STATS_REFRESH_INTERVAL`` seconds.
+
+Add ``"django_filters.stats"`` to ``INSTALLED_APPS`` to use statistics.
+"""
+
+import bisect
+import datetime
+import decimal
+import json
+import time
+import uuid
+from collections import Counter
+
+from django.apps import apps as global_apps
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Model, QuerySet
+
+from ..conf import settings
+from ..facets import get_sample, get_sample_rate
+from ..utils import get_model_field
+
+MOST_COMMON_VALUES = 10
+HISTOGRAM_BUCKETS = 10
+
+# The in-process cache of statistics, keyed by (model label, field path).
+_cache = {"loaded": None, "statistics": {}}
+
+
+def get_statistics_model():
+    try:
+        return global_apps.get_model("django_filters_stats", "ColumnStatistics")
+    except LookupError:
+        raise ImproperlyConfigured(
+            "Column statistics require 'django_filters.stats' in INSTALLED_APPS."
+        ) from None
+
+
+def normalize(value):
+    """
+    Return the value as a JSON-compatible value, that sorts in the same order
+    as values of the same type.
+    """
+    if isinstance(value, Model):
+        return normalize(value.pk)
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc)
+        return value.isoformat()
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (datetime.timedelta, uuid.UUID)):
+        return str(value)
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, sort_keys=True, default=str)
+    return value
+
+
+def get_filter_fields(filterset_class):
+    """
+    Return the paths of the model fields filtered by the filterset.
+    """
+    model = filterset_class._meta.model
+    paths = []
+    for filter_ in filterset_class.base_filters.values():
+        if filter_.method is not None or filter_.field_name is None:
+            continue
+        if get_model_field(model, filter_.field_name) is not None:
+            paths.append(filter_.field_name)
+    return list(dict.fromkeys(paths))
+
+
+def collect(model, path, sample_size, using=None):
+    """
+    Sample the values of the model's field path, and store their statistics.
+    """
+    queryset = model._base_manager.db_manager(using).all()
+    row_count = queryset.count()
+    rate = get_sample_rate(queryset, sample_size, sample_size)
+
+    sample = get_sample(queryset, rate).order_by().values_list(path, flat=True)
+    values = [normalize(value) for value in sample]
+    non_null = [value for value in values if value is not None]
+    total = len(values)
+
+    counts = Counter(non_null)
+    distinct = len(counts)
+    if rate > 1 and total:
+        # Estimate the number of distinct values in the table from the number
+        # of values that appear exactly once in the sample (Haas and Stokes).
+        singles = sum(1 for count in counts.values() if count == 1)
+        rows = total * rate
+        distinct = total * distinct / (total - singles + singles * total / rows)
+        distinct = min(round(distinct), rows)
+
+    # values that are unique within the sample are left to the histogram
+    common = [
+        (value, count)
+        for value, count in counts.most_common(MOST_COMMON_VALUES)
+        if count > 1
+    ]
+    common_values = {value for value, _ in common}
+    rest = [value for value in non_null if value not in common_values]
+
+    try:
+        rest.sort()
+    except TypeError:
+        rest = []
+
+    histogram = []
+    buckets = min(HISTOGRAM_BUCKETS, len(rest) - 1)
+    if buckets > 0:
+        last = len(rest) - 1
+        histogram = [rest[i * last // buckets] for i in range(buckets + 1)]
+
+    ColumnStatistics = get_statistics_model()
+    statistics, _ = ColumnStatistics.objects.db_manager(using).update_or_create(
+        model=model._meta.label_lower,
+        field=path,
+        defaults={
+            "row_count": row_count,
+            "distinct_count": distinct,
+            "null_fraction": (total - len(non_null)) / total if total else 0,
+            "most_common_values": [[value, count / total] for value, count in common],
+            "histogram": histogram,
+        },
+    )
+    return statistics
+
+
+def clear_cache():
+    _cache["loaded"] = None
+    _cache["statistics"] = {}
+
+
+def get_statistics(model, path):
+    """
+    Return the stored statistics for the model's field path, or None.
+    """
+    loaded = _cache["loaded"]
+    if loaded is None or time.monotonic() - loaded > settings.STATS_REFRESH_INTERVAL:
+        ColumnStatistics = get_statistics_model()
+        _cache["statistics"] = {
+            (statistics.model, statistics.field): statistics
+            for statistics in ColumnStatistics.objects.all()
+        }
+        _cache["loaded"] = time.monotonic()
+
+    return _cache["statistics"].get((model._meta.label_lower, path))
+
+
+def estimate_selectivity(model, path, lookup_expr, value):
+    """
+    Return the estimated fraction of the model's rows whose field path
+    matches the lookup and value, or None if it cannot be estimated.
+    """
+    statistics = get_statistics(model, path)
+    if statistics is None:
+        return None
+
+    if isinstance(value, slice):
+        lookup_expr, value = "range", (value.start, value.stop)
+    if isinstance(value, (list, tuple, set, QuerySet)) and lookup_expr == "exact":
+        lookup_expr = "in"
+
+    try:
+        if lookup_expr in ("exact", "iexact"):
+            return get_equal_fraction(statistics, value)
+        if lookup_expr == "in":
+            return min(1, sum(get_equal_fraction(statistics, v) for v in value))
+        if lookup_expr == "isnull":
+            null_fraction = statistics.null_fraction
+            return null_fraction if value else 1 - null_fraction
+        if lookup_expr in ("lt", "lte", "gt", "gte", "range"):
+            return get_range_fraction(statistics, lookup_expr, value)
+    except TypeError:
+        # the value is not comparable with the field's values
+        pass
+    return None
+
+
+def get_range_fraction(statistics, lookup_expr, value):
+    if lookup_expr in ("lt", "lte"):
+        return get_below_fraction(statistics, value, lookup_expr == "lte")
+    if lookup_expr in ("gt", "gte"):
+        below = get_below_fraction(statistics, value, lookup_expr == "gt")
+        return 1 - statistics.null_fraction - below
+
+    start, stop = value
+    below = 0 if start is None else get_below_fraction(statistics, start)
+    if stop is None:
+        return 1 - statistics.null_fraction - below
+    return max(0, get_below_fraction(statistics, stop, True) - below)
+
+
+def get_equal_fraction(statistics, value):
+    value = normalize(value)
+    if value is None:
+        return statistics.null_fraction
+
+    common = dict(map(tuple, statistics.most_common_values))
+    if value in common:
+        return common[value]
+
+    other = max(statistics.distinct_count - len(common), 1)
+    return get_other_fraction(statistics) / other
+
+
+def get_other_fraction(statistics):
+    # the fraction of non-null rows whose values are not common values
+    common = sum(fraction for _, fraction in statistics.most_common_values)
+    return max(0, 1 - statistics.null_fraction - common)
+
+
+def get_below_fraction(statistics, value, inclusive=False):
+    """
+    Return the fraction of rows whose values are less than the value, or less
+    than or equal to it, if ``inclusive``.
+    """
+    value = normalize(value)
+    fraction = sum(
+        frequency
+        for common, frequency in statistics.most_common_values
+        if common < value or (inclusive and common == value)
+    )
+
+    histogram = statistics.histogram
+    if not histogram:
+        return fraction + get_other_fraction(statistics) / 2
+    if value < histogram[0]:
+        return fraction
+    if value >= histogram[-1]:
+        return fraction + get_other_fraction(statistics)
+
+    # interpolate the value's position within its bucket
+    i = bisect.bisect_right(histogram, value) - 1
+    lo, hi = histogram[i], histogram[i + 1]
+    position = 0.5
+    if isinstance(value, (int, float)) and hi != lo:
+        position = (value - lo) / (hi - lo)
+    buckets = len(histogram) - 1
+    return fraction + get_other_fraction(statistics) * (i + position) / buckets
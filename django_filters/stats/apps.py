@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+from django.utils.translation import gettext_lazy as _
+
+
+class StatsConfig(AppConfig):
+    name = "django_filters.stats"
+    label = "django_filters_stats"
+    verbose_name = _("Filter statistics")
+    default_auto_field = "django.db.models.BigAutoField"
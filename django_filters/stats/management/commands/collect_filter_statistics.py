@@ -0,0 +1,88 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from ....conf import settings
+from ....filters import AllValuesFilter, AllValuesMultipleFilter
+from ....utils import get_model_filtersets, import_filterset_class
+from ... import clear_cache, collect, get_filter_fields
+
+
+class Command(BaseCommand):
+    help = (
+        "Sample the model fields filtered by FilterSets, and store their "
+        "statistics. Without arguments, all FilterSets that are imported by the "
+        "root URLconf are sampled."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "filtersets",
+            nargs="*",
+            metavar="filterset",
+            help="Dotted path of a FilterSet class, e.g. 'myapp.filters.F'.",
+        )
+        parser.add_argument(
+            "--sample-size",
+            type=int,
+            default=30000,
+            help="The approximate number of rows to sample. Defaults to 30000.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="The database to sample. Defaults to 'default'.",
+        )
+
+    def handle(self, *args, **options):
+        if options["filtersets"]:
+            filterset_classes = [
+                import_filterset_class(path) for path in options["filtersets"]
+            ]
+        else:
+            filterset_classes = get_model_filtersets()
+
+        collected = {}
+        for filterset_class in filterset_classes:
+            model = filterset_class._meta.model
+            for path in get_filter_fields(filterset_class):
+                if (model, path) in collected:
+                    continue
+                statistics = collect(
+                    model, path, options["sample_size"], using=options["database"]
+                )
+                collected[model, path] = statistics
+                if options["verbosity"] >= 1:
+                    self.stdout.write(
+                        "Collected %s.%s: %d rows, %d distinct values"
+                        % (
+                            model._meta.label,
+                            path,
+                            statistics.row_count,
+                            statistics.distinct_count,
+                        )
+                    )
+
+            self.check_cardinality(filterset_class, collected)
+
+        clear_cache()
+
+    def check_cardinality(self, filterset_class, collected):
+        # AllValuesFilter renders a choice for each distinct value.
+        model = filterset_class._meta.model
+        for name, filter_ in filterset_class.base_filters.items():
+            if not isinstance(filter_, (AllValuesFilter, AllValuesMultipleFilter)):
+                continue
+            statistics = collected.get((model, filter_.field_name))
+            if statistics is None:
+                continue
+            if statistics.distinct_count > settings.STATS_HIGH_CARDINALITY:
+                self.stderr.write(
+                    "Warning: '%s.%s' renders a choice for each of about %d "
+                    "distinct values of '%s'."
+                    % (
+                        filterset_class.__name__,
+                        name,
+                        statistics.distinct_count,
+                        filter_.field_name,
+                    )
+                )
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="ColumnStatistics",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("model", models.CharField(max_length=255)),
+                ("field", models.CharField(max_length=255)),
+                ("row_count", models.BigIntegerField()),
+                ("distinct_count", models.BigIntegerField()),
+                ("null_fraction", models.FloatField()),
+                ("most_common_values", models.JSONField(default=list)),
+                ("histogram", models.JSONField(default=list)),
+                ("collected", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "column statistics",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("model", "field"), name="django_filters_stats_field"
+                    )
+                ],
+            },
+        ),
+    ]
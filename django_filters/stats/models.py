@@ -0,0 +1,31 @@
+from django.db import models
+
+
+class ColumnStatistics(models.Model):
+    """
+    Statistics of the values of a model field, as referenced by a filter.
+    The values are normalized to JSON-compatible types that sort in the same
+    order as the field's values.
+    """
+
+    model = models.CharField(max_length=255)
+    field = models.CharField(max_length=255)
+    row_count = models.BigIntegerField()
+    distinct_count = models.BigIntegerField()
+    null_fraction = models.FloatField()
+    # [value, fraction of rows] pairs, most common first
+    most_common_values = models.JSONField(default=list)
+    # bounds of buckets of equal numbers of rows, excluding the common values
+    histogram = models.JSONField(default=list)
+    collected = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "column statistics"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["model", "field"], name="django_filters_stats_field"
+            ),
+        ]
+
+    def __str__(self):
+        return "%s.%s" % (self.model, self.field)
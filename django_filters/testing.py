@@ -0,0 +1,153 @@
+"""
+Assertions on the queries of ``FilterSet``\\s, for the test suites of projects
+that use them.
+
+Mix ``FilterSetTestMixin`` into a ``TestCase`` to lock in the number of
+queries and joins of a request, with ``assertFilterSetQueries()``, and the
+shape of its SQL, with ``assertFilterSetSQL()``. SQL snapshots are written to
+the ``snapshot_dir`` directory the first time they are asserted, and are
+rewritten when the ``FILTERS_UPDATE_SNAPSHOTS`` environment variable is set.
+"""
+
+import inspect
+import os
+
+import sqlparse
+from django.db import connections
+from django.db.models.sql.datastructures import Join
+from django.test.utils import CaptureQueriesContext
+
+from .explain import get_aliases
+from .slowlog import get_sql_template
+
+
+def get_joins(queryset):
+    """
+    Return the table names of the queryset's joins.
+    """
+    return [
+        join.table_name
+        for join in get_aliases(queryset.query).values()
+        if isinstance(join, Join)
+    ]
+
+
+def capture_queries(filterset_class, params, queryset=None, request=None):
+    """
+    Validate and evaluate a filterset of the params, and return it, along with
+    the queries that were made.
+    """
+    filterset = filterset_class(params, queryset=queryset, request=request)
+    with CaptureQueriesContext(connections[filterset.queryset.db]) as context:
+        if not filterset.is_bound or filterset.is_valid():
+            list(filterset.qs)
+    return filterset, context.captured_queries
+
+
+def format_sql(sql):
+    return sqlparse.format(sql, reindent=True, keyword_case="upper") + "\n"
+
+
+class FilterSetTestMixin:
+    """
+    A ``TestCase`` mixin of assertions on the queries of ``FilterSet``\\s.
+    """
+
+    #: The directory of the SQL snapshots. Defaults to a ``snapshots``
+    #: directory next to the module of the test case.
+    snapshot_dir = None
+
+    def get_snapshot_path(self, name):
+        snapshot_dir = self.snapshot_dir
+        if snapshot_dir is None:
+            module_dir = os.path.dirname(inspect.getfile(type(self)))
+            snapshot_dir = os.path.join(module_dir, "snapshots")
+        return os.path.join(snapshot_dir, "%s.sql" % name)
+
+    def assertFilterSetValid(self, filterset):
+        if filterset.is_bound and not filterset.is_valid():
+            self.fail(
+                "%s is not valid: %s"
+                % (type(filterset).__name__, filterset.errors.as_json())
+            )
+
+    def assertFilterSetQueries(
+        self,
+        filterset_class,
+        params,
+        max_queries,
+        max_joins=None,
+        distinct=False,
+        queryset=None,
+        request=None,
+    ):
+        """
+        Assert that validating a filterset of the params and evaluating its
+        queryset make at most ``max_queries`` queries, e.g. one for each model
+        choice filter and one for the queryset, and that the queryset has at
+        most ``max_joins`` joins, and is ``distinct`` or not. Returns the
+        filterset.
+        """
+        filterset, queries = capture_queries(filterset_class, params, queryset, request)
+        self.assertFilterSetValid(filterset)
+
+        if len(queries) > max_queries:
+            self.fail(
+                "%d queries executed, at most %d expected\nCaptured queries were:\n%s"
+                % (
+                    len(queries),
+                    max_queries,
+                    "\n".join(
+                        "%d. %s" % (i, query["sql"])
+                        for i, query in enumerate(queries, start=1)
+                    ),
+                )
+            )
+
+        joins = get_joins(filterset.qs)
+        if max_joins is not None and len(joins) > max_joins:
+            self.fail(
+                "%d joins, at most %d expected: %s"
+                % (len(joins), max_joins, ", ".join(joins))
+            )
+
+        if bool(filterset.qs.query.distinct) != distinct:
+            self.fail(
+                "The queryset is %sdistinct, %sdistinct expected"
+                % (
+                    "" if filterset.qs.query.distinct else "not ",
+                    "" if distinct else "not ",
+                )
+            )
+        return filterset
+
+    def assertFilterSetSQL(
+        self, filterset_class, params, name, queryset=None, request=None
+    ):
+        """
+        Assert that the SQL of the queryset of a filterset of the params,
+        without its values, matches the snapshot ``name``. The snapshot is
+        written if it does not exist, or if the ``FILTERS_UPDATE_SNAPSHOTS``
+        environment variable is set. Returns the filterset.
+        """
+        filterset = filterset_class(params, queryset=queryset, request=request)
+        self.assertFilterSetValid(filterset)
+
+        sql = get_sql_template(filterset.qs)
+        sql = format_sql(sql) if sql is not None else "-- empty result set\n"
+        path = self.get_snapshot_path(name)
+
+        if os.path.exists(path) and not os.environ.get("FILTERS_UPDATE_SNAPSHOTS"):
+            with open(path) as f:
+                self.assertEqual(
+                    sql,
+                    f.read(),
+                    "The SQL does not match the snapshot %s. Set the "
+                    "FILTERS_UPDATE_SNAPSHOTS environment variable to update it."
+                    % path,
+                )
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(sql)
+        return filterset
@@ -1,6 +1,7 @@
 import datetime
 import warnings
 from collections import OrderedDict
+from importlib import import_module
 
 import django
 from django.conf import settings
@@ -102,6 +103,21 @@ class RenameAttributesBase(type):
         return super().__setattr__(metacls.get_name(name), value)
 
 
+def deduplicate(values):
+    """
+    Remove duplicate ``values``, preserving the order of first occurrence.
+    Unlike a ``set``, the result does not depend on hash randomization, so
+    that identical inputs always produce identical query parameters.
+
+    ex::
+
+        >>> deduplicate(['b', 'a', 'b'])
+        ['b', 'a']
+
+    """
+    return list(dict.fromkeys(values))
+
+
 def try_dbfield(fn, field_class):
     """
     Try ``fn`` with the DB ``field_class`` by walking its
@@ -188,6 +204,34 @@ def get_field_parts(model, field_name):
     return fields
 
 
+def is_to_many_path(model, field_name):
+    """
+    Return ``True`` if ``field_name`` traverses a to-many relationship from the
+    base ``model``. Any trailing transforms or lookups are ignored.
+
+    ex::
+
+        >>> is_to_many_path(User, 'favorite_books__title')
+        True
+
+    """
+    opts = model._meta
+
+    for name in field_name.split(LOOKUP_SEP):
+        try:
+            field = opts.pk if name == "pk" else opts.get_field(name)
+        except FieldDoesNotExist:
+            break
+
+        if field.many_to_many or field.one_to_many:
+            return True
+        if not field.is_relation or field.related_model is None:
+            break
+        opts = field.related_model._meta
+
+    return False
+
+
 def resolve_field(model_field, lookup_expr):
     """
     Resolves a ``lookup_expr`` into its final output field, given
@@ -348,3 +392,49 @@ def translate_validation(error_dict):
     )
 
     return ValidationError(exc)
+
+
+def get_model_filtersets():
+    """
+    Return the ``FilterSet`` classes that declare a ``Meta.model``. The root
+    URLconf is imported first, so that the ``FilterSet``\\s used by views are
+    declared.
+    """
+    # lazily import, as the filterset module imports this module.
+    from .filterset import BaseFilterSet
+
+    if getattr(settings, "ROOT_URLCONF", None):
+        import_module(settings.ROOT_URLCONF)
+
+    result, pending = [], [BaseFilterSet]
+    while pending:
+        cls = pending.pop()
+        pending.extend(cls.__subclasses__())
+        if getattr(cls, "_meta", None) and cls._meta.model is not None:
+            result.append(cls)
+    return result
+
+
+def import_filterset_class(path):
+    """
+    Import the ``FilterSet`` class at the dotted ``path``, which must declare
+    a ``Meta.model``, for the management commands. Raises a ``CommandError``
+    otherwise.
+    """
+    from django.core.management.base import CommandError
+    from django.utils.module_loading import import_string
+
+    from .filterset import BaseFilterSet
+
+    try:
+        filterset_class = import_string(path)
+    except ImportError as e:
+        raise CommandError(str(e))
+
+    if not (
+        isinstance(filterset_class, type) and issubclass(filterset_class, BaseFilterSet)
+    ):
+        raise CommandError("'%s' is not a FilterSet." % path)
+    if filterset_class._meta.model is None:
+        raise CommandError("'%s' does not declare 'Meta.model'." % path)
+    return filterset_class
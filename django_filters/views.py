@@ -1,3 +1,5 @@
+import time
+
 from django.core.exceptions import ImproperlyConfigured
 from django.views.generic import View
 from django.views.generic.list import (
@@ -5,6 +7,7 @@ from django.views.generic.list import (
     MultipleObjectTemplateResponseMixin,
 )
 
+from . import signals
 from .constants import ALL_FIELDS
 from .filterset import filterset_factory
 
@@ -70,8 +73,13 @@ class FilterMixin:
 
 class BaseFilterView(FilterMixin, MultipleObjectMixin, View):
     def get(self, request, *args, **kwargs):
+        start = time.perf_counter()
         filterset_class = self.get_filterset_class()
+        signals.add_timing("filterset_class", filterset_class, start)
+
+        start = time.perf_counter()
         self.filterset = self.get_filterset(filterset_class)
+        signals.add_timing("filterset_init", filterset_class, start)
 
         if (
             not self.filterset.is_bound
@@ -12,6 +12,8 @@ from django.utils.http import urlencode
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext as _
 
+from .utils import deduplicate
+
 
 class LinkWidget(forms.Widget):
     def __init__(self, attrs=None, choices=()):
@@ -245,7 +247,8 @@ class QueryArrayWidget(BaseCSVWidget, forms.TextInput):
     2. Values can be provided as query array: ?foo[]=bar&foo[]=baz
     3. Values can be provided as query array: ?foo=bar&foo=baz
 
-    Note: Duplicate and empty values are skipped from results
+    Note: Duplicate and empty values are skipped from results, preserving the
+    order of the remaining values.
     """
 
     def value_from_datadict(self, data, files, name):
@@ -267,4 +270,4 @@ class QueryArrayWidget(BaseCSVWidget, forms.TextInput):
         else:
             ret = []
 
-        return list(set(ret))
+        return deduplicate(ret)
@@ -0,0 +1,277 @@
+"""
+Recording of the filter combinations that ``FilterSet``\\s are used with.
+
+When ``FILTERS_WORKLOAD_STORE`` is set, each evaluated ``FilterSet`` tallies
+the names of its active filters and its ordering params. The tallies are
+kept in-process, and added to the store every
+``FILTERS_WORKLOAD_FLUSH_INTERVAL`` seconds and at exit. The
+``report_filter_workload`` management command turns the most frequent
+combinations into composite index recommendations.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter, namedtuple
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+from django.utils.module_loading import import_string
+
+from .conf import settings
+from .constants import EMPTY_VALUES
+from .filters import OrderingFilter
+from .indexes import get_index_name, is_indexed
+from .utils import get_field_parts
+
+# Lookups that a composite index serves when their column leads the index,
+# and lookups that it serves on the column that follows the leading columns.
+EQUALITY_LOOKUPS = {"exact", "in", "isnull"}
+RANGE_LOOKUPS = {"gt", "gte", "lt", "lte", "range", "startswith"}
+
+_tally = Counter()
+_lock = threading.Lock()
+_state = {"flushed": time.monotonic(), "registered": False}
+
+
+class FileStore:
+    """
+    Append tallies as JSON lines to the file at ``path``. Appends of single
+    lines are atomic, so the file may be shared by several processes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def add(self, tally):
+        lines = [
+            json.dumps({"key": list(key), "count": count}) + "\n"
+            for key, count in tally.items()
+        ]
+        with open(self.path, "a") as f:
+            f.write("".join(lines))
+
+    def read(self):
+        tally = Counter()
+        if not os.path.exists(self.path):
+            return tally
+        with open(self.path) as f:
+            for line in f:
+                if line.strip():
+                    data = json.loads(line)
+                    tally[load_key(data["key"])] += data["count"]
+        return tally
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class CacheStore:
+    """
+    Count tallies in the cache of the given ``alias``, with a key for each
+    combination. The combinations are indexed by numbered slots, so that
+    several processes may share the cache. The cache's ``add()`` and
+    ``incr()`` are atomic, and only the process that adds a combination
+    first assigns it a slot.
+    """
+
+    prefix = "django_filters.workload"
+
+    def __init__(self, alias):
+        self.cache = caches[alias]
+        self.index_key = "%s.index" % self.prefix
+
+    def get_key(self, key):
+        data = json.dumps(list(key)).encode()
+        digest = hashlib.md5(data, usedforsecurity=False).hexdigest()
+        return "%s.%s" % (self.prefix, digest)
+
+    def get_slot_key(self, slot):
+        return "%s.%d" % (self.index_key, slot)
+
+    def add(self, tally):
+        for key, count in tally.items():
+            cache_key = self.get_key(key)
+            self.cache.add(cache_key, 0, timeout=None)
+            self.cache.incr(cache_key, count)
+            if self.cache.add("%s.key" % cache_key, list(key), timeout=None):
+                self.cache.add(self.index_key, 0, timeout=None)
+                slot = self.cache.incr(self.index_key)
+                self.cache.set(self.get_slot_key(slot), cache_key, timeout=None)
+
+    def get_cache_keys(self):
+        size = self.cache.get(self.index_key, 0)
+        slots = [self.get_slot_key(slot) for slot in range(1, size + 1)]
+        return list(self.cache.get_many(slots).values())
+
+    def read(self):
+        cache_keys = self.get_cache_keys()
+        counts = self.cache.get_many(cache_keys)
+        keys = self.cache.get_many(["%s.key" % key for key in cache_keys])
+        return Counter(
+            {
+                load_key(keys["%s.key" % key]): count
+                for key, count in counts.items()
+                if count and "%s.key" % key in keys
+            }
+        )
+
+    def clear(self):
+        size = self.cache.get(self.index_key, 0)
+        cache_keys = self.get_cache_keys()
+        self.cache.delete_many(
+            cache_keys
+            + ["%s.key" % key for key in cache_keys]
+            + [self.get_slot_key(slot) for slot in range(1, size + 1)]
+            + [self.index_key]
+        )
+
+
+def load_key(key):
+    filterset, filters, ordering = key
+    return (filterset, tuple(filters), tuple(ordering))
+
+
+def get_store():
+    """
+    Return the store of the ``FILTERS_WORKLOAD_STORE`` setting, which is
+    either ``"file:<path>"`` or ``"cache:<alias>"``.
+    """
+    kind, _, location = (settings.WORKLOAD_STORE or "").partition(":")
+    if kind == "file" and location:
+        return FileStore(location)
+    if kind == "cache" and location:
+        return CacheStore(location)
+    raise ImproperlyConfigured(
+        "FILTERS_WORKLOAD_STORE must be 'file:<path>' or 'cache:<alias>', "
+        "not %r." % settings.WORKLOAD_STORE
+    )
+
+
+def get_filterset_path(filterset_class):
+    return "%s.%s" % (filterset_class.__module__, filterset_class.__qualname__)
+
+
+def record(filterset):
+    """
+    Tally the filterset's active filters and ordering params.
+    """
+    names, ordering = [], []
+    for name, value in filterset.form.cleaned_data.items():
+        if value in EMPTY_VALUES:
+            continue
+        if isinstance(filterset.filters[name], OrderingFilter):
+            ordering.extend(param.lstrip("-") for param in value)
+        else:
+            names.append(name)
+
+    key = (get_filterset_path(type(filterset)), tuple(sorted(names)), tuple(ordering))
+    now = time.monotonic()
+    with _lock:
+        _tally[key] += 1
+        due = now - _state["flushed"] >= settings.WORKLOAD_FLUSH_INTERVAL
+        if not _state["registered"]:
+            _state["registered"] = True
+            atexit.register(flush)
+    if due:
+        flush()
+
+
+def flush():
+    """
+    Add the tallies that are kept in-process to the store.
+    """
+    with _lock:
+        tally = dict(_tally)
+        _tally.clear()
+        _state["flushed"] = time.monotonic()
+    if tally:
+        get_store().add(tally)
+
+
+Recommendation = namedtuple(
+    "Recommendation", ("model", "index", "count", "rows", "score", "combinations")
+)
+
+
+def get_index_keys(filterset_class, names, ordering):
+    """
+    Return the model fields of a composite index that serves the combination
+    of filters and ordering params: the fields filtered by equality, followed
+    by either a field filtered by range, or the ordered field.
+    """
+    model = filterset_class._meta.model
+    equal, ranges, ordered = [], [], []
+
+    for name, filter_ in filterset_class.base_filters.items():
+        if name in names and filter_.method is None and filter_.field_name:
+            field = get_local_field(model, filter_.field_name)
+            if field is None:
+                continue
+            if filter_.lookup_expr in EQUALITY_LOOKUPS:
+                equal.append(field.name)
+            elif filter_.lookup_expr in RANGE_LOOKUPS:
+                ranges.append(field.name)
+
+        if isinstance(filter_, OrderingFilter):
+            for param in ordering:
+                path = filter_.param_map.get(param)
+                field = get_local_field(model, path) if path else None
+                if field is not None:
+                    ordered.append(field.name)
+
+    keys = equal + (ranges[:1] or ordered[:1])
+    return list(dict.fromkeys(keys))
+
+
+def get_local_field(model, path):
+    parts = get_field_parts(model, path)
+    if parts and len(parts) == 1 and parts[0].concrete:
+        return parts[0]
+    return None
+
+
+def get_recommendations(tally, using=None):
+    """
+    Return a list of ``Recommendation``\\s for indexes that would serve the
+    tallied combinations, ranked by score. The score of an index is the
+    number of requests it serves, times the number of rows in its model's
+    table, which is the cost of a sequential scan.
+    """
+    recommendations = {}
+    row_counts = {}
+    for (path, names, ordering), count in tally.items():
+        try:
+            filterset_class = import_string(path)
+        except ImportError:
+            continue
+
+        model = filterset_class._meta.model
+        keys = get_index_keys(filterset_class, names, ordering)
+        if not keys or is_indexed(model, keys):
+            continue
+
+        if model not in row_counts:
+            row_counts[model] = model._default_manager.using(using).count()
+        item = recommendations.setdefault(
+            (model, tuple(keys)), {"count": 0, "combinations": []}
+        )
+        item["count"] += count
+        item["combinations"].append(((path, names, ordering), count))
+
+    result = []
+    for (model, keys), item in recommendations.items():
+        rows = row_counts[model]
+        index = models.Index(fields=list(keys), name=get_index_name(model, keys))
+        combinations = sorted(item["combinations"], key=lambda c: -c[1])
+        result.append(
+            Recommendation(
+                model, index, item["count"], rows, item["count"] * rows, combinations
+            )
+        )
+    return sorted(result, key=lambda r: -r.score)
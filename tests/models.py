@@ -1,5 +1,6 @@
 from django import forms
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils.translation import gettext_lazy as _
 
 REGULAR = 0
@@ -210,3 +211,19 @@ class SpacewalkRecord(models.Model):
 
     astronaut = models.CharField(max_length=100)
     duration = models.DurationField()
+
+
+class Ticket(models.Model):
+    title = models.CharField(max_length=100)
+    status = models.IntegerField(choices=STATUS_CHOICES, default=0)
+    created = models.DateTimeField()
+    closed = models.DateTimeField(null=True)
+    assignee = models.ForeignKey(
+        User, null=True, db_index=False, on_delete=models.CASCADE
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "-created"], name="ticket_status_created"),
+            models.Index(Upper("title"), name="ticket_title_upper"),
+        ]
@@ -7,6 +7,7 @@ from rest_framework import generics, serializers
 from rest_framework.test import APIRequestFactory
 
 from django_filters import filters
+from django_filters.middleware import ServerTimingMiddleware
 from django_filters.rest_framework import DjangoFilterBackend, FilterSet, backends
 
 from ..models import Article
@@ -271,3 +272,45 @@ class DjangoFilterBackendTestCase(TestCase):
         self.assertEqual(
             self.backend.template, "django_filters/rest_framework/crispy_form.html"
         )
+
+
+class EmptyResultTests(TestCase):
+    def test_empty_result_is_not_queried(self):
+        class F(FilterSet):
+            decimal = filters.RangeFilter()
+
+            class Meta:
+                model = FilterableItem
+                fields = ["decimal"]
+
+        class View(FilterableItemView):
+            filterset_class = F
+
+        view = View.as_view()
+        request = factory.get("/", {"decimal_min": "2", "decimal_max": "1"})
+        with self.assertNumQueries(0):
+            response = view(request).render()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, [])
+
+
+class ServerTimingTests(TestCase):
+    def test_server_timing(self):
+        FilterableItem.objects.create(text="aaa", decimal=1, date="2016-01-01")
+        view = FilterClassRootView.as_view()
+        middleware = ServerTimingMiddleware(lambda request: view(request).render())
+
+        response = middleware(factory.get("/", {"text": "a"}))
+
+        metrics = [m.split(";")[0] for m in response["Server-Timing"].split(", ")]
+        self.assertEqual(
+            metrics,
+            [
+                "filterset-class",
+                "filterset-init",
+                "form-validation",
+                "filter.text",
+                "qs.fetch",
+            ],
+        )
@@ -14,6 +14,8 @@ INSTALLED_APPS = (
     "django.contrib.auth",
     "rest_framework",
     "django_filters",
+    "django_filters.rollups",
+    "django_filters.stats",
     "tests.rest_framework",
     "tests",
 )
@@ -0,0 +1,143 @@
+from unittest import mock
+
+from django.db import NotSupportedError
+from django.test import TestCase
+
+from django_filters.explain import has_seq_scan
+from django_filters.filters import (
+    CharFilter,
+    ModelMultipleChoiceFilter,
+    NumberFilter,
+    RangeFilter,
+)
+from django_filters.filterset import FilterSet
+
+from .models import Book, Comment, User
+
+
+class UserFilter(FilterSet):
+    username = CharFilter(lookup_expr="icontains")
+    books = ModelMultipleChoiceFilter(
+        field_name="favorite_books", queryset=Book.objects.all(), distinct=True
+    )
+    comments = CharFilter(field_name="comments__text", exclude=True)
+    status = NumberFilter()
+    id = RangeFilter()
+
+    class Meta:
+        model = User
+        fields = []
+
+
+class ExplainTests(TestCase):
+    def setUp(self):
+        self.book = Book.objects.create(title="a", price="1.00", average_rating=1)
+
+    def test_unbound(self):
+        explain = UserFilter().explain()
+
+        self.assertEqual(explain["filters"], [])
+        self.assertEqual(explain["sql"], str(User.objects.all().query))
+        self.assertIn("SCAN tests_user", explain["plan"])
+        self.assertTrue(explain["seq_scan"])
+
+    def test_filters(self):
+        f = UserFilter({"username": "al", "status": "1", "books": [self.book.pk]})
+        username, books, status = f.explain()["filters"]
+
+        self.assertEqual(username["name"], "username")
+        self.assertEqual(username["value"], "al")
+        self.assertEqual(
+            username["sql"], '"tests_user"."username" LIKE %s ESCAPE \'\\\''
+        )
+        self.assertEqual(username["params"], ["%al%"])
+        self.assertEqual(username["joins"], [])
+        self.assertEqual(username["aliases"], (1, 1))
+        self.assertFalse(username["distinct"])
+
+        self.assertEqual(books["sql"], '"tests_user_favorite_books"."book_id" = %s')
+        self.assertEqual(books["params"], [self.book.pk])
+        self.assertEqual(books["joins"], ["tests_user_favorite_books"])
+        self.assertEqual(books["aliases"], (1, 2))
+        self.assertTrue(books["distinct"])
+
+        self.assertEqual(status["sql"], '"tests_user"."status" = %s')
+        self.assertEqual(status["aliases"], (2, 2))
+        self.assertFalse(status["distinct"])
+
+    def test_inactive_filters(self):
+        f = UserFilter({"username": "", "books": [], "status": "1"})
+
+        self.assertEqual([s["name"] for s in f.explain()["filters"]], ["status"])
+
+    def test_exclude(self):
+        f = UserFilter({"comments": "a"})
+        (comments,) = f.explain()["filters"]
+
+        self.assertIn("NOT", comments["sql"])
+        self.assertIn("a", comments["params"])
+
+    def test_multiple_conditions(self):
+        f = UserFilter({"id_min": "1", "id_max": "5"})
+        (step,) = f.explain()["filters"]
+
+        self.assertEqual(step["params"], [1, 5])
+        self.assertIn("BETWEEN", step["sql"])
+
+    def test_empty_result(self):
+        f = UserFilter({"id_min": "5", "id_max": "1", "status": "1"})
+        explain = f.explain()
+
+        status, id_range = explain["filters"]
+        self.assertFalse(status["empty"])
+        self.assertTrue(id_range["empty"])
+        self.assertEqual(id_range["sql"], "0 = 1")
+        self.assertIsNone(explain["plan"])
+        self.assertIsNone(explain["seq_scan"])
+
+    def test_indexed_plan(self):
+        class F(FilterSet):
+            class Meta:
+                model = Comment
+                fields = ["author"]
+
+        user = User.objects.create(username="alex")
+        explain = F({"author": user.pk}).explain()
+
+        self.assertIn("SEARCH tests_comment USING INDEX", explain["plan"])
+        self.assertFalse(explain["seq_scan"])
+
+    def test_unsupported(self):
+        with mock.patch(
+            "django.db.models.QuerySet.explain", side_effect=NotSupportedError
+        ):
+            explain = UserFilter({"status": "1"}).explain()
+
+        self.assertIn('"tests_user"."status" = 1', explain["sql"])
+        self.assertIsNone(explain["plan"])
+        self.assertIsNone(explain["seq_scan"])
+
+
+class SeqScanTests(TestCase):
+    def test_postgresql(self):
+        self.assertTrue(has_seq_scan("Seq Scan on tests_user", "postgresql"))
+        self.assertFalse(
+            has_seq_scan("Index Scan using tests_user_pkey on tests_user", "postgresql")
+        )
+
+    def test_sqlite(self):
+        self.assertTrue(has_seq_scan("2 0 0 SCAN tests_user", "sqlite"))
+        self.assertFalse(
+            has_seq_scan("3 0 0 SCAN tests_user USING INDEX user_idx", "sqlite")
+        )
+        self.assertFalse(has_seq_scan("2 0 0 SCAN CONSTANT ROW", "sqlite"))
+
+    def test_mysql(self):
+        self.assertTrue(has_seq_scan("1\tSIMPLE\ttests_user\tNone\tALL\tNone", "mysql"))
+        self.assertFalse(has_seq_scan("1\tSIMPLE\ttests_user\tNone\tref\t", "mysql"))
+
+    def test_oracle(self):
+        self.assertTrue(has_seq_scan("TABLE ACCESS FULL | TESTS_USER", "oracle"))
+
+    def test_unknown_vendor(self):
+        self.assertIsNone(has_seq_scan("SCAN", "other"))
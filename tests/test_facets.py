@@ -0,0 +1,524 @@
+import datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils.timezone import now
+
+from django_filters.facets import (
+    SAMPLE_MODULUS,
+    SAMPLE_MULTIPLIER,
+    get_date_histogram_kind,
+    get_facets_cache_key,
+    get_sample,
+    get_sample_rate,
+    is_facet,
+    is_histogram,
+    scale_facet_choices,
+)
+from django_filters.filters import (
+    BooleanFilter,
+    CharFilter,
+    ChoiceFilter,
+    DateFromToRangeFilter,
+    DateRangeFilter,
+    ModelChoiceFilter,
+    ModelMultipleChoiceFilter,
+    MultipleChoiceFilter,
+    NumberFilter,
+    NumericRangeFilter,
+    RangeFilter,
+    TimeRangeFilter,
+)
+from django_filters.filterset import FilterSet
+
+from .models import STATUS_CHOICES, Article, Book, Comment, User
+
+
+class UserFilter(FilterSet):
+    status = ChoiceFilter(choices=STATUS_CHOICES)
+    is_active = BooleanFilter()
+    favorite_books = ModelMultipleChoiceFilter(queryset=Book.objects.order_by("pk"))
+    title = CharFilter(field_name="favorite_books__title")
+
+    class Meta:
+        model = User
+        fields = []
+
+
+def counts(facet):
+    return [(choice["value"], choice["count"]) for choice in facet]
+
+
+class IsFacetTests(TestCase):
+    def test_choice_filters(self):
+        self.assertTrue(is_facet(ChoiceFilter(field_name="status")))
+        self.assertTrue(is_facet(MultipleChoiceFilter(field_name="status")))
+        self.assertTrue(is_facet(BooleanFilter(field_name="is_active")))
+
+    def test_other_filters(self):
+        self.assertFalse(is_facet(CharFilter(field_name="username")))
+        self.assertFalse(is_facet(NumberFilter(field_name="status")))
+
+    def test_lookup_expr(self):
+        self.assertFalse(is_facet(ChoiceFilter(field_name="status", lookup_expr="gt")))
+
+    def test_method(self):
+        f = ChoiceFilter(field_name="status", method=lambda qs, name, value: qs)
+        self.assertFalse(is_facet(f))
+
+    def test_date_range_filter(self):
+        self.assertFalse(is_facet(DateRangeFilter(field_name="date")))
+
+
+class IsHistogramTests(TestCase):
+    def test_range_filters(self):
+        self.assertTrue(is_histogram(RangeFilter(field_name="price")))
+        self.assertTrue(is_histogram(NumericRangeFilter(field_name="price")))
+        self.assertTrue(is_histogram(DateFromToRangeFilter(field_name="date")))
+        self.assertTrue(is_histogram(DateRangeFilter(field_name="date")))
+
+    def test_other_filters(self):
+        self.assertFalse(is_histogram(NumberFilter(field_name="price")))
+        self.assertFalse(is_histogram(TimeRangeFilter(field_name="time")))
+
+
+class FacetsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.b1 = Book.objects.create(
+            title="Ender's Game", price="1.00", average_rating=3
+        )
+        cls.b2 = Book.objects.create(
+            title="Rainbow Six", price="1.00", average_rating=3
+        )
+        cls.b3 = Book.objects.create(title="Snowcrash", price="1.00", average_rating=3)
+
+        alex = User.objects.create(username="alex", status=1, is_active=True)
+        jacob = User.objects.create(username="jacob", status=2, is_active=True)
+        aaron = User.objects.create(username="aaron", status=2)
+        User.objects.create(username="carl", status=0)
+
+        alex.favorite_books.add(cls.b1, cls.b2)
+        jacob.favorite_books.add(cls.b1, cls.b3)
+        aaron.favorite_books.add(cls.b3)
+
+    def test_unbound(self):
+        facets = UserFilter(queryset=User.objects.all()).facets()
+
+        self.assertEqual(list(facets), ["status", "is_active", "favorite_books"])
+        self.assertEqual(
+            facets["status"],
+            [
+                {"value": 0, "label": "Regular", "count": 1},
+                {"value": 1, "label": "Manager", "count": 1},
+                {"value": 2, "label": "Admin", "count": 2},
+            ],
+        )
+        self.assertEqual(counts(facets["is_active"]), [(True, 2), (False, 2)])
+        self.assertEqual(
+            counts(facets["favorite_books"]),
+            [(self.b1.pk, 2), (self.b2.pk, 1), (self.b3.pk, 2)],
+        )
+
+    def test_excludes_own_filter(self):
+        f = UserFilter({"status": "2"}, queryset=User.objects.all())
+        facets = f.facets()
+
+        self.assertEqual(counts(facets["status"]), [(0, 1), (1, 1), (2, 2)])
+        self.assertEqual(counts(facets["is_active"]), [(True, 1), (False, 1)])
+        self.assertEqual(
+            counts(facets["favorite_books"]),
+            [(self.b1.pk, 1), (self.b2.pk, 0), (self.b3.pk, 2)],
+        )
+
+    def test_to_many_counts_all_related_values(self):
+        # The facet counts every book of the matching users, not just the
+        # book that was filtered on.
+        f = UserFilter({"title": "Rainbow Six"}, queryset=User.objects.all())
+        facets = f.facets()
+
+        self.assertEqual(
+            counts(facets["favorite_books"]),
+            [(self.b1.pk, 1), (self.b2.pk, 1), (self.b3.pk, 0)],
+        )
+
+    def test_single_query_per_facet(self):
+        f = UserFilter({"is_active": "true"}, queryset=User.objects.all())
+
+        # status and is_active, plus favorite_books and its choices
+        with self.assertNumQueries(4):
+            f.facets()
+
+    def test_null_choice(self):
+        class F(FilterSet):
+            author = ModelChoiceFilter(
+                queryset=User.objects.order_by("pk"), null_label="No author"
+            )
+
+            class Meta:
+                model = Article
+                fields = []
+
+        alex = User.objects.get(username="alex")
+        Article.objects.create(author=alex, published=now())
+        Article.objects.create(author=None, published=now())
+        Article.objects.create(author=None, published=now())
+
+        facet = F(queryset=Article.objects.all()).facets()["author"]
+
+        self.assertEqual(facet[0], {"value": "null", "label": "No author", "count": 2})
+        self.assertEqual(facet[1], {"value": alex.pk, "label": "alex", "count": 1})
+
+    def test_cache(self):
+        self.addCleanup(cache.clear)
+        f = UserFilter({"status": "2"}, queryset=User.objects.all())
+        facets = f.facets(cache_timeout=60)
+
+        f = UserFilter({"status": "2"}, queryset=User.objects.all())
+        with self.assertNumQueries(0):
+            self.assertEqual(f.facets(cache_timeout=60), facets)
+
+        f = UserFilter({"status": "1"}, queryset=User.objects.all())
+        self.assertNotEqual(f.facets(cache_timeout=60), facets)
+
+    def test_cache_key(self):
+        class F(FilterSet):
+            status = MultipleChoiceFilter(choices=STATUS_CHOICES)
+
+            class Meta:
+                model = User
+                fields = []
+
+        def key(data, queryset=User.objects.all()):
+            return get_facets_cache_key(F(data, queryset=queryset))
+
+        # values are canonicalized
+        self.assertEqual(key({"status": ["1", "2"]}), key({"status": ["2", "1"]}))
+        self.assertNotEqual(key({"status": ["1"]}), key({"status": ["2"]}))
+
+        # the base queryset is part of the key
+        self.assertNotEqual(key({}), key({}, User.objects.filter(is_active=True)))
+
+    def test_cache_request_choices(self):
+        self.addCleanup(cache.clear)
+
+        class F(FilterSet):
+            author = ModelChoiceFilter(
+                queryset=lambda request: User.objects.filter(username=request.who)
+            )
+
+            class Meta:
+                model = Article
+                fields = []
+
+        alex = User.objects.get(username="alex")
+        bob = User.objects.create(username="bob")
+        Article.objects.create(author=alex, published=now())
+
+        def facets(who):
+            request = mock.Mock(who=who)
+            f = F(queryset=Article.objects.all(), request=request)
+            return f.facets(cache_timeout=60)["author"]
+
+        # the choices of one request are not served to another
+        self.assertEqual(
+            facets("alex"), [{"value": alex.pk, "label": "alex", "count": 1}]
+        )
+        self.assertEqual(facets("bob"), [{"value": bob.pk, "label": "bob", "count": 0}])
+        with self.assertNumQueries(0):
+            self.assertEqual(facets("alex")[0]["label"], "alex")
+
+
+class SampledFacetsTests(TestCase):
+    class F(FilterSet):
+        status = ChoiceFilter(choices=STATUS_CHOICES)
+
+        class Meta:
+            model = User
+            fields = []
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create(
+            User(username="user%d" % i, status=i % 2) for i in range(100)
+        )
+
+    @override_settings(FILTERS_FACETS_SAMPLE_THRESHOLD=0)
+    def test_sampled(self):
+        f = self.F(queryset=User.objects.all())
+
+        # the bounded count and the range of the sample rate, and the facet
+        with self.assertNumQueries(3):
+            facet = f.facets(sample_size=10)["status"]
+
+        sample = get_sample(User.objects.all(), 10)
+        self.assertGreater(sample.count(), 0)
+        self.assertLess(sample.count(), 20)
+        self.assertEqual(
+            [(c["value"], c["count"]) for c in facet],
+            [
+                (0, sample.filter(status=0).count() * 10),
+                (1, sample.filter(status=1).count() * 10),
+                (2, 0),
+            ],
+        )
+        self.assertTrue(all(c["error"] > 0 for c in facet))
+
+    @override_settings(FILTERS_FACETS_SAMPLE_THRESHOLD=0)
+    def test_sampled_filtered(self):
+        f = self.F({"status": "1"}, queryset=User.objects.all())
+
+        # the sample is deterministic
+        self.assertEqual(f.facets(sample_size=10), f.facets(sample_size=10))
+
+    def test_sample(self):
+        # rows that alternate are sampled evenly
+        sample = get_sample(User.objects.all(), 4)
+
+        self.assertAlmostEqual(sample.filter(status=0).count(), 12, delta=4)
+        self.assertAlmostEqual(sample.filter(status=1).count(), 12, delta=4)
+
+    def test_sample_large_pk(self):
+        # the pk is cast to a 64-bit integer, which 32-bit pks can't overflow
+        sample = get_sample(User.objects.all(), 4)
+        self.assertIn("CAST(", str(sample.query))
+
+        pks = [2**31 - 2, 2**40, 2**40 + 1]
+        User.objects.bulk_create(User(pk=pk, username=str(pk)) for pk in pks)
+        expected = [
+            pk
+            for pk in pks
+            if pk % SAMPLE_MODULUS * SAMPLE_MULTIPLIER % SAMPLE_MODULUS
+            < SAMPLE_MODULUS // 4
+        ]
+        sampled = sample.filter(pk__in=pks).order_by("pk").values_list("pk", flat=True)
+        self.assertEqual(list(sampled), expected)
+
+    @override_settings(FILTERS_FACETS_SAMPLE_THRESHOLD=100)
+    def test_selective_filter(self):
+        class F(FilterSet):
+            username = CharFilter(lookup_expr="startswith")
+            status = ChoiceFilter(choices=STATUS_CHOICES)
+
+            class Meta:
+                model = User
+                fields = []
+
+        User.objects.bulk_create(
+            User(username="x%d" % i, status=i % 3) for i in range(30)
+        )
+        User.objects.bulk_create(User(username="y%d" % i) for i in range(2000))
+
+        # the filtered queryset of the facet is below the threshold
+        f = F({"username": "x"}, queryset=User.objects.all())
+        facet = f.facets(sample_size=100)["status"]
+
+        self.assertEqual(
+            [(c["count"], c["error"]) for c in facet], [(10, 0), (10, 0), (10, 0)]
+        )
+
+        # while the whole table is sampled
+        facet = F(queryset=User.objects.all()).facets(sample_size=100)["status"]
+        self.assertTrue(all(c["error"] > 0 for c in facet))
+
+    def test_below_threshold(self):
+        f = self.F(queryset=User.objects.all())
+        facet = f.facets(sample_size=10)["status"]
+
+        self.assertEqual(
+            [(c["count"], c["error"]) for c in facet], [(50, 0), (50, 0), (0, 0)]
+        )
+
+    def test_sample_rate(self):
+        qs = User.objects.all()
+
+        self.assertEqual(get_sample_rate(qs, 10, threshold=0), 10)
+        self.assertEqual(get_sample_rate(qs, 30, threshold=0), 4)
+        self.assertEqual(get_sample_rate(qs, 10, threshold=100), 1)
+        self.assertEqual(get_sample_rate(qs, 100, threshold=0), 1)
+        self.assertEqual(get_sample_rate(qs.none(), 10, threshold=0), 1)
+
+        # the rows are counted up to the threshold, rather than estimated from
+        # the range of primary keys
+        self.assertEqual(get_sample_rate(qs.filter(status=1), 10, threshold=60), 1)
+
+    def test_scale_facet_choices(self):
+        choices = [{"value": 1, "count": 0}, {"value": 2, "count": 4}]
+
+        self.assertEqual(
+            scale_facet_choices(choices, 1),
+            [
+                {"value": 1, "count": 0, "error": 0},
+                {"value": 2, "count": 4, "error": 0},
+            ],
+        )
+        self.assertEqual(
+            scale_facet_choices(choices, 10),
+            [
+                {"value": 1, "count": 0, "error": 19},
+                {"value": 2, "count": 40, "error": 38},
+            ],
+        )
+
+    def test_cache_key(self):
+        f = self.F(queryset=User.objects.all())
+
+        self.assertNotEqual(get_facets_cache_key(f), get_facets_cache_key(f, 10))
+
+
+class NumericHistogramTests(TestCase):
+    class F(FilterSet):
+        price = RangeFilter()
+        title = CharFilter()
+
+        class Meta:
+            model = Book
+            fields = []
+
+    @classmethod
+    def setUpTestData(cls):
+        for title, price in [("a", 1), ("b", 5), ("c", 10), ("d", 15), ("e", 20)]:
+            Book.objects.create(title=title, price=price, average_rating=3)
+
+    def test_histogram(self):
+        f = self.F(queryset=Book.objects.all())
+
+        with self.assertNumQueries(2):
+            histogram = f.histogram("price", buckets=2)
+
+        self.assertEqual(
+            histogram,
+            [
+                {"start": Decimal("1"), "end": Decimal("10.5"), "count": 3},
+                {"start": Decimal("10.5"), "end": Decimal("20"), "count": 2},
+            ],
+        )
+
+    def test_excludes_own_filter(self):
+        f = self.F({"price_min": "6", "title": "a"}, queryset=Book.objects.all())
+        histogram = f.histogram("price", buckets=2, start=0, end=10)
+
+        self.assertEqual([b["count"] for b in histogram], [1, 0])
+
+    def test_bounds(self):
+        f = self.F(queryset=Book.objects.all())
+
+        with self.assertNumQueries(1):
+            histogram = f.histogram("price", buckets=4, start=0, end=20)
+
+        self.assertEqual([b["start"] for b in histogram], [0, 5, 10, 15])
+        self.assertEqual([b["count"] for b in histogram], [1, 1, 1, 2])
+
+    def test_single_value(self):
+        f = self.F({"title": "c"}, queryset=Book.objects.all())
+
+        self.assertEqual(
+            f.histogram("price"),
+            [{"start": Decimal("10"), "end": Decimal("10"), "count": 1}],
+        )
+
+    def test_no_results(self):
+        f = self.F({"title": "z"}, queryset=Book.objects.all())
+
+        self.assertEqual(f.histogram("price"), [])
+
+    def test_not_a_range_filter(self):
+        f = self.F(queryset=Book.objects.all())
+
+        with self.assertRaisesMessage(AssertionError, "'F.title' is not a range"):
+            f.histogram("title")
+
+
+class DateHistogramTests(TestCase):
+    class F(FilterSet):
+        date = DateFromToRangeFilter()
+        period = DateRangeFilter(field_name="date")
+
+        class Meta:
+            model = Comment
+            fields = []
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(username="alex")
+        for date in ["2023-05-01", "2024-01-15", "2024-01-20", "2024-03-01"]:
+            Comment.objects.create(author=author, date=date, time=now().time())
+
+    def test_histograms(self):
+        f = self.F(queryset=Comment.objects.all())
+
+        with self.assertNumQueries(2):
+            histograms = f.histograms()
+
+        self.assertEqual(list(histograms), ["date", "period"])
+        self.assertEqual(
+            histograms["date"],
+            [
+                {
+                    "start": datetime.date(2023, 1, 1),
+                    "end": datetime.date(2024, 1, 1),
+                    "count": 1,
+                },
+                {
+                    "start": datetime.date(2024, 1, 1),
+                    "end": datetime.date(2025, 1, 1),
+                    "count": 3,
+                },
+            ],
+        )
+
+    def test_drill_down(self):
+        data = {"date_after": "2024-01-01", "date_before": "2024-12-31"}
+        f = self.F(data, queryset=Comment.objects.all())
+
+        self.assertEqual(
+            [(b["start"], b["end"], b["count"]) for b in f.histogram("date")],
+            [
+                (datetime.date(2024, 1, 1), datetime.date(2024, 2, 1), 2),
+                (datetime.date(2024, 3, 1), datetime.date(2024, 4, 1), 1),
+            ],
+        )
+
+    def test_kind(self):
+        f = self.F(queryset=Comment.objects.all())
+        histogram = f.histogram("date", kind="month")
+
+        self.assertEqual(
+            [b["start"] for b in histogram],
+            [
+                datetime.date(2023, 5, 1),
+                datetime.date(2024, 1, 1),
+                datetime.date(2024, 3, 1),
+            ],
+        )
+
+    def test_date_range_filter(self):
+        with mock.patch("django_filters.filters.now") as mock_now:
+            mock_now.return_value = datetime.datetime(2024, 6, 1)
+            f = self.F({"period": "year"}, queryset=Comment.objects.all())
+            histogram = f.histogram("period")
+
+        self.assertEqual(
+            [(b["start"], b["count"]) for b in histogram],
+            [(datetime.date(2024, 1, 1), 2), (datetime.date(2024, 3, 1), 1)],
+        )
+
+    def test_histogram_kind(self):
+        def dates(start, stop):
+            return slice(datetime.date(*start), datetime.date(*stop))
+
+        self.assertEqual(get_date_histogram_kind(None), "year")
+        self.assertEqual(get_date_histogram_kind(slice(None, None)), "year")
+        self.assertEqual(
+            get_date_histogram_kind(dates((2020, 1, 1), (2024, 1, 1))), "year"
+        )
+        self.assertEqual(
+            get_date_histogram_kind(dates((2024, 1, 1), (2024, 6, 1))), "month"
+        )
+        self.assertEqual(
+            get_date_histogram_kind(dates((2024, 1, 1), (2024, 1, 9))), "day"
+        )
+        self.assertEqual(get_date_histogram_kind("year"), "month")
+        self.assertEqual(get_date_histogram_kind("week"), "day")
@@ -1,5 +1,8 @@
 import contextlib
 import datetime
+import os
+import subprocess
+import sys
 import unittest
 from operator import attrgetter
 from unittest import mock
@@ -285,6 +288,27 @@ class MultipleChoiceFilterTests(TestCase):
             f.qs, ["alex", None], lambda o: o.author and str(o.author), False
         )
 
+    def test_filtering_uses_in_lookup(self):
+        for username, status in [("alex", 1), ("jacob", 2), ("carl", 0)]:
+            User.objects.create(username=username, status=status)
+
+        class F(FilterSet):
+            status = MultipleChoiceFilter(
+                choices=STATUS_CHOICES, null_value="null", null_label="NULL"
+            )
+
+            class Meta:
+                model = User
+                fields = ["status"]
+
+        qs = User.objects.order_by("username")
+        f = F({"status": ["0", "1", "null"]}, queryset=qs)
+        self.assertQuerySetEqual(f.qs, ["alex", "carl"], lambda o: o.username)
+
+        sql = str(f.qs.query)
+        self.assertIn('"status" IN (', sql)
+        self.assertIn('"status" IS NULL', sql)
+
 
 class TypedMultipleChoiceFilterTests(TestCase):
     def test_filtering(self):
@@ -556,6 +580,138 @@ class ModelChoiceFilterTests(TestCase):
         f = F(queryset=qs, request=request).filters["author"].field
         self.assertQuerySetEqual(f.queryset, [alex.pk, jacob.pk], lambda o: o.pk, False)
 
+    def test_validate_syntax(self):
+        alex = User.objects.create(username="alex", is_active=True)
+        jacob = User.objects.create(username="jacob")
+        date = now().date()
+        time = now().time()
+        c1 = Comment.objects.create(author=alex, time=time, date=date)
+        Comment.objects.create(author=jacob, time=time, date=date)
+
+        class F(FilterSet):
+            author = ModelChoiceFilter(
+                queryset=User.objects.filter(is_active=True), validate="syntax"
+            )
+
+            class Meta:
+                model = Comment
+                fields = ["author"]
+
+        qs = Comment.objects.all()
+
+        # validation does not query the database
+        f = F({"author": alex.pk}, queryset=qs)
+        with self.assertNumQueries(0):
+            self.assertTrue(f.is_valid())
+        with self.assertNumQueries(1):
+            self.assertQuerySetEqual(f.qs, [c1.pk], lambda o: o.pk, False)
+
+        # values outside of the choice queryset match no rows
+        f = F({"author": jacob.pk}, queryset=qs)
+        self.assertTrue(f.is_valid())
+        self.assertQuerySetEqual(f.qs, [], lambda o: o.pk, False)
+
+        field = f.form.fields["author"]
+        with self.assertRaises(forms.ValidationError):
+            field.check_choices(jacob.pk)
+        field.check_choices(alex.pk)
+
+        # values are still coerced to the type of the target field
+        f = F({"author": "foo"}, queryset=qs)
+        self.assertFalse(f.is_valid())
+        self.assertEqual(f.errors.as_data()["author"][0].code, "invalid_choice")
+
+    def test_validate_syntax_relationship_integrity(self):
+        alex = User.objects.create(username="alex")
+        date = now().date()
+        time = now().time()
+        c1 = Comment.objects.create(author=alex, time=time, date=date)
+
+        class F(FilterSet):
+            author = ModelChoiceFilter(queryset=User.objects.all(), validate="syntax")
+
+            class Meta:
+                model = Comment
+                fields = ["author"]
+
+        # the foreign key guarantees membership of an unrestricted queryset
+        f = F({"author": alex.pk}, queryset=Comment.objects.all())
+        self.assertEqual(f.filters["author"].get_membership_predicate(), {})
+        self.assertQuerySetEqual(f.qs, [c1.pk], lambda o: o.pk, False)
+
+        f = F({"author": alex.pk + 1}, queryset=Comment.objects.all())
+        self.assertTrue(f.is_valid())
+        self.assertQuerySetEqual(f.qs, [], lambda o: o.pk, False)
+
+    def test_validate_syntax_to_field_name(self):
+        alex = User.objects.create(username="alex", is_active=True)
+        jacob = User.objects.create(username="jacob")
+        date = now().date()
+        time = now().time()
+        c1 = Comment.objects.create(author=alex, time=time, date=date)
+        Comment.objects.create(author=jacob, time=time, date=date)
+
+        class F(FilterSet):
+            author = ModelChoiceFilter(
+                queryset=User.objects.filter(is_active=True),
+                to_field_name="username",
+                validate="syntax",
+            )
+
+            class Meta:
+                model = Comment
+                fields = ["author"]
+
+        qs = Comment.objects.all()
+
+        # the values are compared against the to-field, not the foreign key
+        f = F({"author": "alex"}, queryset=qs)
+        self.assertTrue(f.is_valid())
+        self.assertQuerySetEqual(f.qs, [c1.pk], lambda o: o.pk, False)
+
+        f = F({"author": "jacob"}, queryset=qs)
+        self.assertTrue(f.is_valid())
+        self.assertQuerySetEqual(f.qs, [], lambda o: o.pk, False)
+
+        f = F({"author": "foo"}, queryset=qs)
+        self.assertTrue(f.is_valid())
+        self.assertQuerySetEqual(f.qs, [], lambda o: o.pk, False)
+
+    @override_settings(FILTERS_NULL_CHOICE_LABEL="No Author")
+    def test_validate_syntax_empty_queryset(self):
+        alex = User.objects.create(username="alex")
+        Article.objects.create(author=alex, published=now())
+        Article.objects.create(published=now())
+
+        class F(FilterSet):
+            author = ModelChoiceFilter(queryset=User.objects.none(), validate="syntax")
+            excluded = ModelChoiceFilter(
+                field_name="author",
+                queryset=User.objects.none(),
+                validate="syntax",
+                exclude=True,
+            )
+
+            class Meta:
+                model = Article
+                fields = []
+
+        qs = Article.objects.all()
+
+        # no value can match an empty choice queryset
+        f = F({"author": alex.pk}, queryset=qs)
+        self.assertTrue(f.is_valid())
+        self.assertTrue(f.qs.query.is_empty())
+        with self.assertNumQueries(0):
+            self.assertQuerySetEqual(f.qs, [])
+
+        f = F({"excluded": alex.pk}, queryset=qs)
+        self.assertEqual(f.qs.count(), 2)
+
+        # null values are not members of the queryset
+        f = F({"author": "null"}, queryset=qs)
+        self.assertQuerySetEqual(f.qs, [None], lambda o: o.author)
+
 
 class ModelMultipleChoiceFilterTests(TestCase):
     def setUp(self):
@@ -691,6 +847,154 @@ class ModelMultipleChoiceFilterTests(TestCase):
             set(Article.objects.exclude(author__isnull=True)),
         )
 
+    def test_validate_syntax(self):
+        class F(FilterSet):
+            favorite_books = ModelMultipleChoiceFilter(
+                queryset=Book.objects.exclude(pk=self.b1.pk), validate="syntax"
+            )
+
+            class Meta:
+                model = User
+                fields = ["favorite_books"]
+
+        qs = User.objects.all().order_by("username")
+
+        f = F({"favorite_books": [self.b2.pk, self.b3.pk]}, queryset=qs)
+        with self.assertNumQueries(0):
+            self.assertTrue(f.is_valid())
+        self.assertEqual(
+            f.form.cleaned_data["favorite_books"], [self.b2.pk, self.b3.pk]
+        )
+        with self.assertNumQueries(1):
+            self.assertQuerySetEqual(f.qs, ["aaron", "alex"], lambda o: o.username)
+
+        # b1 is not a valid choice, and does not match any rows
+        f = F({"favorite_books": [self.b1.pk, self.b3.pk]}, queryset=qs)
+        self.assertTrue(f.is_valid())
+        self.assertQuerySetEqual(f.qs, ["aaron"], lambda o: o.username)
+
+        field = f.form.fields["favorite_books"]
+        with self.assertRaises(forms.ValidationError):
+            field.check_choices([self.b1.pk, self.b3.pk])
+        field.check_choices([self.b3.pk])
+
+        f = F({"favorite_books": ["foo"]}, queryset=qs)
+        self.assertFalse(f.is_valid())
+        error = f.errors.as_data()["favorite_books"][0]
+        self.assertEqual(error.code, "invalid_pk_value")
+
+    def test_validate_syntax_to_field_name(self):
+        class F(FilterSet):
+            favorite_books = ModelMultipleChoiceFilter(
+                queryset=Book.objects.exclude(pk=self.b1.pk),
+                to_field_name="title",
+                validate="syntax",
+            )
+
+            class Meta:
+                model = User
+                fields = ["favorite_books"]
+
+        qs = User.objects.all().order_by("username")
+
+        # the values are compared against the to-field, not the primary key
+        f = F({"favorite_books": [self.b2.title, self.b3.title]}, queryset=qs)
+        self.assertTrue(f.is_valid())
+        self.assertQuerySetEqual(f.qs, ["aaron", "alex"], lambda o: o.username)
+
+        f = F({"favorite_books": [self.b1.title, "x"]}, queryset=qs)
+        self.assertTrue(f.is_valid())
+        self.assertQuerySetEqual(f.qs, [], lambda o: o.username)
+
+    @override_settings(FILTERS_NULL_CHOICE_LABEL="No Books")
+    def test_validate_syntax_empty_queryset(self):
+        class F(FilterSet):
+            favorite_books = ModelMultipleChoiceFilter(
+                queryset=Book.objects.none(), validate="syntax"
+            )
+
+            class Meta:
+                model = User
+                fields = ["favorite_books"]
+
+        qs = User.objects.all().order_by("username")
+
+        # no value can match an empty choice queryset
+        f = F({"favorite_books": [self.b1.pk, self.b2.pk]}, queryset=qs)
+        self.assertTrue(f.is_valid())
+        self.assertTrue(f.qs.query.is_empty())
+        with self.assertNumQueries(0):
+            self.assertQuerySetEqual(f.qs, [])
+
+        # null values are not members of the queryset
+        f = F({"favorite_books": [self.b1.pk, "null"]}, queryset=qs)
+        self.assertQuerySetEqual(f.qs, ["jacob"], lambda o: o.username)
+
+    def test_filtering_conjoined(self):
+        class F(FilterSet):
+            favorite_books = ModelMultipleChoiceFilter(
+                queryset=Book.objects.all(), conjoined=True
+            )
+
+            class Meta:
+                model = User
+                fields = ["favorite_books"]
+
+        qs = User.objects.all().order_by("username")
+        data = {"favorite_books": [self.b1.pk, self.b2.pk]}
+
+        f = F(data, queryset=qs)
+        self.assertQuerySetEqual(f.qs, ["alex"], lambda o: o.username)
+
+        # to-many relationships are grouped in a single subquery
+        sql = str(f.qs.query)
+        self.assertIn("GROUP BY", sql)
+        self.assertIn("HAVING COUNT(DISTINCT", sql)
+        self.assertNotIn("DISTINCT", sql.split(" IN (SELECT")[0])
+
+        f = F({"favorite_books": [self.b1.pk, self.b3.pk]}, queryset=qs)
+        self.assertQuerySetEqual(f.qs, ["aaron"], lambda o: o.username)
+
+        f = F({"favorite_books": [self.b1.pk]}, queryset=qs)
+        self.assertQuerySetEqual(f.qs, ["aaron", "alex"], lambda o: o.username)
+
+    def test_filtering_conjoined_join_strategy(self):
+        class F(FilterSet):
+            favorite_books = ModelMultipleChoiceFilter(
+                queryset=Book.objects.all(),
+                conjoined=True,
+                conjoined_strategy="join",
+            )
+
+            class Meta:
+                model = User
+                fields = ["favorite_books"]
+
+        qs = User.objects.all().order_by("username")
+        f = F({"favorite_books": [self.b1.pk, self.b2.pk]}, queryset=qs)
+        self.assertQuerySetEqual(f.qs, ["alex"], lambda o: o.username)
+        self.assertNotIn("GROUP BY", str(f.qs.query))
+
+    def test_validate_syntax_conjoined(self):
+        class F(FilterSet):
+            favorite_books = ModelMultipleChoiceFilter(
+                queryset=Book.objects.exclude(pk=self.b3.pk),
+                conjoined=True,
+                validate="syntax",
+            )
+
+            class Meta:
+                model = User
+                fields = ["favorite_books"]
+
+        qs = User.objects.all().order_by("username")
+
+        f = F({"favorite_books": [self.b1.pk, self.b2.pk]}, queryset=qs)
+        self.assertQuerySetEqual(f.qs, ["alex"], lambda o: o.username)
+
+        f = F({"favorite_books": [self.b1.pk, self.b3.pk]}, queryset=qs)
+        self.assertQuerySetEqual(f.qs, [], lambda o: o.username)
+
 
 class NumberFilterTests(TestCase):
     def setUp(self):
@@ -764,6 +1068,25 @@ class RangeFilterTests(TestCase):
         f = F({"price_min": "0", "price_max": "0"}, queryset=qs)
         self.assertQuerySetEqual(f.qs, ["Free Book"], lambda o: o.title)
 
+    def test_filtering_inverted_range(self):
+        class F(FilterSet):
+            price = RangeFilter()
+            excluded = RangeFilter(field_name="price", exclude=True)
+
+            class Meta:
+                model = Book
+                fields = ["price"]
+
+        qs = Book.objects.all().order_by("title")
+        f = F({"price_min": "15", "price_max": "5"}, queryset=qs)
+        self.assertTrue(f.qs.query.is_empty())
+        with self.assertNumQueries(0):
+            self.assertQuerySetEqual(f.qs, [])
+
+        # excluding an empty range is a noop
+        f = F({"excluded_min": "15", "excluded_max": "5"}, queryset=qs)
+        self.assertEqual(f.qs.count(), 5)
+
 
 class DateRangeFilterTests(TestCase):
     class CommentFilter(FilterSet):
@@ -1876,6 +2199,14 @@ class CSVFilterTests(TestCase):
                     F(params, queryset=qs).qs, expected, attrgetter("pk")
                 )
 
+    def test_empty_values_short_circuit(self):
+        F = self.user_filter
+
+        f = F({"status__in": ","}, queryset=User.objects.all())
+        self.assertTrue(f.qs.query.is_empty())
+        with self.assertNumQueries(0):
+            self.assertEqual(list(f.qs), [])
+
     def test_datetime_filtering(self):
         F = self.article_filter
         qs = Article.objects.order_by("pk")
@@ -1997,6 +2328,11 @@ class CSVRangeFilterTests(TestCase):
         f = F({"published__range": ","})
         self.assertEqual(f.qs.count(), 0)
 
+        # inverted ranges are empty without querying
+        f = F({"published__range": "%s,%s" % (self.after_5pm, self.before_5pm)})
+        with self.assertNumQueries(0):
+            self.assertEqual(list(f.qs), [])
+
         f = F({"published__range": "%s" % (self.before_5pm,)})
         self.assertFalse(f.is_valid())
 
@@ -2205,3 +2541,78 @@ class MiscFilterSetTests(TestCase):
         self.assertQuerySetEqual(
             f.qs, ["jacob", "aaron"], lambda o: o.username, ordered=False
         )
+
+
+DETERMINISTIC_SQL_SCRIPT = """
+import django
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+django.setup()
+connection.creation.create_test_db(verbosity=0)
+
+from django_filters import filters
+from django_filters.filterset import FilterSet
+from django_filters.widgets import QueryArrayWidget
+from tests.models import Book, User
+
+names = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot"]
+for name in names:
+    user = User.objects.create(username=name)
+    user.favorite_books.add(Book.objects.create(title=name, price=1, average_rating=1))
+
+
+class F(FilterSet):
+    username = filters.MultipleChoiceFilter(choices=[(n, n) for n in names])
+    first_name = filters.MultipleChoiceFilter(
+        field_name="username",
+        choices=[(n, n) for n in names],
+        widget=QueryArrayWidget,
+    )
+    last_name = filters.BaseInFilter(field_name="username")
+    favorite_books = filters.ModelMultipleChoiceFilter(
+        field_name="favorite_books__title",
+        queryset=Book.objects.all(),
+        to_field_name="title",
+        conjoined=True,
+    )
+
+
+data = {
+    "username": names,
+    "first_name": ",".join(names),
+    "last_name": ",".join(names + names),
+    "favorite_books": names[:3],
+}
+with CaptureQueriesContext(connection) as context:
+    list(F(data, queryset=User.objects.all()).qs)
+
+for query in context.captured_queries:
+    print(query["sql"])
+"""
+
+
+class DeterministicSQLTests(TestCase):
+    def get_sql(self, hashseed):
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE="tests.settings",
+            PYTHONHASHSEED=hashseed,
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, "-c", DETERMINISTIC_SQL_SCRIPT],
+            cwd=root,
+            env=env,
+            capture_output=True,
+            check=True,
+        )
+        return result.stdout
+
+    def test_identical_sql_across_hash_seeds(self):
+        sql = self.get_sql("0")
+        self.assertIn(b"IN", sql)
+
+        for hashseed in ["1", "2", "3", "4"]:
+            with self.subTest(hashseed=hashseed):
+                self.assertEqual(self.get_sql(hashseed), sql)
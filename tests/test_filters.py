@@ -6,6 +6,7 @@ from unittest import mock
 
 import django
 from django import forms
+from django.db.models import Q
 from django.test import TestCase, override_settings
 from django.utils import translation
 from django.utils.translation import gettext as _
@@ -101,6 +102,17 @@ class FilterTests(TestCase):
                 required=False, label="somelabel", widget="somewidget"
             )
 
+    def test_cost_and_selectivity(self):
+        f = Filter()
+        self.assertIsNone(f.get_cost())
+        self.assertIsNone(f.get_selectivity("value"))
+
+        f = Filter(cost=0.5, selectivity=0.1)
+        self.assertEqual(f.get_cost(), 0.5)
+        self.assertEqual(f.get_selectivity("value"), 0.1)
+        self.assertNotIn("cost", f.extra)
+        self.assertNotIn("selectivity", f.extra)
+
     def test_field_extra_params(self):
         with mock.patch.object(Filter, "field_class", spec=["__call__"]) as mocked:
             f = Filter(someattr="someattr")
@@ -470,6 +482,34 @@ class MultipleChoiceFilterTests(TestCase):
             qs.filter.assert_called_once_with(mockQ1.__ior__.return_value)
             qs.filter.return_value.distinct.assert_called_once_with()
 
+    def test_filter_q_collapses_equalities(self):
+        f = MultipleChoiceFilter(field_name="somefield")
+        self.assertEqual(f.get_filter_q(["a"]), Q(somefield="a"))
+        self.assertEqual(f.get_filter_q(["a", "b"]), Q(somefield__in=["a", "b"]))
+        self.assertEqual(
+            f.get_filter_q([None, "a", "b"]),
+            Q(somefield=None) | Q(somefield__in=["a", "b"]),
+        )
+
+    def test_filter_q_with_lookup_expr(self):
+        f = MultipleChoiceFilter(field_name="somefield", lookup_expr="icontains")
+        self.assertEqual(
+            f.get_filter_q(["a", "b"]),
+            Q(somefield__icontains="a") | Q(somefield__icontains="b"),
+        )
+
+    def test_filter_q_with_custom_predicate(self):
+        class F(MultipleChoiceFilter):
+            def get_filter_predicate(self, v):
+                return {"somefield__exact": v, "otherfield": v}
+
+        f = F(field_name="somefield")
+        self.assertEqual(
+            f.get_filter_q(["a", "b"]),
+            Q(somefield__exact="a", otherfield="a")
+            | Q(somefield__exact="b", otherfield="b"),
+        )
+
     def test_filtering_on_required_skipped_when_len_of_value_is_len_of_field_choices(
         self,
     ):
@@ -576,6 +616,40 @@ class MultipleChoiceFilterTests(TestCase):
                 ),
             )
 
+    def test_conjoined_strategy(self):
+        qs = User.objects.all()
+        f = MultipleChoiceFilter(field_name="favorite_books", conjoined=True)
+        self.assertIsNone(f.conjoined_strategy)
+        self.assertEqual(f.get_conjoined_strategy(qs), "subquery")
+
+        f = MultipleChoiceFilter(field_name="username", conjoined=True)
+        self.assertEqual(f.get_conjoined_strategy(qs), "join")
+
+        f = MultipleChoiceFilter(
+            field_name="favorite_books", conjoined=True, conjoined_strategy="join"
+        )
+        self.assertEqual(f.get_conjoined_strategy(qs), "join")
+
+        f = MultipleChoiceFilter(
+            field_name="favorite_books", conjoined=True, exclude=True
+        )
+        self.assertEqual(f.get_conjoined_strategy(qs), "join")
+
+    def test_conjoined_strategy_invalid(self):
+        msg = "'conjoined_strategy' must be one of 'join' or 'subquery', not 'foo'."
+        with self.assertRaisesMessage(AssertionError, msg):
+            MultipleChoiceFilter(conjoined=True, conjoined_strategy="foo")
+
+    def test_conjoined_q_not_grouped(self):
+        qs = User.objects.all()
+        f = MultipleChoiceFilter(field_name="favorite_books", conjoined=True)
+        self.assertIsNone(f.get_conjoined_q(qs, [None, 1]))
+
+        f = MultipleChoiceFilter(
+            field_name="favorite_books", lookup_expr="lt", conjoined=True
+        )
+        self.assertIsNone(f.get_conjoined_q(qs, [1, 2]))
+
 
 class TypedMultipleChoiceFilterTests(TestCase):
     def test_default_field(self):
@@ -1538,6 +1612,15 @@ class BaseInFilterTests(TestCase):
         f.filter(qs, [1, 2])
         qs.filter.assert_called_once_with(None__in=[1, 2])
 
+    def test_filtering_deduplicates_values(self):
+        class NumberInFilter(BaseInFilter, NumberFilter):
+            pass
+
+        qs = mock.Mock(spec=["filter"])
+        f = NumberInFilter()
+        f.filter(qs, [2, 1, 2, 3, 1])
+        qs.filter.assert_called_once_with(None__in=[2, 1, 3])
+
 
 class BaseRangeFilterTests(TestCase):
     def test_filtering(self):
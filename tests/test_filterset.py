@@ -23,6 +23,7 @@ from django_filters.filters import (
 )
 from django_filters.filterset import (
     FILTER_FOR_DBFIELD_DEFAULTS,
+    FilterOrder,
     FilterSet,
     UnknownFieldBehavior,
     filterset_factory,
@@ -953,6 +954,110 @@ class FilterSetQuerysetTests(TestCase):
         with self.assertRaisesMessage(AssertionError, msg):
             f.qs
 
+    def test_empty_result_skips_remaining_filters(self):
+        remaining = mock.Mock()
+
+        class F(FilterSet):
+            empty = CharFilter(method=lambda qs, name, value: qs.none())
+            remaining = CharFilter(method="filter_remaining")
+
+            def filter_remaining(self, qs, name, value):
+                remaining(value)
+                return qs
+
+            class Meta:
+                model = User
+                fields = []
+
+        f = F({"empty": "a", "remaining": "b"}, queryset=User.objects.all())
+        with self.assertNumQueries(0):
+            self.assertEqual(list(f.qs), [])
+        remaining.assert_not_called()
+
+        f = F({"remaining": "b"}, queryset=User.objects.all())
+        f.qs
+        remaining.assert_called_once_with("b")
+
+
+class FilterOrderTests(TestCase):
+    def get_filterset_class(self, filter_order=FilterOrder.DECLARED, **filters):
+        calls = self.calls = []
+
+        def record(qs, name, value):
+            calls.append(name)
+            return qs
+
+        attrs = {
+            name: CharFilter(method=record, **kwargs)
+            for name, kwargs in filters.items()
+        }
+        attrs["Meta"] = type(
+            "Meta", (), {"model": User, "fields": [], "filter_order": filter_order}
+        )
+        return type("F", (FilterSet,), attrs)
+
+    def test_declared_order(self):
+        F = self.get_filterset_class(
+            a=dict(cost=1), b=dict(cost=0.1), c=dict(selectivity=0.01)
+        )
+        F({"a": "a", "b": "b", "c": "c"}).qs
+
+        self.assertEqual(self.calls, ["a", "b", "c"])
+
+    def test_cost_order(self):
+        F = self.get_filterset_class(
+            FilterOrder.COST,
+            a=dict(cost=1),
+            b=dict(cost=0.1),
+            c=dict(cost=0.1, selectivity=0.01),
+            d=dict(cost=0.01, selectivity=1),
+        )
+        F({"a": "a", "b": "b", "c": "c", "d": "d"}).qs
+
+        self.assertEqual(self.calls, ["c", "b", "a", "d"])
+
+    def test_unknown_costs_keep_declared_order(self):
+        F = self.get_filterset_class(FilterOrder.COST, a={}, b={}, c={})
+        F.learned_costs = {}
+        f = F({"a": "a", "b": "b", "c": "c"})
+        f.is_valid()
+
+        self.assertEqual([f.get_filter_rank(n, "x") for n in "abc"], [0, 0, 0])
+        self.assertEqual([name for name, _ in f.get_filter_values()], ["a", "b", "c"])
+
+    def test_learned_cost(self):
+        F = self.get_filterset_class(FilterOrder.COST, a={}, b={})
+        F({"a": "a", "b": "b"}).qs
+
+        self.assertEqual(set(F.learned_costs), {"a", "b"})
+        F.learned_costs["a"] = 1.0
+        F.learned_costs["b"] = 0.5
+        self.calls.clear()
+        F({"a": "a", "b": "b"}).qs
+
+        self.assertEqual(self.calls, ["b", "a"])
+        self.assertLess(F.learned_costs["a"], 1.0)
+        self.assertGreater(F.learned_costs["a"], 0.5)
+
+    def test_facet_querysets_are_not_learned(self):
+        F = self.get_filterset_class(FilterOrder.COST, a={}, b={})
+        f = F({"a": "a", "b": "b"})
+        f.qs
+        F.learned_costs["b"] = 0.5
+        f.get_facet_queryset("a")
+
+        self.assertEqual(F.learned_costs["b"], 0.5)
+
+    def test_empty_values_are_not_learned(self):
+        F = self.get_filterset_class(FilterOrder.COST, a={})
+        F({"a": ""}).qs
+
+        self.assertEqual(F.learned_costs, {})
+
+    def test_invalid_filter_order(self):
+        with self.assertRaisesMessage(ValueError, "Invalid filter_order: cost"):
+            self.get_filterset_class("cost")
+
 
 # test filter.method here, as it depends on its parent FilterSet
 class FilterMethodTests(TestCase):
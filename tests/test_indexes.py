@@ -0,0 +1,335 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.postgres.indexes import OpClass
+from django.core.management import CommandError, call_command
+from django.db import models
+from django.db.models.functions import Upper
+from django.test import TestCase
+
+from django_filters.filters import (
+    BooleanFilter,
+    CharFilter,
+    ChoiceFilter,
+    DateFilter,
+    IsoDateTimeFilter,
+    NumberFilter,
+    OrderingFilter,
+)
+from django_filters.filterset import FilterSet
+from django_filters.indexes import (
+    advise,
+    get_index_name,
+    get_indexes,
+    get_suggested_indexes,
+    is_indexed,
+)
+
+from .models import STATUS_CHOICES, Article, Comment, Ticket, User
+
+
+class TicketFilter(FilterSet):
+    status = ChoiceFilter(choices=STATUS_CHOICES)
+    title = CharFilter(lookup_expr="iexact")
+    created = IsoDateTimeFilter(lookup_expr="gte")
+    closed = BooleanFilter(field_name="closed", lookup_expr="isnull")
+    assignee = CharFilter(field_name="assignee__username")
+    o = OrderingFilter(fields=["created"])
+
+    class Meta:
+        model = Ticket
+        fields = []
+
+
+class IndexedFilter(FilterSet):
+    class Meta:
+        model = User
+        fields = ["id"]
+
+
+def get_advice(filterset_class, vendor="postgresql"):
+    return {(a.name, a.lookup): a for a in advise(filterset_class, vendor)}
+
+
+class IndexesTests(TestCase):
+    def test_get_indexes(self):
+        self.assertEqual(
+            get_indexes(Ticket),
+            [("id",), ("status", "created"), (("upper", "title"),)],
+        )
+        self.assertIn(("author",), get_indexes(Comment))
+
+    def test_is_indexed(self):
+        self.assertTrue(is_indexed(Ticket, ["status"]))
+        self.assertTrue(is_indexed(Ticket, ["status", "created"]))
+        self.assertFalse(is_indexed(Ticket, ["created"]))
+        self.assertTrue(is_indexed(Ticket, [("upper", "title")]))
+        self.assertFalse(is_indexed(Ticket, ["assignee"]))
+
+    def test_index_name(self):
+        name = get_index_name(Ticket, ["created"])
+        self.assertLessEqual(len(name), 30)
+        self.assertTrue(name.startswith("tests_ticke_created_"))
+        self.assertNotEqual(name, get_index_name(Ticket, ["created", "upper"]))
+
+
+class AdviseTests(TestCase):
+    def test_indexed_filters(self):
+        advice = get_advice(TicketFilter)
+
+        # the composite index serves the status filter ordered by created, and
+        # the functional index serves the case-insensitive title filter.
+        self.assertNotIn(("status", "exact"), advice)
+        self.assertNotIn(("title", "iexact"), advice)
+
+    def test_single_column(self):
+        advice = get_advice(TicketFilter)[("created", "gte")]
+
+        self.assertEqual(advice.model, Ticket)
+        self.assertEqual(advice.reason, "no index on 'created'")
+        self.assertEqual(advice.index.fields, ["created"])
+
+    def test_partial(self):
+        advice = get_advice(TicketFilter)[("closed", "isnull")]
+
+        self.assertEqual(advice.index.fields, ["closed"])
+        self.assertEqual(advice.index.condition, models.Q(closed__isnull=False))
+
+    def test_boolean_partial(self):
+        class F(FilterSet):
+            class Meta:
+                model = User
+                fields = ["is_active"]
+
+        advice = get_advice(F)[("is_active", "exact")]
+        self.assertEqual(advice.index.condition, models.Q(is_active=True))
+
+    def test_join(self):
+        advice = [a for a in advise(TicketFilter, "postgresql") if a.name == "assignee"]
+
+        self.assertEqual([a.model for a in advice], [Ticket, User])
+        self.assertEqual(advice[0].reason, "joining 'assignee' scans 'tests_ticket'")
+        self.assertEqual(advice[0].index.fields, ["assignee"])
+        self.assertEqual(advice[1].reason, "no index on 'username'")
+
+    def test_indexed_join(self):
+        class F(FilterSet):
+            comments = CharFilter(field_name="comments__text")
+
+            class Meta:
+                model = User
+                fields = []
+
+        class G(FilterSet):
+            author = CharFilter(field_name="author__status")
+
+            class Meta:
+                model = Comment
+                fields = []
+
+        advice = advise(F, "postgresql") + advise(G, "postgresql")
+        self.assertEqual(
+            [a.reason for a in advice], ["no index on 'text'", "no index on 'status'"]
+        )
+
+    def test_ordering(self):
+        class F(FilterSet):
+            o = OrderingFilter(fields=["username", "id"])
+
+            class Meta:
+                model = User
+                fields = []
+
+        advice = get_advice(F)
+        self.assertEqual(advice[("o", "username")].index.fields, ["username"])
+        self.assertNotIn(("o", "id"), advice)
+
+    def test_composite(self):
+        class F(FilterSet):
+            status = ChoiceFilter(choices=STATUS_CHOICES)
+            o = OrderingFilter(fields=["username"])
+
+            class Meta:
+                model = User
+                fields = []
+
+        advice = get_advice(F)[("status", "exact")]
+        self.assertEqual(advice.index.fields, ["status", "username"])
+
+    def test_functional(self):
+        class F(FilterSet):
+            username = CharFilter(lookup_expr="iexact")
+
+            class Meta:
+                model = User
+                fields = []
+
+        advice = get_advice(F)[("username", "iexact")]
+        self.assertEqual(advice.index.expressions, (Upper("username"),))
+
+        advice = get_advice(F, "mysql")[("username", "iexact")]
+        self.assertEqual(advice.index.fields, ["username"])
+
+        advice = get_advice(F, "sqlite")[("username", "iexact")]
+        self.assertIsNone(advice.index)
+
+    def test_pattern(self):
+        class F(FilterSet):
+            username = CharFilter(lookup_expr="icontains")
+
+            class Meta:
+                model = User
+                fields = []
+
+        advice = get_advice(F, "sqlite")[("username", "icontains")]
+        self.assertEqual(
+            advice.reason, "'icontains' matches a pattern anywhere in 'username'"
+        )
+        self.assertIsNone(advice.index)
+
+        advice = get_advice(F)[("username", "icontains")]
+        self.assertEqual(advice.index.opclasses, ())
+        self.assertIn("gin_trgm_ops", str(advice.index.expressions[0]))
+
+    def test_prefix(self):
+        class F(FilterSet):
+            username = CharFilter(lookup_expr="startswith")
+            iusername = CharFilter(field_name="username", lookup_expr="istartswith")
+
+            class Meta:
+                model = User
+                fields = []
+
+        prefix = get_advice(F)[("username", "startswith")]
+        self.assertEqual(prefix.reason, "'startswith' matches 'username' with LIKE")
+        self.assertEqual(
+            prefix.index.expressions,
+            (OpClass(models.F("username"), name="varchar_pattern_ops"),),
+        )
+        iprefix = get_advice(F)[("iusername", "istartswith")]
+        self.assertEqual(
+            iprefix.index.expressions,
+            (OpClass(Upper("username"), name="text_pattern_ops"),),
+        )
+
+        # plain indexes don't serve LIKE on PostgreSQL, unlike other databases
+        indexes = [
+            models.Index(fields=["username"], name="user_username"),
+            models.Index(Upper("username"), name="user_username_upper"),
+        ]
+        with mock.patch.object(User._meta, "indexes", indexes):
+            self.assertEqual(len(get_advice(F)), 2)
+            self.assertEqual(get_advice(F, "mysql"), {})
+
+        # indexes with a pattern operator class do
+        indexes = [prefix.index, iprefix.index]
+        with mock.patch.object(User._meta, "indexes", indexes):
+            self.assertEqual(get_advice(F), {})
+        indexes = [
+            models.Index(
+                fields=["username"],
+                opclasses=["varchar_pattern_ops"],
+                name="user_username_like",
+            )
+        ]
+        with mock.patch.object(User._meta, "indexes", indexes):
+            self.assertEqual(list(get_advice(F)), [("iusername", "istartswith")])
+
+        # as does the index that Django adds for db_index text columns
+        with mock.patch.object(User._meta.get_field("username"), "db_index", True):
+            self.assertEqual(list(get_advice(F)), [("iusername", "istartswith")])
+
+    def test_transform(self):
+        class F(FilterSet):
+            year = NumberFilter(field_name="date", lookup_expr="year__gte")
+            date = DateFilter()
+
+            class Meta:
+                model = Comment
+                fields = []
+
+        advice = get_advice(F)
+        self.assertEqual(
+            advice[("year", "year__gte")].reason,
+            "the lookup 'year__gte' transforms 'date' before comparing it",
+        )
+        self.assertIsNone(advice[("year", "year__gte")].index)
+        self.assertIn(("date", "exact"), advice)
+
+    def test_method_filters(self):
+        class F(FilterSet):
+            username = CharFilter(method="filter_username")
+
+            class Meta:
+                model = User
+                fields = []
+
+        self.assertEqual(advise(F, "postgresql"), [])
+
+    def test_suggested_indexes(self):
+        class F(FilterSet):
+            published = DateFilter()
+            published__gt = DateFilter(field_name="published", lookup_expr="gt")
+
+            class Meta:
+                model = Article
+                fields = []
+
+        indexes = get_suggested_indexes(advise(F, "postgresql"))
+        self.assertEqual(list(indexes), [Article])
+        self.assertEqual([i.fields for i in indexes[Article]], [["published"]])
+
+
+class CommandTests(TestCase):
+    def test_command(self):
+        out = StringIO()
+        call_command(
+            "suggest_filter_indexes", "tests.test_indexes.TicketFilter", stdout=out
+        )
+
+        self.assertIn("tests.test_indexes.TicketFilter (tests.Ticket)", out.getvalue())
+        self.assertIn("  created (gte): no index on 'created'", out.getvalue())
+        self.assertIn(
+            "    tests.Ticket: models.Index(fields=['created']", out.getvalue()
+        )
+
+    def test_no_advice(self):
+        out = StringIO()
+        call_command(
+            "suggest_filter_indexes", "tests.test_indexes.IndexedFilter", stdout=out
+        )
+        self.assertEqual(out.getvalue(), "No missing indexes found.\n")
+
+    def test_imported_filtersets(self):
+        out = StringIO()
+        call_command("suggest_filter_indexes", stdout=out)
+
+        self.assertIn("tests.test_indexes.TicketFilter (tests.Ticket)", out.getvalue())
+
+    def test_migrations(self):
+        with tempfile.TemporaryDirectory() as directory:
+            call_command(
+                "suggest_filter_indexes",
+                "tests.test_indexes.TicketFilter",
+                migrations=directory,
+                stdout=StringIO(),
+            )
+
+            with open(os.path.join(directory, "tests_filter_indexes.py")) as f:
+                migration = f.read()
+
+        self.assertIn("migrations.AddIndex(", migration)
+        self.assertIn("model_name='ticket'", migration)
+        self.assertIn("models.Index(fields=['created']", migration)
+
+    def test_not_a_filterset(self):
+        with self.assertRaisesMessage(
+            CommandError, "'tests.models.User' is not a FilterSet."
+        ):
+            call_command("suggest_filter_indexes", "tests.models.User")
+
+    def test_without_model(self):
+        with self.assertRaisesMessage(CommandError, "does not declare 'Meta.model'"):
+            call_command("suggest_filter_indexes", "django_filters.FilterSet")
@@ -0,0 +1,184 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.db import OperationalError
+from django.db.models import QuerySet
+from django.test import RequestFactory, TestCase, override_settings
+
+from django_filters import metrics
+from django_filters.filters import CharFilter, NumberFilter
+from django_filters.filterset import FilterSet
+from django_filters.metrics import MmapValues, Registry, read_file
+from django_filters.metrics.views import metrics as metrics_view
+
+from .models import User
+
+PATH = "tests.test_metrics.UserFilter"
+
+
+class UserFilter(FilterSet):
+    username = CharFilter()
+    status = NumberFilter()
+
+    class Meta:
+        model = User
+        fields = []
+
+
+class MetricsTestCase(TestCase):
+    def setUp(self):
+        metrics.connect()
+        self.addCleanup(metrics.disconnect)
+        self.addCleanup(metrics.registry.clear)
+
+    def get_values(self):
+        return {
+            line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+            for line in metrics.registry.render().splitlines()
+            if not line.startswith("#")
+        }
+
+
+class RecordTests(MetricsTestCase):
+    def test_record(self):
+        list(UserFilter({"username": "alex", "status": "1"}).qs)
+        UserFilter({"status": "1"}).qs.count()
+        UserFilter({"status": "x"}).qs
+
+        values = self.get_values()
+        labels = 'filterset="%s"' % PATH
+        self.assertEqual(values["django_filters_requests_total{%s}" % labels], 3)
+        self.assertEqual(
+            values[
+                'django_filters_filter_activations_total{%s,filter="status"}' % labels
+            ],
+            2,
+        )
+        self.assertEqual(
+            values[
+                "django_filters_validation_failures_total"
+                '{%s,field="status",code="invalid"}' % labels
+            ],
+            1,
+        )
+        self.assertEqual(
+            values["django_filters_validation_seconds_count{%s}" % labels], 3
+        )
+        self.assertEqual(
+            values['django_filters_validation_seconds_bucket{%s,le="+Inf"}' % labels],
+            3,
+        )
+        self.assertEqual(
+            values[
+                'django_filters_filter_seconds_count{%s,filter="username"}' % labels
+            ],
+            1,
+        )
+        self.assertEqual(
+            values[
+                'django_filters_evaluation_seconds_count{%s,method="count"}' % labels
+            ],
+            1,
+        )
+        self.assertEqual(
+            values[
+                'django_filters_evaluation_seconds_count{%s,method="fetch"}' % labels
+            ],
+            1,
+        )
+
+    def test_error(self):
+        with mock.patch.object(QuerySet, "count", side_effect=OperationalError):
+            with self.assertRaises(OperationalError):
+                UserFilter({"status": "1"}).qs.count()
+
+        # the failed query is not observed
+        values = self.get_values()
+        labels = 'filterset="%s",method="count"' % PATH
+        self.assertNotIn("django_filters_evaluation_seconds_count{%s}" % labels, values)
+
+    def test_disconnected(self):
+        metrics.disconnect()
+        UserFilter({"status": "1"}).qs
+
+        self.assertEqual(self.get_values(), {})
+
+    def test_view(self):
+        UserFilter({"status": "1"}).qs
+        response = metrics_view(RequestFactory().get("/metrics"))
+
+        self.assertEqual(response["Content-Type"], metrics.CONTENT_TYPE)
+        self.assertContains(response, "# TYPE django_filters_requests_total counter")
+        self.assertContains(
+            response, 'django_filters_requests_total{filterset="%s"} 1.0' % PATH
+        )
+
+
+class RegistryTests(TestCase):
+    def setUp(self):
+        self.registry = Registry()
+        self.addCleanup(self.registry.clear)
+
+    def test_render(self):
+        counter = self.registry.counter("hits_total", "Hits.", ["path"])
+        histogram = self.registry.histogram("latency_seconds", "Latency.", [], [1, 5])
+        counter.inc(path='a "b"\n')
+        counter.inc(2, path='a "b"\n')
+        histogram.observe(0.5)
+        histogram.observe(3)
+        histogram.observe(3)
+
+        self.assertEqual(
+            self.registry.render(),
+            "# HELP hits_total Hits.\n"
+            "# TYPE hits_total counter\n"
+            'hits_total{path="a \\"b\\"\\n"} 3.0\n'
+            "# HELP latency_seconds Latency.\n"
+            "# TYPE latency_seconds histogram\n"
+            'latency_seconds_bucket{le="1.0"} 1.0\n'
+            'latency_seconds_bucket{le="5.0"} 3.0\n'
+            "latency_seconds_sum 6.5\n"
+            "latency_seconds_count 3.0\n",
+        )
+
+    def test_directory(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        counter = self.registry.counter("hits_total", "Hits.")
+
+        # another process
+        other = MmapValues(os.path.join(directory.name, "1.db"))
+        other.incr(counter.get_key("", []), 5)
+        other.close()
+
+        with override_settings(FILTERS_METRICS_DIR=directory.name):
+            counter.inc()
+            counter.inc()
+            self.assertIn("hits_total 7.0\n", self.registry.render())
+            self.assertTrue(
+                os.path.exists(os.path.join(directory.name, "%d.db" % os.getpid()))
+            )
+            self.registry.clear()
+
+
+class MmapValuesTests(TestCase):
+    def test_values(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "1.db")
+            values = MmapValues(path)
+            # grow the file
+            for i in range(5000):
+                values.incr("key-%d" % i, i)
+            values.incr("key-1", 1)
+            self.assertEqual(len(values.items()), 5000)
+            values.close()
+
+            self.assertEqual(dict(read_file(path))["key-1"], 2)
+            self.assertEqual(dict(read_file(path))["key-4999"], 4999)
+
+            # reopen the file
+            values = MmapValues(path)
+            values.incr("key-1", 1)
+            values.close()
+            self.assertEqual(dict(read_file(path))["key-1"], 3)
@@ -0,0 +1,100 @@
+from django.http import HttpResponse
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from django_filters.filters import CharFilter
+from django_filters.filterset import FilterSet
+from django_filters.middleware import ServerTimingMiddleware, get_server_timing
+from django_filters.signals import Timing
+from django_filters.views import FilterView
+
+from .models import Book
+
+
+class BookFilter(FilterSet):
+    title = CharFilter(lookup_expr="icontains")
+
+    class Meta:
+        model = Book
+        fields = ["price"]
+
+
+class ServerTimingMiddlewareTests(TestCase):
+    def setUp(self):
+        Book.objects.create(title="Ender's Game", price="1.00", average_rating=3.0)
+        Book.objects.create(title="Rainbow Six", price="1.00", average_rating=3.0)
+
+    def get_response(self, view, url):
+        middleware = ServerTimingMiddleware(lambda request: view(request).render())
+        return middleware(RequestFactory().get(url))
+
+    def get_metrics(self, response):
+        return [
+            metric.split(";")[0] for metric in response["Server-Timing"].split(", ")
+        ]
+
+    def test_filter_view(self):
+        view = FilterView.as_view(
+            filterset_class=BookFilter,
+            queryset=Book.objects.order_by("title"),
+            paginate_by=1,
+            template_name="tests/book_filter.html",
+        )
+        response = self.get_response(view, "/books/?title=e&price=1")
+
+        self.assertEqual(
+            self.get_metrics(response),
+            [
+                "filterset-class",
+                "filterset-init",
+                "form-validation",
+                "filter.price",
+                "filter.title",
+                "qs.count",
+                "qs.fetch",
+            ],
+        )
+        self.assertIn('desc="BookFilter"', response["Server-Timing"])
+
+    def test_invalid(self):
+        view = FilterView.as_view(
+            filterset_class=BookFilter, template_name="tests/book_filter.html"
+        )
+        response = self.get_response(view, "/books/?price=x")
+
+        self.assertEqual(
+            self.get_metrics(response),
+            ["filterset-class", "filterset-init", "form-validation"],
+        )
+
+    def test_no_filterset(self):
+        middleware = ServerTimingMiddleware(lambda request: HttpResponse())
+        response = middleware(RequestFactory().get("/"))
+
+        self.assertFalse(response.has_header("Server-Timing"))
+
+    def test_existing_header(self):
+        def view(request):
+            list(BookFilter().qs)
+            response = HttpResponse()
+            response["Server-Timing"] = "db;dur=1.000"
+            return response
+
+        response = ServerTimingMiddleware(view)(RequestFactory().get("/"))
+
+        self.assertTrue(response["Server-Timing"].startswith("db;dur=1.000, qs.fetch"))
+
+
+class GetServerTimingTests(TestCase):
+    def test_sums_repeats(self):
+        timings = [
+            Timing("form_validation", BookFilter, None, 0.001),
+            Timing("qs_evaluation", BookFilter, "count", 0.002),
+            Timing("qs_evaluation", BookFilter, "count", 0.0005),
+        ]
+
+        self.assertEqual(
+            get_server_timing(timings),
+            'form-validation;dur=1.000;desc="BookFilter", '
+            'qs.count;dur=2.500;desc="BookFilter"',
+        )
@@ -0,0 +1,158 @@
+import os
+import sys
+import tempfile
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.urls import path
+from rest_framework import generics, serializers
+
+from django_filters.filters import CharFilter
+from django_filters.filterset import FilterSet
+from django_filters.profiling import (
+    SamplingProfilerMiddleware,
+    collapse_stack,
+    get_tag,
+    is_filterset_view,
+)
+from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.signals import Timing
+from django_filters.views import FilterView
+
+from .models import Book
+
+
+class BookFilter(FilterSet):
+    title = CharFilter(method="filter_title")
+
+    class Meta:
+        model = Book
+        fields = ["price"]
+
+    def filter_title(self, queryset, name, value):
+        time.sleep(0.05)
+        return queryset.filter(title=value)
+
+
+class BookSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Book
+        fields = "__all__"
+
+
+class BookList(generics.ListAPIView):
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = BookFilter
+
+
+def plain(request):
+    time.sleep(0.01)
+    return HttpResponse()
+
+
+urlpatterns = [
+    path(
+        "books/",
+        FilterView.as_view(
+            filterset_class=BookFilter, template_name="tests/book_filter.html"
+        ),
+    ),
+    path("api/books/", BookList.as_view()),
+    path("plain/", plain),
+]
+
+
+@override_settings(
+    ROOT_URLCONF="tests.test_profiling",
+    MIDDLEWARE=["django_filters.profiling.SamplingProfilerMiddleware"],
+    FILTERS_PROFILE_INTERVAL=0.001,
+)
+class ProfilerTestCase(TestCase):
+    threshold = 0
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+        setting = override_settings(
+            FILTERS_PROFILE_DIR=self.directory,
+            FILTERS_PROFILE_THRESHOLD=self.threshold,
+        )
+        setting.enable()
+        self.addCleanup(setting.disable)
+
+    def read_stacks(self):
+        (filename,) = os.listdir(self.directory)
+        self.assertTrue(filename.endswith(".collapsed"))
+        with open(os.path.join(self.directory, filename)) as f:
+            return f.read().splitlines()
+
+
+class SamplingProfilerMiddlewareTests(ProfilerTestCase):
+    def test_filter_view(self):
+        self.client.get("/books/?title=a")
+
+        lines = self.read_stacks()
+        self.assertTrue(all(line.startswith("BookFilter(title);") for line in lines))
+        self.assertTrue(any("filters:FilterMethod.__call__" in line for line in lines))
+        stack, count = lines[0].rsplit(" ", 1)
+        self.assertGreater(int(count), 0)
+
+    def test_rest_framework_view(self):
+        self.client.get("/api/books/?title=a")
+
+        lines = self.read_stacks()
+        self.assertTrue(all(line.startswith("BookFilter(title);") for line in lines))
+
+    def test_plain_view(self):
+        self.client.get("/plain/")
+
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+class ThresholdTests(ProfilerTestCase):
+    threshold = 60
+
+    def test_fast_request(self):
+        self.client.get("/books/?title=a")
+
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+class HelperTests(TestCase):
+    def test_missing_directory(self):
+        msg = "SamplingProfilerMiddleware requires the FILTERS_PROFILE_DIR setting."
+        with self.assertRaisesMessage(ImproperlyConfigured, msg):
+            SamplingProfilerMiddleware(lambda request: None)
+
+    def test_collapse_stack(self):
+        def inner():
+            return collapse_stack(sys._getframe())
+
+        stack = inner()
+        self.assertTrue(
+            stack.endswith(
+                ";tests.test_profiling:HelperTests.test_collapse_stack"
+                ";tests.test_profiling:HelperTests.test_collapse_stack.<locals>.inner"
+            )
+        )
+
+    def test_is_filterset_view(self):
+        self.assertTrue(is_filterset_view(urlpatterns[0].callback))
+        self.assertTrue(is_filterset_view(urlpatterns[1].callback))
+        self.assertFalse(is_filterset_view(plain))
+
+    def test_get_tag(self):
+        timings = [
+            Timing("form_validation", BookFilter, None, 0),
+            Timing("filter", BookFilter, "title", 0),
+            Timing("filter", BookFilter, "price", 0),
+            Timing("filter", BookFilter, "title", 0),
+        ]
+
+        self.assertEqual(get_tag(timings), "BookFilter(title,price)")
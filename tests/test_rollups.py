@@ -0,0 +1,173 @@
+from io import StringIO
+from unittest import mock
+
+from django.apps import apps
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from django_filters.filters import BooleanFilter, CharFilter, ChoiceFilter
+from django_filters.filterset import FilterSet
+from django_filters.rollups import (
+    get_rollup_name,
+    rebuild,
+    registry,
+    unregister,
+)
+from django_filters.rollups.models import FacetRollup
+
+from .models import STATUS_CHOICES, Comment, User
+
+
+class RollupTestCase(TestCase):
+    def setUp(self):
+        class Base(FilterSet):
+            status = ChoiceFilter(choices=STATUS_CHOICES)
+            is_active = BooleanFilter()
+            username = CharFilter()
+
+            class Meta:
+                model = User
+                fields = []
+
+        class F(Base):
+            class Meta(Base.Meta):
+                rollup = ["status", "is_active"]
+
+        self.Base, self.F = Base, F
+        self.addCleanup(unregister, F)
+
+        User.objects.create(username="alex", status=1, is_active=True)
+        User.objects.create(username="jacob", status=2, is_active=True)
+        User.objects.create(username="aaron", status=2)
+        User.objects.create(username="carl", status=0)
+
+    def assertFacetsEqual(self, data=None, queryset=None):
+        queryset = User.objects.all() if queryset is None else queryset
+        expected = self.Base(data, queryset=queryset).facets()
+        self.assertEqual(self.F(data, queryset=queryset).facets(), expected)
+
+
+class RegisterTests(TestCase):
+    def test_not_a_facet(self):
+        msg = "'F.Meta.rollup' includes 'username', which is not a choice"
+        with self.assertRaisesMessage(AssertionError, msg):
+
+            class F(FilterSet):
+                class Meta:
+                    model = User
+                    fields = ["username"]
+                    rollup = ["username"]
+
+    def test_related_field(self):
+        msg = "'F.Meta.rollup' includes 'author', which does not filter a single-valued"
+        with self.assertRaisesMessage(AssertionError, msg):
+
+            class F(FilterSet):
+                author = ChoiceFilter(field_name="author__status")
+
+                class Meta:
+                    model = Comment
+                    fields = []
+                    rollup = ["author"]
+
+    def test_declared_again(self):
+        def declare():
+            class F(FilterSet):
+                status = ChoiceFilter(choices=STATUS_CHOICES)
+
+                class Meta:
+                    model = User
+                    fields = []
+                    rollup = ["status"]
+
+            return F
+
+        classes = [declare() for _ in range(3)]
+        self.addCleanup(unregister, classes[-1])
+
+        # the class replaces the classes of the same name
+        name = get_rollup_name(classes[-1])
+        self.assertIs(registry[User][name], classes[-1])
+        self.assertNotIn(classes[0], registry[User].values())
+
+    def test_ready(self):
+        config = apps.get_app_config("django_filters_rollups")
+        with mock.patch(
+            "django_filters.rollups.apps.autodiscover_modules"
+        ) as autodiscover:
+            config.ready()
+
+        autodiscover.assert_called_once_with("filters", "filtersets")
+
+
+class RollupFacetsTests(RollupTestCase):
+    def test_rebuild(self):
+        rebuild(self.F)
+
+        self.assertEqual(FacetRollup.objects.count(), 4)
+        with self.assertNumQueries(1):
+            self.F(queryset=User.objects.all()).facets()
+        self.assertFacetsEqual()
+
+    def test_rolled_up_filters(self):
+        rebuild(self.F)
+
+        with self.assertNumQueries(1):
+            self.F({"status": "2"}, queryset=User.objects.all()).facets()
+        self.assertFacetsEqual({"status": "2"})
+        self.assertFacetsEqual({"status": "2", "is_active": "true"})
+
+    def test_other_filters(self):
+        rebuild(self.F)
+
+        # the facets are counted from the model's table
+        FacetRollup.objects.all().delete()
+        self.assertFacetsEqual({"username": "alex"})
+
+    def test_filtered_queryset(self):
+        rebuild(self.F)
+
+        FacetRollup.objects.all().delete()
+        self.assertFacetsEqual(queryset=User.objects.filter(status=2))
+
+    def test_signals(self):
+        self.assertFacetsEqual()
+
+        user = User.objects.create(username="ben", status=1)
+        self.assertFacetsEqual({"status": "1"})
+
+        user.is_active = True
+        user.save()
+        self.assertFacetsEqual({"is_active": "true"})
+
+        user.delete()
+        self.assertFacetsEqual({"status": "1"})
+
+        User.objects.filter(username="aaron").delete()
+        self.assertFacetsEqual()
+
+    def test_inherited_rollup(self):
+        class G(self.F):
+            pass
+
+        # the subclass is not registered, and shares the rollup of its parent
+        self.assertNotIn(G, registry[User].values())
+        self.assertEqual(get_rollup_name(G), get_rollup_name(self.F))
+
+        User.objects.create(username="ben", status=1)
+        with self.assertNumQueries(1):
+            facets = G(queryset=User.objects.all()).facets()
+        self.assertEqual(facets, self.Base(queryset=User.objects.all()).facets())
+
+    def test_command(self):
+        FacetRollup.objects.all().delete()
+        out = StringIO()
+
+        call_command("rebuild_rollups", stdout=out)
+
+        self.assertIn("Rebuilt tests.test_rollups.", out.getvalue())
+        self.assertFacetsEqual()
+
+    def test_command_without_rollup(self):
+        with self.assertRaisesMessage(CommandError, "does not declare 'Meta.rollup'"):
+            call_command("rebuild_rollups", "tests.test_signals.UserFilter")
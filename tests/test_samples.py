@@ -0,0 +1,165 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from django_filters.filters import (
+    CharFilter,
+    ChoiceFilter,
+    NumberFilter,
+    RangeFilter,
+)
+from django_filters.filterset import FilterSet
+from django_filters.samples import anonymize, mask, percentile, read_samples, replay
+
+from .models import STATUS_CHOICES, User
+
+PATH = "tests.test_samples.UserFilter"
+
+
+class UserFilter(FilterSet):
+    username = CharFilter(lookup_expr="icontains")
+    status = ChoiceFilter(choices=STATUS_CHOICES)
+    id_range = RangeFilter(field_name="id")
+    id = NumberFilter()
+
+    class Meta:
+        model = User
+        fields = []
+
+
+class SamplesTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "samples.jsonl")
+
+    def write_samples(self, *samples):
+        with open(self.path, "w") as f:
+            for sample in samples:
+                f.write(json.dumps(sample) + "\n")
+
+
+class RecordTests(SamplesTestCase):
+    def setUp(self):
+        super().setUp()
+        setting = override_settings(
+            FILTERS_SAMPLE_FILE=self.path, FILTERS_SAMPLE_RATE=1
+        )
+        setting.enable()
+        self.addCleanup(setting.disable)
+
+    def test_record(self):
+        UserFilter({"username": "Alex 42", "status": "1", "page": "2"}).qs
+        UserFilter({"id_range_min": "1", "id_range_max": "5"}).qs
+        UserFilter().qs
+
+        self.assertEqual(
+            read_samples(self.path),
+            [
+                {
+                    "filterset": PATH,
+                    "params": {"username": ["xxxx 00"], "status": ["1"]},
+                },
+                {
+                    "filterset": PATH,
+                    "params": {"id_range_min": ["1"], "id_range_max": ["5"]},
+                },
+            ],
+        )
+
+
+class SampleRateTests(SamplesTestCase):
+    def test_sample_rate(self):
+        with mock.patch("random.random", side_effect=[0.5, 0.99]):
+            with override_settings(
+                FILTERS_SAMPLE_FILE=self.path, FILTERS_SAMPLE_RATE=0.9
+            ):
+                UserFilter({"status": "1"}).qs
+                UserFilter({"status": "2"}).qs
+
+        self.assertEqual(
+            read_samples(self.path), [{"filterset": PATH, "params": {"status": ["1"]}}]
+        )
+
+
+class AnonymizeTests(TestCase):
+    def test_prefix(self):
+        f = UserFilter({"f-username": "alex", "username": "x"}, prefix="f")
+
+        self.assertEqual(anonymize(f), {"f-username": ["xxxx"]})
+
+    def test_mask(self):
+        self.assertEqual(mask("Élise_99@example.com"), "xxxxx_00@xxxxxxx.xxx")
+
+
+class ReplayTests(SamplesTestCase):
+    def setUp(self):
+        super().setUp()
+        User.objects.create(username="alex", status=1)
+        User.objects.create(username="jacob", status=2)
+
+    def test_replay(self):
+        samples = [
+            {"filterset": PATH, "params": {"status": ["1"]}},
+            {"filterset": PATH, "params": {"status": ["2"]}},
+            {"filterset": PATH, "params": {"username": ["xx"], "status": ["1"]}},
+            {"filterset": "tests.test_samples.Missing", "params": {}},
+        ]
+        results = replay(samples, "default", 10)
+
+        self.assertEqual(
+            sorted(results),
+            [(PATH, ("status",)), (PATH, ("status", "username"))],
+        )
+        self.assertEqual(len(results[(PATH, ("status",))]["durations"]), 2)
+        # a count and a page
+        self.assertEqual(results[(PATH, ("status",))]["queries"], [2, 2])
+
+    def test_command(self):
+        self.write_samples(
+            {"filterset": PATH, "params": {"status": ["1"]}},
+            {"filterset": PATH, "params": {}},
+        )
+        out = StringIO()
+        call_command("replay_filter_samples", self.path, repeat=3, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], "%s: (no params)" % PATH)
+        self.assertRegex(
+            lines[1],
+            r"^   3 requests, p50 [\d.]+ms, p95 [\d.]+ms, p99 [\d.]+ms, 2 queries$",
+        )
+        self.assertEqual(lines[2], "%s: status" % PATH)
+
+    def test_command_json(self):
+        self.write_samples({"filterset": PATH, "params": {"status": ["1"]}})
+        out = StringIO()
+        with override_settings(FILTERS_SAMPLE_FILE=self.path):
+            call_command("replay_filter_samples", json=True, stdout=out)
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(report["params"], ["status"])
+        self.assertEqual(report["count"], 1)
+        self.assertEqual(report["queries"], 2)
+        self.assertLessEqual(report["p50"], report["p99"])
+
+    def test_command_errors(self):
+        with self.assertRaisesMessage(CommandError, "FILTERS_SAMPLE_FILE is unset"):
+            call_command("replay_filter_samples")
+        with self.assertRaisesMessage(CommandError, "does not exist"):
+            call_command("replay_filter_samples", self.path)
+
+
+class PercentileTests(TestCase):
+    def test_percentile(self):
+        values = list(range(100, 0, -1))
+
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertEqual(percentile([3], 95), 3)
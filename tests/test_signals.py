@@ -0,0 +1,181 @@
+import pickle
+from unittest import mock
+
+from django.db import OperationalError
+from django.db.models import QuerySet
+from django.test import TestCase
+
+from django_filters import signals
+from django_filters.filters import CharFilter, ChoiceFilter, NumberFilter
+from django_filters.filterset import FilterSet
+from django_filters.signals import collect_timings
+
+from .models import STATUS_CHOICES, User
+
+
+class UserFilter(FilterSet):
+    username = CharFilter()
+    status = NumberFilter(method="filter_status")
+
+    class Meta:
+        model = User
+        fields = []
+
+    def filter_status(self, queryset, name, value):
+        return queryset.filter(**{name: value})
+
+
+class Receiver:
+    def __init__(self, testcase, signal):
+        self.calls = []
+        signal.connect(self)
+        testcase.addCleanup(signal.disconnect, self)
+
+    def __call__(self, sender, signal, **kwargs):
+        self.calls.append((sender, kwargs))
+
+
+class SignalTests(TestCase):
+    def test_form_validation(self):
+        pre = Receiver(self, signals.pre_form_validation)
+        post = Receiver(self, signals.post_form_validation)
+
+        f = UserFilter({"status": "x"})
+        self.assertFalse(f.is_valid())
+        f.errors
+        f.qs
+
+        self.assertEqual(pre.calls, [(UserFilter, {"filterset": f})])
+        ((sender, kwargs),) = post.calls
+        self.assertIs(sender, UserFilter)
+        self.assertIs(kwargs["filterset"], f)
+        self.assertGreaterEqual(kwargs["duration"], 0)
+
+    def test_filters(self):
+        pre = Receiver(self, signals.pre_filter)
+        post = Receiver(self, signals.post_filter)
+
+        f = UserFilter({"username": "alex", "status": "1"})
+        f.qs
+
+        self.assertEqual(
+            [(kwargs["name"], kwargs["value"]) for _, kwargs in pre.calls],
+            [("username", "alex"), ("status", 1)],
+        )
+        self.assertEqual(
+            [(kwargs["name"], kwargs["value"]) for _, kwargs in post.calls],
+            [("username", "alex"), ("status", 1)],
+        )
+        self.assertTrue(all(kwargs["duration"] >= 0 for _, kwargs in post.calls))
+
+    def test_qs_evaluation(self):
+        User.objects.create(username="alex", status=1)
+        post = Receiver(self, signals.post_qs_evaluation)
+
+        f = UserFilter({"status": "1"})
+        self.assertEqual(f.qs.count(), 1)
+        self.assertTrue(f.qs.exists())
+        qs = f.qs.order_by("username")
+        self.assertEqual([u.username for u in qs], ["alex"])
+        # the result cache is reused
+        list(qs)
+        qs.count()
+
+        self.assertEqual(
+            [kwargs["method"] for _, kwargs in post.calls], ["count", "exists", "fetch"]
+        )
+        self.assertTrue(all(kwargs["filterset"] is f for _, kwargs in post.calls))
+        self.assertTrue(all(kwargs["exception"] is None for _, kwargs in post.calls))
+        self.assertIs(post.calls[2][1]["queryset"], qs)
+
+    def test_qs_evaluation_error(self):
+        post = Receiver(self, signals.post_qs_evaluation)
+        error = OperationalError("statement timeout")
+
+        f = UserFilter({"status": "1"})
+        with mock.patch.object(QuerySet, "count", side_effect=error):
+            with self.assertRaises(OperationalError):
+                f.qs.count()
+
+        ((sender, kwargs),) = post.calls
+        self.assertEqual(kwargs["method"], "count")
+        self.assertIs(kwargs["exception"], error)
+
+    def test_facets(self):
+        class F(FilterSet):
+            username = CharFilter()
+            status = ChoiceFilter(choices=STATUS_CHOICES)
+
+            class Meta:
+                model = User
+                fields = []
+
+        User.objects.create(username="alex", status=1)
+        filters = Receiver(self, signals.post_filter)
+        evaluations = Receiver(self, signals.post_qs_evaluation)
+
+        f = F({"username": "alex", "status": "1"})
+        list(f.qs)
+        facets = f.facets()
+
+        # the facet querysets are not instrumented
+        self.assertEqual(facets["status"][1]["count"], 1)
+        self.assertEqual(len(filters.calls), 2)
+        self.assertEqual(len(evaluations.calls), 1)
+
+    def test_pickle(self):
+        User.objects.create(username="alex", status=1)
+        Receiver(self, signals.post_qs_evaluation)
+
+        f = UserFilter({"status": "1"})
+        qs = pickle.loads(pickle.dumps(f.qs))
+
+        self.assertIs(type(qs), type(User.objects.all()))
+        self.assertEqual([u.username for u in qs], ["alex"])
+
+    def test_disabled(self):
+        f = UserFilter({"status": "1"})
+
+        self.assertIs(type(f.qs), type(User.objects.all()))
+
+
+class CollectTimingsTests(TestCase):
+    def test_collect(self):
+        with collect_timings() as timings:
+            f = UserFilter({"username": "alex", "status": "1"})
+            list(f.qs)
+
+        self.assertEqual(
+            [(t.phase, t.filterset, t.name) for t in timings],
+            [
+                ("form_validation", UserFilter, None),
+                ("filter", UserFilter, "username"),
+                ("filter", UserFilter, "status"),
+                ("qs_evaluation", UserFilter, "fetch"),
+            ],
+        )
+
+        # timings are not collected outside of the block
+        list(UserFilter({"status": "1"}).qs)
+        self.assertEqual(len(timings), 4)
+
+    def test_nested(self):
+        with collect_timings() as outer:
+            UserFilter({"status": "1"}).qs
+            with collect_timings() as inner:
+                UserFilter({"username": "alex"}).qs
+
+        self.assertEqual([t.name for t in inner], [None, "username"])
+        self.assertEqual([t.name for t in outer], [None, "status", None, "username"])
+
+    def test_error(self):
+        f = UserFilter({"status": "1"})
+        with collect_timings() as timings:
+            with mock.patch.object(UserFilter, "filter_status", side_effect=ValueError):
+                with self.assertRaises(ValueError):
+                    f.qs
+
+        # the failed filter is not collected
+        self.assertEqual(
+            [(t.phase, t.name) for t in timings], [("form_validation", None)]
+        )
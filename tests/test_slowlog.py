@@ -0,0 +1,179 @@
+import json
+from unittest import mock
+
+from django.db import OperationalError
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+
+from django_filters import slowlog
+from django_filters.filters import (
+    BaseInFilter,
+    CharFilter,
+    ModelChoiceFilter,
+    NumberFilter,
+)
+from django_filters.filterset import FilterSet
+from django_filters.slowlog import get_shape, get_sql_fingerprint, throttle
+
+from .models import Book, User
+
+
+class NumberInFilter(BaseInFilter, NumberFilter):
+    pass
+
+
+class UserFilter(FilterSet):
+    username = CharFilter(lookup_expr="icontains")
+    status = NumberInFilter(lookup_expr="in")
+    book = ModelChoiceFilter(field_name="favorite_books", queryset=Book.objects.all())
+
+    class Meta:
+        model = User
+        fields = []
+
+
+class SlowLogTestCase(TestCase):
+    def setUp(self):
+        self.addCleanup(slowlog.disconnect)
+        self.addCleanup(slowlog._shapes.clear)
+
+
+@override_settings(FILTERS_SLOW_THRESHOLD=0)
+class SlowLogTests(SlowLogTestCase):
+    def test_log(self):
+        User.objects.create(username="alex-secret", status=1)
+
+        with self.assertLogs("django_filters.slow") as logs:
+            f = UserFilter({"username": "secret", "status": "1,2,3"})
+            list(f.qs)
+
+        (record,) = logs.records
+        data = record.slow_filterset
+        self.assertEqual(json.loads(record.getMessage()), data)
+        self.assertNotIn("secret", record.getMessage())
+
+        self.assertEqual(data["filterset"], "tests.test_slowlog.UserFilter")
+        self.assertEqual(
+            data["shape"],
+            [
+                {"name": "username", "lookup": "icontains", "type": "str", "size": 6},
+                {"name": "status", "lookup": "in", "type": "list", "size": 3},
+            ],
+        )
+        self.assertEqual(data["sql_fingerprint"], get_sql_fingerprint(f.qs))
+        self.assertEqual(data["method"], "fetch")
+        self.assertEqual(data["rows"], 1)
+        self.assertIsNone(data["error"])
+        self.assertEqual(data["suppressed"], 0)
+        self.assertEqual(set(data["timings"]["filters"]), {"username", "status"})
+        self.assertGreater(data["timings"]["total"], 0)
+
+    def test_rate_limit(self):
+        with self.assertLogs("django_filters.slow") as logs:
+            for value in ["a", "b", "c"]:
+                list(UserFilter({"username": value}).qs)
+            # a different shape
+            UserFilter({"username": "a", "status": "1"}).qs.count()
+
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(logs.records[1].slow_filterset["method"], "count")
+        self.assertIsNone(logs.records[1].slow_filterset["rows"])
+
+        with mock.patch("time.monotonic", return_value=10**9):
+            with self.assertLogs("django_filters.slow") as logs:
+                list(UserFilter({"username": "d"}).qs)
+        self.assertEqual(logs.records[0].slow_filterset["suppressed"], 2)
+
+    def test_query_error(self):
+        error = OperationalError("canceling statement due to statement timeout")
+        f = UserFilter({"username": "a"})
+
+        with mock.patch.object(QuerySet, "_fetch_all", side_effect=error):
+            with self.assertLogs("django_filters.slow") as logs:
+                with self.assertRaisesMessage(OperationalError, str(error)):
+                    list(f.qs)
+
+        self.assertEqual(logs.records[0].slow_filterset["method"], "fetch")
+        self.assertIsNone(logs.records[0].slow_filterset["rows"])
+        self.assertEqual(logs.records[0].slow_filterset["error"], "OperationalError")
+
+
+class ThresholdTests(SlowLogTestCase):
+    @override_settings(FILTERS_SLOW_THRESHOLD=60)
+    def test_fast(self):
+        with self.assertNoLogs("django_filters.slow"):
+            list(UserFilter({"username": "a"}).qs)
+
+    def test_disabled(self):
+        f = UserFilter({"username": "a"})
+
+        self.assertFalse(slowlog._state["connected"])
+        self.assertIs(type(f.qs), type(User.objects.all()))
+
+
+class ShapeTests(TestCase):
+    def test_shape(self):
+        book = Book.objects.create(title="a", price="1.00", average_rating=1)
+        f = UserFilter({"book": book.pk, "username": ""})
+        f.is_valid()
+
+        self.assertEqual(
+            get_shape(f),
+            [{"name": "book", "lookup": "exact", "type": "Book", "size": None}],
+        )
+
+    def test_invalid(self):
+        f = UserFilter({"status": "x"})
+        f.is_valid()
+
+        self.assertEqual(get_shape(f), [])
+
+    def test_sql_fingerprint(self):
+        qs = User.objects.filter(status__in=[1, 2])
+
+        self.assertEqual(
+            get_sql_fingerprint(qs),
+            get_sql_fingerprint(User.objects.filter(status__in=[3, 4, 5])),
+        )
+        self.assertEqual(get_sql_fingerprint(qs[:10]), get_sql_fingerprint(qs[:20]))
+        self.assertEqual(get_sql_fingerprint(qs[5:10]), get_sql_fingerprint(qs[10:20]))
+        self.assertNotEqual(get_sql_fingerprint(qs), get_sql_fingerprint(qs[:10]))
+        self.assertIsNone(get_sql_fingerprint(User.objects.none()))
+
+
+@override_settings(FILTERS_SLOW_LOG_INTERVAL=60)
+class ThrottleTests(TestCase):
+    def setUp(self):
+        self.addCleanup(slowlog._shapes.clear)
+
+    def test_throttle(self):
+        with mock.patch("time.monotonic", return_value=100):
+            self.assertEqual(throttle("a"), 0)
+            self.assertIsNone(throttle("a"))
+            self.assertIsNone(throttle("a"))
+            self.assertEqual(throttle("b"), 0)
+        with mock.patch("time.monotonic", return_value=200):
+            self.assertEqual(throttle("a"), 2)
+
+    def test_max_shapes(self):
+        with mock.patch.object(slowlog, "MAX_SHAPES", 2):
+            with mock.patch("time.monotonic", return_value=100):
+                throttle("a")
+                throttle("b")
+            with mock.patch("time.monotonic", return_value=150):
+                throttle("c")
+            with mock.patch("time.monotonic", return_value=200):
+                throttle("d")
+
+        self.assertEqual(set(slowlog._shapes), {"c", "d"})
+
+    def test_max_shapes_recent(self):
+        with mock.patch.object(slowlog, "MAX_SHAPES", 2):
+            with mock.patch("time.monotonic", return_value=100):
+                for key in "abcd":
+                    self.assertEqual(throttle(key), 0)
+                # b is dropped, and is logged again
+                self.assertIsNone(throttle("c"))
+                self.assertEqual(throttle("b"), 0)
+
+        self.assertEqual(list(slowlog._shapes), ["d", "b"])
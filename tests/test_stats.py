@@ -0,0 +1,210 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from django_filters import stats
+from django_filters.filters import (
+    AllValuesFilter,
+    CharFilter,
+    ChoiceFilter,
+    NumberFilter,
+)
+from django_filters.filterset import FilterSet
+from django_filters.stats import (
+    clear_cache,
+    collect,
+    estimate_selectivity,
+    get_filter_fields,
+)
+from django_filters.stats.models import ColumnStatistics
+
+from .models import STATUS_CHOICES, User
+
+
+class UserFilter(FilterSet):
+    status = ChoiceFilter(choices=STATUS_CHOICES)
+    username = AllValuesFilter()
+    is_employed = CharFilter(lookup_expr="isnull")
+    id = NumberFilter(lookup_expr="gt")
+    method = CharFilter(method="filter_method")
+
+    class Meta:
+        model = User
+        fields = []
+
+    def filter_method(self, queryset, name, value):
+        return queryset
+
+
+class StatisticsTestCase(TestCase):
+    def setUp(self):
+        self.addCleanup(clear_cache)
+        clear_cache()
+
+        users = []
+        for i in range(100):
+            users.append(
+                User(
+                    username="user%02d" % i,
+                    status=0 if i < 80 else 1,
+                    is_employed=None if i < 10 else True,
+                )
+            )
+        User.objects.bulk_create(users)
+        self.pks = list(User.objects.order_by("pk").values_list("pk", flat=True))
+
+
+class CollectTests(StatisticsTestCase):
+    def test_filter_fields(self):
+        self.assertEqual(
+            get_filter_fields(UserFilter), ["status", "username", "is_employed", "id"]
+        )
+
+    def test_collect(self):
+        statistics = collect(User, "status", 1000)
+
+        self.assertEqual(statistics.row_count, 100)
+        self.assertEqual(statistics.distinct_count, 2)
+        self.assertEqual(statistics.null_fraction, 0)
+        self.assertEqual(statistics.most_common_values, [[0, 0.8], [1, 0.2]])
+        self.assertEqual(statistics.histogram, [])
+
+    def test_collect_nulls(self):
+        statistics = collect(User, "is_employed", 1000)
+
+        self.assertEqual(statistics.null_fraction, 0.1)
+        self.assertEqual(statistics.most_common_values, [[True, 0.9]])
+
+    def test_collect_histogram(self):
+        statistics = collect(User, "username", 1000)
+
+        self.assertEqual(statistics.distinct_count, 100)
+        self.assertEqual(len(statistics.histogram), 11)
+        self.assertEqual(statistics.histogram[0], "user00")
+        self.assertEqual(statistics.histogram[-1], "user99")
+
+    def test_collect_sample(self):
+        statistics = collect(User, "username", 20)
+
+        # the row count is exact, while the distinct count is estimated
+        self.assertEqual(statistics.row_count, 100)
+        self.assertEqual(statistics.distinct_count, 100)
+        self.assertEqual(statistics.most_common_values, [])
+
+    def test_recollect(self):
+        collect(User, "status", 1000)
+        User.objects.update(status=2)
+        statistics = collect(User, "status", 1000)
+
+        self.assertEqual(ColumnStatistics.objects.count(), 1)
+        self.assertEqual(statistics.most_common_values, [[2, 1.0]])
+
+
+class EstimateSelectivityTests(StatisticsTestCase):
+    def setUp(self):
+        super().setUp()
+        for path in get_filter_fields(UserFilter):
+            collect(User, path, 1000)
+
+    def test_no_statistics(self):
+        self.assertIsNone(estimate_selectivity(User, "first_name", "exact", "a"))
+
+    def test_exact(self):
+        self.assertEqual(estimate_selectivity(User, "status", "exact", 0), 0.8)
+        self.assertEqual(estimate_selectivity(User, "status", "exact", "1"), 0)
+        self.assertEqual(estimate_selectivity(User, "status", "exact", 3), 0)
+        self.assertAlmostEqual(
+            estimate_selectivity(User, "username", "exact", "user50"), 0.01
+        )
+
+    def test_in(self):
+        self.assertEqual(estimate_selectivity(User, "status", "in", [0, 1]), 1)
+        self.assertEqual(estimate_selectivity(User, "status", "exact", [1]), 0.2)
+
+    def test_isnull(self):
+        self.assertEqual(estimate_selectivity(User, "is_employed", "isnull", True), 0.1)
+        self.assertEqual(
+            estimate_selectivity(User, "is_employed", "isnull", False), 0.9
+        )
+
+    def test_range(self):
+        first = self.pks[0]
+        self.assertAlmostEqual(
+            estimate_selectivity(User, "id", "gt", first + 49), 0.5, delta=0.05
+        )
+        self.assertAlmostEqual(
+            estimate_selectivity(User, "id", "lt", first + 25), 0.25, delta=0.05
+        )
+        self.assertAlmostEqual(
+            estimate_selectivity(User, "id", "range", slice(first + 10, first + 29)),
+            0.2,
+            delta=0.05,
+        )
+        self.assertEqual(estimate_selectivity(User, "id", "lt", first), 0)
+
+    def test_incomparable_value(self):
+        self.assertIsNone(estimate_selectivity(User, "id", "lt", "a"))
+
+    def test_unsupported_lookup(self):
+        self.assertIsNone(estimate_selectivity(User, "username", "icontains", "a"))
+
+    def test_filter_selectivity(self):
+        filters = UserFilter(queryset=User.objects.all()).filters
+        self.assertEqual(filters["status"].get_selectivity(0), 0.8)
+        self.assertEqual(filters["is_employed"].get_selectivity(True), 0.1)
+        self.assertIsNone(filters["method"].get_selectivity("a"))
+
+        f = ChoiceFilter(choices=STATUS_CHOICES, field_name="status", exclude=True)
+        f.model = User
+        self.assertAlmostEqual(f.get_selectivity(0), 0.2)
+
+    @override_settings(FILTERS_STATS_REFRESH_INTERVAL=60)
+    def test_refresh(self):
+        self.assertEqual(estimate_selectivity(User, "status", "exact", 0), 0.8)
+
+        User.objects.update(status=1)
+        collect(User, "status", 1000)
+        with self.assertNumQueries(0):
+            self.assertEqual(estimate_selectivity(User, "status", "exact", 0), 0.8)
+
+        with mock.patch.object(stats.time, "monotonic", return_value=1e12):
+            self.assertEqual(estimate_selectivity(User, "status", "exact", 0), 0)
+
+
+class CommandTests(StatisticsTestCase):
+    def test_command(self):
+        out = StringIO()
+        call_command(
+            "collect_filter_statistics", "tests.test_stats.UserFilter", stdout=out
+        )
+
+        self.assertIn("Collected tests.User.status: 100 rows, 2", out.getvalue())
+        self.assertEqual(ColumnStatistics.objects.count(), 4)
+
+    def test_imported_filtersets(self):
+        call_command("collect_filter_statistics", stdout=StringIO())
+
+        self.assertTrue(
+            ColumnStatistics.objects.filter(model="tests.user", field="status").exists()
+        )
+
+    @override_settings(FILTERS_STATS_HIGH_CARDINALITY=50)
+    def test_high_cardinality(self):
+        err = StringIO()
+        call_command(
+            "collect_filter_statistics",
+            "tests.test_stats.UserFilter",
+            stdout=StringIO(),
+            stderr=err,
+        )
+
+        self.assertIn(
+            "Warning: 'UserFilter.username' renders a choice for each of about 100",
+            err.getvalue(),
+        )
+
+    def test_without_model(self):
+        with self.assertRaisesMessage(CommandError, "does not declare 'Meta.model'"):
+            call_command("collect_filter_statistics", "django_filters.FilterSet")
@@ -0,0 +1,134 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import TestCase
+
+from django_filters.filters import (
+    CharFilter,
+    ModelChoiceFilter,
+    ModelMultipleChoiceFilter,
+)
+from django_filters.filterset import FilterSet
+from django_filters.testing import FilterSetTestMixin, get_joins
+
+from .models import Book, User
+
+
+class UserFilter(FilterSet):
+    username = CharFilter()
+    book = ModelChoiceFilter(field_name="favorite_books", queryset=Book.objects.all())
+    books = ModelMultipleChoiceFilter(
+        field_name="favorite_books", queryset=Book.objects.all(), distinct=True
+    )
+
+    class Meta:
+        model = User
+        fields = []
+
+
+class AssertFilterSetQueriesTests(FilterSetTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.book = Book.objects.create(title="a", price="1.00", average_rating=1)
+
+    def test_within_limits(self):
+        f = self.assertFilterSetQueries(
+            UserFilter, {"book": self.book.pk}, max_queries=2, max_joins=1
+        )
+
+        self.assertIsInstance(f, UserFilter)
+        self.assertEqual(get_joins(f.qs), ["tests_user_favorite_books"])
+
+    def test_unbound(self):
+        self.assertFilterSetQueries(UserFilter, None, max_queries=1, max_joins=0)
+
+    def test_max_queries(self):
+        # the model choice validation, and the filtered queryset
+        msg = "2 queries executed, at most 1 expected"
+        with self.assertRaisesMessage(AssertionError, msg):
+            self.assertFilterSetQueries(UserFilter, {"book": self.book.pk}, 1)
+
+    def test_max_joins(self):
+        msg = "1 joins, at most 0 expected: tests_user_favorite_books"
+        with self.assertRaisesMessage(AssertionError, msg):
+            self.assertFilterSetQueries(
+                UserFilter, {"book": self.book.pk}, max_queries=2, max_joins=0
+            )
+
+    def test_distinct(self):
+        params = {"books": [self.book.pk]}
+        self.assertFilterSetQueries(UserFilter, params, max_queries=2, distinct=True)
+
+        msg = "The queryset is distinct, not distinct expected"
+        with self.assertRaisesMessage(AssertionError, msg):
+            self.assertFilterSetQueries(UserFilter, params, max_queries=2)
+
+    def test_invalid(self):
+        msg = "UserFilter is not valid"
+        with self.assertRaisesMessage(AssertionError, msg):
+            self.assertFilterSetQueries(UserFilter, {"book": "0"}, max_queries=2)
+
+    def test_queryset(self):
+        queryset = User.objects.filter(is_active=True)
+        f = self.assertFilterSetQueries(
+            UserFilter, {"username": "alex"}, max_queries=1, queryset=queryset
+        )
+
+        self.assertIn("is_active", str(f.qs.query))
+
+
+class AssertFilterSetSQLTests(FilterSetTestMixin, TestCase):
+    def setUp(self):
+        self.snapshot_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.snapshot_dir)
+
+    def read_snapshot(self, name):
+        with open(self.get_snapshot_path(name)) as f:
+            return f.read()
+
+    def test_default_snapshot_dir(self):
+        del self.snapshot_dir
+
+        self.assertEqual(
+            self.get_snapshot_path("users"),
+            os.path.join(os.path.dirname(__file__), "snapshots", "users.sql"),
+        )
+
+    def test_writes_missing_snapshot(self):
+        self.assertFilterSetSQL(UserFilter, {"username": "alex"}, "users")
+
+        snapshot = self.read_snapshot("users")
+        self.assertIn('WHERE "tests_user"."username" = %s\n', snapshot)
+        self.assertNotIn("alex", snapshot)
+
+    def test_matches_snapshot(self):
+        self.assertFilterSetSQL(UserFilter, {"username": "alex"}, "users")
+
+        # the values are not part of the snapshot
+        self.assertFilterSetSQL(UserFilter, {"username": "jacob"}, "users")
+
+    def test_mismatch(self):
+        self.assertFilterSetSQL(UserFilter, {"username": "alex"}, "users")
+
+        msg = "The SQL does not match the snapshot"
+        with self.assertRaisesMessage(AssertionError, msg):
+            self.assertFilterSetSQL(UserFilter, {"books": []}, "users")
+
+    def test_collapses_lists(self):
+        books = Book.objects.bulk_create(
+            Book(title=title, price="1.00", average_rating=1) for title in "abc"
+        )
+        self.assertFilterSetSQL(
+            UserFilter, {"books": [b.pk for b in books[:2]]}, "books"
+        )
+        self.assertFilterSetSQL(UserFilter, {"books": [b.pk for b in books]}, "books")
+
+    def test_update(self):
+        self.assertFilterSetSQL(UserFilter, {"username": "alex"}, "users")
+
+        with mock.patch.dict(os.environ, {"FILTERS_UPDATE_SNAPSHOTS": "1"}):
+            self.assertFilterSetSQL(UserFilter, {}, "users")
+
+        self.assertNotIn("WHERE", self.read_snapshot("users"))
@@ -3,6 +3,7 @@ import unittest
 import warnings
 
 import django
+from django.core.management.base import CommandError
 from django.db import models
 from django.db.models.constants import LOOKUP_SEP
 from django.db.models.fields.related import ForeignObjectRel
@@ -16,9 +17,12 @@ from django_filters.filters import MultipleChoiceFilter
 from django_filters.utils import (
     MigrationNotice,
     RenameAttributesBase,
+    deduplicate,
     get_field_parts,
     get_model_field,
     handle_timezone,
+    import_filterset_class,
+    is_to_many_path,
     label_for_filter,
     resolve_field,
     translate_validation,
@@ -185,6 +189,12 @@ class RenameAttributesBaseTests(TestCase):
             self.check(recorded, 0)
 
 
+class DeduplicateTests(TestCase):
+    def test_preserves_order(self):
+        self.assertEqual(deduplicate(["b", "a", "b", "c", "a"]), ["b", "a", "c"])
+        self.assertEqual(deduplicate([]), [])
+
+
 class GetFieldPartsTests(TestCase):
     def test_field(self):
         parts = get_field_parts(User, "username")
@@ -241,6 +251,24 @@ class GetModelFieldTests(TestCase):
         self.assertEqual(result, HiredWorker._meta.get_field("worker"))
 
 
+class IsToManyPathTests(TestCase):
+    def test_field(self):
+        self.assertFalse(is_to_many_path(User, "username"))
+        self.assertFalse(is_to_many_path(User, "username__iexact"))
+
+    def test_forwards_related_field(self):
+        self.assertFalse(is_to_many_path(Article, "author__username"))
+        self.assertTrue(is_to_many_path(User, "favorite_books"))
+        self.assertTrue(is_to_many_path(User, "favorite_books__pk"))
+
+    def test_reverse_related_field(self):
+        self.assertTrue(is_to_many_path(User, "comments__text"))
+        self.assertTrue(is_to_many_path(Article, "author__manager_of"))
+
+    def test_non_existent_field(self):
+        self.assertFalse(is_to_many_path(User, "unknown__name"))
+
+
 class ResolveFieldTests(TestCase):
     def test_resolve_plain_lookups(self):
         """
@@ -597,3 +625,20 @@ class TranslateValidationDataTests(TestCase):
                 ],
             },
         )
+
+
+class ImportFilterSetClassTests(TestCase):
+    def test_import(self):
+        from .test_signals import UserFilter
+
+        self.assertIs(
+            import_filterset_class("tests.test_signals.UserFilter"), UserFilter
+        )
+
+    def test_errors(self):
+        with self.assertRaisesMessage(CommandError, "No module named 'tests.nope'"):
+            import_filterset_class("tests.nope.F")
+        with self.assertRaisesMessage(CommandError, "is not a FilterSet."):
+            import_filterset_class("tests.models.User")
+        with self.assertRaisesMessage(CommandError, "does not declare 'Meta.model'"):
+            import_filterset_class("django_filters.FilterSet")
@@ -3,6 +3,7 @@ from django.test import TestCase, override_settings
 from django.test.client import RequestFactory
 from django.utils import html
 
+from django_filters.filters import RangeFilter
 from django_filters.filterset import FilterSet, filterset_factory
 from django_filters.views import FilterView
 
@@ -91,6 +92,25 @@ class GenericClassBasedViewTests(GenericViewTestCase):
             ["Snowcrash"],
         )
 
+    def test_view_with_empty_result(self):
+        class F(FilterSet):
+            price = RangeFilter()
+
+            class Meta:
+                model = Book
+                fields = ["price"]
+
+        factory = RequestFactory()
+        request = factory.get(self.base_url + "?price_min=2&price_max=1")
+        view = FilterView.as_view(filterset_class=F, paginate_by=2)
+        with self.assertNumQueries(0):
+            response = view(request)
+            response.render()
+        titles = [o.title for o in response.context_data["object_list"]]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(titles, [])
+
     def test_view_without_filterset_or_model(self):
         factory = RequestFactory()
         request = factory.get(self.base_url)
@@ -615,3 +615,15 @@ class QueryArrayWidgetTests(TestCase):
 
         result = w.value_from_datadict({}, {}, "price")
         self.assertEqual(result, [])
+
+    def test_widget_value_from_datadict_order(self):
+        # Duplicates are removed, preserving the order of the values
+        w = QueryArrayWidget()
+
+        data = {"price": "3,1,2,1,3"}
+        result = w.value_from_datadict(data, {}, "price")
+        self.assertEqual(result, ["3", "1", "2"])
+
+        data = {"price[]": ["b", "a", "b", "c"]}
+        result = w.value_from_datadict(data, {}, "price")
+        self.assertEqual(result, ["b", "a", "c"])
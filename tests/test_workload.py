@@ -0,0 +1,271 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from django_filters import workload
+from django_filters.filters import (
+    CharFilter,
+    ChoiceFilter,
+    IsoDateTimeFilter,
+    OrderingFilter,
+)
+from django_filters.filterset import FilterSet
+from django_filters.workload import (
+    CacheStore,
+    FileStore,
+    flush,
+    get_index_keys,
+    get_recommendations,
+    get_store,
+)
+
+from .models import STATUS_CHOICES, Ticket, User
+
+
+class TicketFilter(FilterSet):
+    status = ChoiceFilter(choices=STATUS_CHOICES)
+    title = CharFilter(lookup_expr="icontains")
+    closed = IsoDateTimeFilter(lookup_expr="gte")
+    author = CharFilter(field_name="assignee__username")
+    o = OrderingFilter(fields=["created", "closed"])
+
+    class Meta:
+        model = Ticket
+        fields = []
+
+
+class UserFilter(FilterSet):
+    o = OrderingFilter(fields=["username"])
+
+    class Meta:
+        model = User
+        fields = ["status", "is_active"]
+
+
+PATH = "tests.test_workload.TicketFilter"
+
+
+class WorkloadTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "workload.jsonl")
+
+        setting = override_settings(FILTERS_WORKLOAD_STORE="file:" + self.path)
+        setting.enable()
+        self.addCleanup(setting.disable)
+        self.addCleanup(workload._tally.clear)
+
+
+class RecordTests(WorkloadTestCase):
+    def test_record(self):
+        TicketFilter({"status": "1", "o": "-created"}).qs
+        TicketFilter({"o": "closed,created", "title": "a"}).qs
+        TicketFilter({"status": "1", "o": "-created"}).qs
+
+        self.assertEqual(
+            workload._tally,
+            {
+                (PATH, ("status",), ("created",)): 2,
+                (PATH, ("title",), ("closed", "created")): 1,
+            },
+        )
+
+    def test_invalid_values(self):
+        TicketFilter({"status": "x", "closed": ""}).qs
+
+        self.assertEqual(workload._tally, {(PATH, (), ()): 1})
+
+    def test_unbound(self):
+        TicketFilter().qs
+
+        self.assertEqual(workload._tally, {})
+
+    @override_settings(FILTERS_WORKLOAD_FLUSH_INTERVAL=0)
+    def test_flush_interval(self):
+        TicketFilter({"status": "1"}).qs
+
+        self.assertEqual(workload._tally, {})
+        self.assertEqual(get_store().read(), {(PATH, ("status",), ()): 1})
+
+    def test_flush(self):
+        TicketFilter({"status": "1"}).qs
+        flush()
+        TicketFilter({"status": "1"}).qs
+        flush()
+
+        self.assertEqual(workload._tally, {})
+        self.assertEqual(get_store().read(), {(PATH, ("status",), ()): 2})
+
+
+class StoreTests(TestCase):
+    def test_disabled(self):
+        TicketFilter({"status": "1"}).qs
+
+        self.assertEqual(workload._tally, {})
+
+    def test_get_store(self):
+        with override_settings(FILTERS_WORKLOAD_STORE="file:/tmp/workload.jsonl"):
+            self.assertIsInstance(get_store(), FileStore)
+            self.assertEqual(get_store().path, "/tmp/workload.jsonl")
+        with override_settings(FILTERS_WORKLOAD_STORE="cache:default"):
+            self.assertIsInstance(get_store(), CacheStore)
+
+        msg = "FILTERS_WORKLOAD_STORE must be 'file:<path>' or 'cache:<alias>'"
+        with override_settings(FILTERS_WORKLOAD_STORE="default"):
+            with self.assertRaisesMessage(ImproperlyConfigured, msg):
+                get_store()
+
+    def test_file_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = FileStore(os.path.join(directory, "workload.jsonl"))
+            self.assertEqual(store.read(), {})
+
+            store.add({(PATH, ("status",), ()): 2})
+            store.add({(PATH, ("status",), ()): 1, (PATH, (), ("created",)): 1})
+            self.assertEqual(
+                store.read(),
+                {(PATH, ("status",), ()): 3, (PATH, (), ("created",)): 1},
+            )
+
+            store.clear()
+            self.assertEqual(store.read(), {})
+
+    def test_cache_store(self):
+        self.addCleanup(cache.clear)
+        store = CacheStore("default")
+
+        store.add({(PATH, ("status",), ()): 2})
+        store.add({(PATH, ("status",), ()): 1, (PATH, (), ("created",)): 1})
+        self.assertEqual(
+            store.read(),
+            {(PATH, ("status",), ()): 3, (PATH, (), ("created",)): 1},
+        )
+
+        store.clear()
+        self.assertEqual(store.read(), {})
+
+    def test_cache_store_concurrent_adds(self):
+        self.addCleanup(cache.clear)
+        store, other = CacheStore("default"), CacheStore("default")
+        incr = store.cache.incr
+        added = []
+
+        def add_concurrently(*args, **kwargs):
+            # another process adds a combination in the middle of the add
+            if not added:
+                added.append(True)
+                other.add({(PATH, (), ("created",)): 1})
+            return incr(*args, **kwargs)
+
+        with mock.patch.object(store.cache, "incr", side_effect=add_concurrently):
+            store.add({(PATH, ("status",), ()): 2})
+
+        self.assertEqual(
+            store.read(),
+            {(PATH, ("status",), ()): 2, (PATH, (), ("created",)): 1},
+        )
+
+
+class RecommendationTests(TestCase):
+    def test_index_keys(self):
+        self.assertEqual(get_index_keys(TicketFilter, ("status",), ()), ["status"])
+        self.assertEqual(
+            get_index_keys(TicketFilter, ("status",), ("closed",)),
+            ["status", "closed"],
+        )
+        # the ordering is not served after a range
+        self.assertEqual(
+            get_index_keys(TicketFilter, ("closed", "status"), ("created",)),
+            ["status", "closed"],
+        )
+        # pattern lookups and related fields are not indexed
+        self.assertEqual(
+            get_index_keys(TicketFilter, ("author", "title"), ("created",)),
+            ["created"],
+        )
+        self.assertEqual(
+            get_index_keys(UserFilter, ("is_active", "status"), ("username",)),
+            ["status", "is_active", "username"],
+        )
+
+    def test_recommendations(self):
+        User.objects.create(username="alex")
+        User.objects.create(username="jacob")
+
+        tally = {
+            ("tests.test_workload.UserFilter", ("status",), ("username",)): 3,
+            ("tests.test_workload.UserFilter", ("is_active",), ()): 5,
+            ("tests.test_workload.UserFilter", ("is_active",), ("username",)): 2,
+            # served by the index of (status, created)
+            (PATH, ("status",), ("created",)): 100,
+            (PATH, ("closed",), ()): 1,
+            ("tests.test_workload.Missing", ("status",), ()): 1,
+        }
+        recommendations = get_recommendations(tally)
+
+        self.assertEqual(
+            [(r.model, r.index.fields, r.count, r.score) for r in recommendations],
+            [
+                (User, ["is_active"], 5, 10),
+                (User, ["status", "username"], 3, 6),
+                (User, ["is_active", "username"], 2, 4),
+                (Ticket, ["closed"], 1, 0),
+            ],
+        )
+        self.assertEqual(
+            recommendations[0].combinations,
+            [(("tests.test_workload.UserFilter", ("is_active",), ()), 5)],
+        )
+
+
+class CommandTests(WorkloadTestCase):
+    def test_command(self):
+        User.objects.create(username="alex")
+        for _ in range(3):
+            UserFilter({"status": "1", "o": "-username"}).qs
+        UserFilter({"is_active": "true"}).qs
+
+        out = StringIO()
+        call_command("report_filter_workload", stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertTrue(
+            lines[0].startswith(
+                "1. tests.User: models.Index(fields=['status', 'username']"
+            )
+        )
+        self.assertEqual(lines[1], "   3 requests x 1 rows = 3")
+        self.assertEqual(
+            lines[2],
+            "   tests.test_workload.UserFilter: status ordered by username (3)",
+        )
+        self.assertTrue(lines[3].startswith("2. tests.User: models.Index("))
+
+    def test_limit_and_clear(self):
+        UserFilter({"status": "1"}).qs
+        UserFilter({"is_active": "true"}).qs
+
+        out = StringIO()
+        call_command("report_filter_workload", limit=1, clear=True, stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 3)
+
+        out = StringIO()
+        call_command("report_filter_workload", stdout=out)
+        self.assertEqual(
+            out.getvalue(), "No index recommendations for the recorded workload.\n"
+        )
+
+    def test_at_exit(self):
+        with mock.patch.dict(workload._state, registered=False):
+            with mock.patch("atexit.register") as register:
+                UserFilter({"status": "1"}).qs
+                UserFilter({"status": "1"}).qs
+
+        register.assert_called_once_with(flush)
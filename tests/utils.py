@@ -17,4 +17,5 @@ class MockQuerySet:
         m = mock.Mock(spec_set=QuerySet())
         m.filter.return_value = m
         m.all.return_value = m
+        m.query.is_empty.return_value = False
         return m